@@ -11,7 +11,8 @@ from compiler.sinter_ast.nodes import (
     NewExpression, PointerExpression, Statement, ExpressionStatement,
     ReturnStatement, VariableDeclaration, IfStatement, WhileStatement,
     AssignmentStatement, ScopeBlock, ForStatement, ForEachStatement,
-    BreakStatement, ContinueStatement, PrintStatement, ArrayLiteral, ArrayAccess
+    BreakStatement, ContinueStatement, PrintStatement, ArrayLiteral, ArrayAccess,
+    CALLEE_IDENTIFIER, CALLEE_MEMBER
 )
 from compiler.sinter_types.types import (
     SinterType, PrimitiveType, VoidType, StringType, DStringType,
@@ -19,7 +20,7 @@ from compiler.sinter_types.types import (
 )
 from compiler.sinter_types.symbol_table import SymbolTable, Symbol, SymbolKind
 from compiler.runtime.serialization import SerializationCodeGen
-from compiler.runtime.dstring import DStringCodeGen, DStringParser
+from compiler.runtime.dstring import DStringCodeGen, DStringParser, DStringRegistry
 
 
 class CodeGenerator:
@@ -42,14 +43,14 @@ class CodeGenerator:
         self.generate_serialization = True  # Enable serialization code generation
         self.loop_stack: List[Tuple[str, str]] = []  # (continue_label, break_label)
         self.print_format_counter = 0
-        # D-string tracking: maps variable name -> list of (dstring_id, dstring_ptr)
-        self.dstring_var_refs: Dict[str, List[Tuple[int, str]]] = {}
-        self.dstring_format_constants: List[str] = []  # Format string constants to emit
-        self.dstring_counter = 0
         # Current scope's D-strings: maps dstring_id -> llvm ptr
         self.active_dstrings: Dict[int, str] = {}
         # Track which variables hold D-strings (var_name -> dstring_llvm_ptr)
         self.dstring_variables: Dict[str, str] = {}
+        # Variables with many dependent D-strings: var_name -> (table_ptr, capacity, tabled ids)
+        self.dstring_tables: Dict[str, Tuple[str, int, List[int]]] = {}
+        # Depth of enclosing loops whose dirty marks are hoisted to the loop exit
+        self.dirty_defer_depth = 0
     
     def generate(self, ast: Program) -> str:
         """Generate LLVM IR for the entire program"""
@@ -90,26 +91,26 @@ class CodeGenerator:
                 self._generate_function(decl)
         
         # Emit D-string format constants (generated during code generation)
-        if self.dstring_format_constants:
+        if self.dstring_codegen.format_constants:
             self._emit("")
             self._emit("; D-string format string constants")
-            for const in self.dstring_format_constants:
-                self._emit(const)
+            self._emit(self.dstring_codegen.generate_format_string_constants())
         
         return "\n".join(self.output)
     
     def _generate_runtime_declarations(self):
         """Generate runtime function declarations"""
         self._emit("; Runtime declarations")
-        self._emit("declare i8* @malloc(i64)")
+        self._emit("declare noalias i8* @malloc(i64)")
         self._emit("declare void @free(i8*)")
         self._emit("declare i32 @printf(i8*, ...)")
         self._emit("declare i32 @sprintf(i8*, i8*, ...)")
         self._emit("declare i32 @snprintf(i8*, i64, i8*, ...)")
-        self._emit("declare i64 @strlen(i8*)")
+        self._emit("declare i64 @strlen(i8*) nounwind readonly willreturn")
         self._emit("declare i8* @strcpy(i8*, i8*)")
         self._emit("declare i8* @strcat(i8*, i8*)")
         self._emit("declare i32 @strcmp(i8*, i8*)")
+        self._emit("declare void @llvm.memcpy.p0i8.p0i8.i64(i8*, i8*, i64, i1)")
         self._emit("")
         
         # String struct type
@@ -227,9 +228,8 @@ class CodeGenerator:
         
         # Generate struct fields
         fields = ["i8**"]  # vtable pointer
-        for name, field in class_type.fields.items():
-            llvm_type = self._get_llvm_type(field.field_type)
-            fields.append(llvm_type)
+        for name in class_type.field_names:
+            fields.append(self._get_llvm_type(class_type.fields[name].field_type))
         
         fields_str = ", ".join(fields)
         self._emit(f"%class.{decl.name} = type {{ {fields_str} }}")
@@ -246,27 +246,24 @@ class CodeGenerator:
         
         self._emit(f"; VTable for {decl.name}")
         
-        # Generate vtable type
+        # Each slot's function type serves both the vtable type and its
+        # initializer
         method_types = []
-        for method in class_type.vtable:
+        method_ptrs = []
+        for method, symbol in zip(class_type.vtable, class_type.vtable_symbols):
             ret_type = self._get_llvm_type(method.return_type)
             param_types = [f"%class.{decl.name}*"]  # this pointer
             param_types.extend(self._get_llvm_type(p) for p in method.param_types)
-            method_types.append(f"{ret_type} ({', '.join(param_types)})*")
+            func_type = f"{ret_type} ({', '.join(param_types)})*"
+            method_types.append(func_type)
+            method_ptrs.append(f"{func_type} {symbol}")
         
+        # Generate vtable type
         vtable_type = ", ".join(method_types)
         self._emit(f"%vtable.{decl.name} = type {{ {vtable_type} }}")
         
         # Generate vtable instance
-        method_ptrs = []
-        for method in class_type.vtable:
-            ret_type = self._get_llvm_type(method.return_type)
-            param_types = [f"%class.{decl.name}*"]
-            param_types.extend(self._get_llvm_type(p) for p in method.param_types)
-            func_type = f"{ret_type} ({', '.join(param_types)})*"
-            method_ptrs.append(f"{func_type} @{decl.name}_{method.name}")
-        
-        vtable_init = ", ".join(method_ptrs) if method_ptrs else ""
+        vtable_init = ", ".join(method_ptrs)
         self._emit(f"@vtable.{decl.name} = global %vtable.{decl.name} {{ {vtable_init} }}")
         self._emit("")
     
@@ -314,8 +311,8 @@ class CodeGenerator:
             self._emit(f"  store i8** %vtable, i8*** %vtable_ptr")
         
         # Initialize fields with default values
-        field_idx = 1  # Start after vtable
-        for name, field in class_type.fields.items():
+        for name, field_idx in class_type.field_slots.items():
+            field = class_type.fields[name]
             llvm_type = self._get_llvm_type(field.field_type)
             self._emit(f"  %field_{name}_ptr = getelementptr %class.{decl.name}, %class.{decl.name}* %this, i32 0, i32 {field_idx}")
             
@@ -325,7 +322,6 @@ class CodeGenerator:
             else:
                 init_val = self._get_default_value(field.field_type)
             self._emit(f"  store {llvm_type} {init_val}, {llvm_type}* %field_{name}_ptr")
-            field_idx += 1
         
         self._emit(f"  ret %class.{decl.name}* %this")
         self._emit("}")
@@ -341,8 +337,8 @@ class CodeGenerator:
         self._emit("entry:")
         
         # Free any pointer fields first (nested cleanup)
-        field_idx = 1
-        for name, field in class_type.fields.items():
+        for name, field_idx in class_type.field_slots.items():
+            field = class_type.fields[name]
             if field.field_type.is_pointer():
                 llvm_type = self._get_llvm_type(field.field_type)
                 self._emit(f"  ; Free field {name}")
@@ -355,7 +351,6 @@ class CodeGenerator:
                 self._emit(f"  call void @free(i8* %field_{name}_i8)")
                 self._emit(f"  br label %skip_free_{name}")
                 self._emit(f"skip_free_{name}:")
-            field_idx += 1
         
         # Free the object itself
         self._emit(f"  %this_i8 = bitcast %class.{decl.name}* %this to i8*")
@@ -371,9 +366,13 @@ class CodeGenerator:
         self.temp_counter = 0
         self.has_returned = False
         # Reset D-string tracking for this scope
-        self.dstring_var_refs = {}
+        self.dstring_codegen.registry = DStringRegistry()
         self.active_dstrings = {}
         self.dstring_variables = {}
+        self.dstring_codegen.pending_dirty = {}
+        self.dstring_codegen.pending_tables = {}
+        self.dstring_tables = {}
+        self.dirty_defer_depth = 0
         
         ret_type = self._get_llvm_type(self._resolve_type(method.return_type))
         
@@ -407,6 +406,8 @@ class CodeGenerator:
             self.local_vars[param.name] = f"%{param.name}.addr"
             self.local_var_types[param.name] = resolved_type
         
+        self._setup_dstring_tables(method.body)
+        
         # Generate method body
         if method.body:
             self._generate_block(method.body)
@@ -414,10 +415,10 @@ class CodeGenerator:
         # Add default return if needed (only if no explicit return)
         if not self.has_returned:
             if ret_type == "void":
-                self._emit("  ret void")
+                self._emit_terminator("  ret void", leaving_function=True)
             else:
                 default_val = self._get_default_value(self._resolve_type(method.return_type))
-                self._emit(f"  ret {ret_type} {default_val}")
+                self._emit_terminator(f"  ret {ret_type} {default_val}", leaving_function=True)
         
         self._emit("}")
         self._emit("")
@@ -431,9 +432,13 @@ class CodeGenerator:
         self.temp_counter = 0
         self.has_returned = False
         # Reset D-string tracking for this scope
-        self.dstring_var_refs = {}
+        self.dstring_codegen.registry = DStringRegistry()
         self.active_dstrings = {}
         self.dstring_variables = {}
+        self.dstring_codegen.pending_dirty = {}
+        self.dstring_codegen.pending_tables = {}
+        self.dstring_tables = {}
+        self.dirty_defer_depth = 0
         
         ret_type = self._get_llvm_type(self._resolve_type(func.return_type))
         
@@ -458,6 +463,8 @@ class CodeGenerator:
             self.local_vars[param.name] = f"%{param.name}.addr"
             self.local_var_types[param.name] = param_type
         
+        self._setup_dstring_tables(func.body)
+        
         # Generate function body
         if func.body:
             self._generate_block(func.body)
@@ -465,10 +472,10 @@ class CodeGenerator:
         # Add default return if needed (only if no explicit return)
         if not self.has_returned:
             if ret_type == "void":
-                self._emit("  ret void")
+                self._emit_terminator("  ret void", leaving_function=True)
             else:
                 default_val = self._get_default_value(self._resolve_type(func.return_type))
-                self._emit(f"  ret {ret_type} {default_val}")
+                self._emit_terminator(f"  ret {ret_type} {default_val}", leaving_function=True)
         
         self._emit("}")
         self._emit("")
@@ -540,9 +547,9 @@ class CodeGenerator:
             # Get return type from context
             ret_type = self._infer_type(stmt.value)
             llvm_type = self._get_llvm_type(ret_type) if ret_type else "i32"
-            self._emit(f"  ret {llvm_type} {value}")
+            self._emit_terminator(f"  ret {llvm_type} {value}", leaving_function=True)
         else:
-            self._emit("  ret void")
+            self._emit_terminator("  ret void", leaving_function=True)
     
     def _generate_if(self, stmt: IfStatement):
         """Generate if statement"""
@@ -553,20 +560,20 @@ class CodeGenerator:
         end_label = self._new_label("endif")
         
         if stmt.else_block:
-            self._emit(f"  br i1 {cond}, label %{then_label}, label %{else_label}")
+            self._emit_terminator(f"  br i1 {cond}, label %{then_label}, label %{else_label}")
         else:
-            self._emit(f"  br i1 {cond}, label %{then_label}, label %{end_label}")
+            self._emit_terminator(f"  br i1 {cond}, label %{then_label}, label %{end_label}")
         
         # Then block
         self._emit(f"{then_label}:")
         self._generate_block(stmt.then_block)
-        self._emit(f"  br label %{end_label}")
+        self._emit_terminator(f"  br label %{end_label}")
         
         # Else block
         if stmt.else_block:
             self._emit(f"{else_label}:")
             self._generate_block(stmt.else_block)
-            self._emit(f"  br label %{end_label}")
+            self._emit_terminator(f"  br label %{end_label}")
         
         self._emit(f"{end_label}:")
     
@@ -579,19 +586,21 @@ class CodeGenerator:
         # Push loop context for break/continue
         self.loop_stack.append((cond_label, end_label))
         
-        self._emit(f"  br label %{cond_label}")
+        self._emit_terminator(f"  br label %{cond_label}")
+        defer_marks = self._begin_dirty_defer(stmt)
         
         # Condition
         self._emit(f"{cond_label}:")
         cond = self._generate_expression(stmt.condition)
-        self._emit(f"  br i1 {cond}, label %{body_label}, label %{end_label}")
+        self._emit_terminator(f"  br i1 {cond}, label %{body_label}, label %{end_label}")
         
         # Body
         self._emit(f"{body_label}:")
         self._generate_block(stmt.body)
-        self._emit(f"  br label %{cond_label}")
+        self._emit_terminator(f"  br label %{cond_label}")
         
         self._emit(f"{end_label}:")
+        self._end_dirty_defer(defer_marks)
         
         # Pop loop context
         self.loop_stack.pop()
@@ -608,32 +617,34 @@ class CodeGenerator:
         self.loop_stack.append((update_label, end_label))
         
         # Init
-        self._emit(f"  br label %{init_label}")
+        self._emit_terminator(f"  br label %{init_label}")
+        defer_marks = self._begin_dirty_defer(stmt)
         self._emit(f"{init_label}:")
         if stmt.init:
             self._generate_statement(stmt.init)
-        self._emit(f"  br label %{cond_label}")
+        self._emit_terminator(f"  br label %{cond_label}")
         
         # Condition
         self._emit(f"{cond_label}:")
         if stmt.condition:
             cond = self._generate_expression(stmt.condition)
-            self._emit(f"  br i1 {cond}, label %{body_label}, label %{end_label}")
+            self._emit_terminator(f"  br i1 {cond}, label %{body_label}, label %{end_label}")
         else:
-            self._emit(f"  br label %{body_label}")
+            self._emit_terminator(f"  br label %{body_label}")
         
         # Body
         self._emit(f"{body_label}:")
         self._generate_block(stmt.body)
-        self._emit(f"  br label %{update_label}")
+        self._emit_terminator(f"  br label %{update_label}")
         
         # Update
         self._emit(f"{update_label}:")
         if stmt.update:
             self._generate_expression(stmt.update)
-        self._emit(f"  br label %{cond_label}")
+        self._emit_terminator(f"  br label %{cond_label}")
         
         self._emit(f"{end_label}:")
+        self._end_dirty_defer(defer_marks)
         
         # Pop loop context
         self.loop_stack.pop()
@@ -642,7 +653,7 @@ class CodeGenerator:
         """Generate break statement"""
         if self.loop_stack:
             _, break_label = self.loop_stack[-1]
-            self._emit(f"  br label %{break_label}")
+            self._emit_terminator(f"  br label %{break_label}")
         else:
             self._emit("  ; ERROR: break outside of loop")
     
@@ -650,7 +661,7 @@ class CodeGenerator:
         """Generate continue statement"""
         if self.loop_stack:
             continue_label, _ = self.loop_stack[-1]
-            self._emit(f"  br label %{continue_label}")
+            self._emit_terminator(f"  br label %{continue_label}")
         else:
             self._emit("  ; ERROR: continue outside of loop")
     
@@ -711,13 +722,123 @@ class CodeGenerator:
             self._generate_member_store(stmt.target, value)
     
     def _mark_dstrings_dirty_for_var(self, var_name: str):
-        """Mark all D-strings that reference this variable as dirty"""
-        if var_name in self.dstring_var_refs:
-            refs = self.dstring_var_refs[var_name]
-            for dstring_id, dstring_ptr in refs:
-                if dstring_id in self.active_dstrings:
-                    self._emit(f"  ; Mark D-string {dstring_id} dirty (var {var_name} changed)")
-                    self._emit(f"  call void @DString_markDirty(%DString* {self.active_dstrings[dstring_id]})")
+        """
+        Mark all D-strings that reference this variable as dirty.
+        
+        The marks are queued rather than emitted inline, so N writes to the
+        same variable within a block produce one mark per dependent D-string.
+        """
+        var_id = self.dstring_codegen.registry.lookup_var(var_name)
+        if var_id < 0:
+            return
+        tabled = ()
+        if var_name in self.dstring_tables:
+            table_ptr, capacity, tabled = self.dstring_tables[var_name]
+            self.dstring_codegen.queue_table_mark(var_name, table_ptr, capacity)
+        for entry in self.dstring_codegen.registry.iter_marks_for_var(var_id):
+            dstring_id = entry >> 32
+            if dstring_id in self.active_dstrings and dstring_id not in tabled:
+                self.dstring_codegen.queue_dirty_mark(dstring_id, self.active_dstrings[dstring_id])
+    
+    def _flush_dirty_marks(self, leaving_function: bool = False):
+        """Emit queued D-string dirty marks (before a read or a block terminator)"""
+        if self.dirty_defer_depth and not leaving_function:
+            return
+        keep_pending = self.dirty_defer_depth > 0
+        for line in self.dstring_codegen.flush_dirty_marks(keep_pending=keep_pending):
+            self._emit(line)
+    
+    def _emit_terminator(self, line: str, leaving_function: bool = False):
+        """Emit a block terminator, flushing queued dirty marks into the block first"""
+        self._flush_dirty_marks(leaving_function)
+        self._emit(line)
+    
+    def _begin_dirty_defer(self, loop: Statement) -> bool:
+        """
+        Start hoisting dirty marks out of a loop that never reads a D-string.
+        Writes inside such a loop only need their marks once, at the loop exit.
+        """
+        if self._may_read_dstring(loop):
+            return False
+        self.dirty_defer_depth += 1
+        return True
+    
+    def _end_dirty_defer(self, deferred: bool):
+        """Finish a loop started with _begin_dirty_defer (called at the exit label)"""
+        if not deferred:
+            return
+        self.dirty_defer_depth -= 1
+        self._flush_dirty_marks()
+    
+    # Variables referenced by at least this many D-strings get a dependents
+    # table, so each write marks them all with one DString_markAll call
+    DSTRING_TABLE_MIN_REFS = 4
+    
+    def _setup_dstring_tables(self, body: Optional[Block]):
+        """Allocate dependents tables (in the entry block) for heavily referenced variables"""
+        counts: Dict[str, int] = {}
+        self._count_dstring_refs(body, counts)
+        for var_name, count in counts.items():
+            if count >= self.DSTRING_TABLE_MIN_REFS:
+                table_ptr = f"%dstr.tbl.{var_name}"
+                self._emit(self.dstring_codegen.generate_dependents_table(table_ptr, count))
+                self.dstring_tables[var_name] = (table_ptr, count, [])
+    
+    def _count_dstring_refs(self, node, counts: Dict[str, int]):
+        """Count the D-string literals referencing each variable in a subtree"""
+        if node is None:
+            return
+        if isinstance(node, list):
+            for n in node:
+                self._count_dstring_refs(n, counts)
+            return
+        if isinstance(node, Literal):
+            if node.literal_type == "d_str":
+                for var_name in DStringParser.get_unique_variables(node.value):
+                    counts[var_name] = counts.get(var_name, 0) + 1
+            return
+        # Unknown nodes are skipped; D-strings missed here are marked individually
+        for f in self._DSTRING_SCAN_FIELDS.get(type(node), ()):
+            self._count_dstring_refs(getattr(node, f), counts)
+    
+    # Child attributes to scan when checking whether a subtree reads a D-string
+    _DSTRING_SCAN_FIELDS = {
+        Block: ("statements",),
+        ExpressionStatement: ("expression",),
+        ReturnStatement: ("value",),
+        VariableDeclaration: ("initial_value",),
+        IfStatement: ("condition", "then_block", "else_block"),
+        WhileStatement: ("condition", "body"),
+        ForStatement: ("init", "condition", "update", "body"),
+        ForEachStatement: ("collection", "body"),
+        PrintStatement: ("arguments",),
+        AssignmentStatement: ("target", "value"),
+        BinaryExpression: ("left", "right"),
+        UnaryExpression: ("operand",),
+        PointerExpression: ("operand",),
+        MemberAccess: ("object_expr",),
+        MethodCall: ("callee", "arguments"),
+        NewExpression: ("arguments",),
+        ArrayLiteral: ("elements",),
+        ArrayAccess: ("array", "index"),
+        BreakStatement: (),
+        ContinueStatement: (),
+    }
+    
+    def _may_read_dstring(self, node) -> bool:
+        """Check whether a subtree may call DString_get (conservative)"""
+        if node is None:
+            return False
+        if isinstance(node, list):
+            return any(self._may_read_dstring(n) for n in node)
+        if isinstance(node, Literal):
+            return node.literal_type == "d_str"
+        if isinstance(node, Identifier):
+            return node.name in self.dstring_variables
+        fields = self._DSTRING_SCAN_FIELDS.get(type(node))
+        if fields is None:
+            return True  # Unknown node: assume it reads
+        return any(self._may_read_dstring(getattr(node, f)) for f in fields)
     
     def _generate_expression(self, expr: Expression) -> str:
         """Generate code for an expression, return the result register"""
@@ -766,51 +887,32 @@ class CodeGenerator:
     
     def _generate_dstring_literal(self, format_string: str) -> str:
         """Generate code for a D-string literal with variable substitution"""
-        # Parse the format string to find variables
-        template, variables = DStringParser.parse(format_string)
-        
-        # Allocate a D-string ID
-        dstring_id = self.dstring_counter
-        self.dstring_counter += 1
-        
-        # Generate format string constant
-        format_len = len(template) + 1
-        escaped_template = template.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\0A')
-        const_name = f"@.dstr.fmt.{dstring_id}"
-        self.dstring_format_constants.append(
-            f'{const_name} = private unnamed_addr constant [{format_len} x i8] c"{escaped_template}\\00"'
-        )
-        
-        # Build variable info list
-        var_infos = []  # (var_name, llvm_ptr, type_code)
-        for var_name in variables:
+        # Collect the referenced variables that are in scope
+        var_refs = {}  # var_name -> (llvm_ptr, llvm_ptr_type, sinter_type_name)
+        for var_name in DStringParser.get_unique_variables(format_string):
             if var_name in self.local_vars:
-                var_ptr = self.local_vars[var_name]
                 var_type = self.local_var_types.get(var_name)
-                type_code = self._get_dstring_type_code(var_type)
-                var_infos.append((var_name, var_ptr, type_code))
-                
-                # Register this D-string as depending on this variable
-                if var_name not in self.dstring_var_refs:
-                    self.dstring_var_refs[var_name] = []
+                var_refs[var_name] = (
+                    self.local_vars[var_name],
+                    f"{self._get_llvm_type(var_type)}*",
+                    var_type.name if var_type else "int",
+                )
         
         # Generate D-string creation code
-        self._emit(f"  ; Create D-string {dstring_id}: {format_string[:30]}...")
-        self._emit(f"  %dstr_{dstring_id}_fmt = getelementptr [{format_len} x i8], [{format_len} x i8]* {const_name}, i32 0, i32 0")
-        self._emit(f"  %dstr_{dstring_id} = call %DString* @DString_create(i8* %dstr_{dstring_id}_fmt, i64 {format_len}, i32 {len(var_infos)})")
-        
-        # Set each variable reference
-        for idx, (var_name, var_ptr, type_code) in enumerate(var_infos):
-            self._emit(f"  ; D-string var {idx}: {var_name}")
-            # Cast the alloca pointer to i8*
-            self._emit(f"  %dstr_{dstring_id}_vptr_{idx} = bitcast i8* {var_ptr} to i8*")
-            self._emit(f"  call void @DString_setVar(%DString* %dstr_{dstring_id}, i32 {idx}, i8* %dstr_{dstring_id}_vptr_{idx}, i32 {type_code})")
-            
-            # Track this dependency
-            self.dstring_var_refs[var_name].append((dstring_id, f"%dstr_{dstring_id}"))
+        code, dstr_reg, dstring_id = self.dstring_codegen.generate_dstring_creation_auto(format_string, var_refs)
+        for line in code.split("\n"):
+            self._emit(line)
         
         # Store in active D-strings
-        self.active_dstrings[dstring_id] = f"%dstr_{dstring_id}"
+        self.active_dstrings[dstring_id] = dstr_reg
+        
+        # Record it in the dependents tables of its variables
+        for var_name in DStringParser.get_unique_variables(format_string):
+            if var_name in self.dstring_tables and var_name in var_refs:
+                table_ptr, capacity, tabled = self.dstring_tables[var_name]
+                if len(tabled) < capacity:
+                    self._emit(self.dstring_codegen.generate_table_store(table_ptr, len(tabled), dstr_reg))
+                    tabled.append(dstring_id)
         
         # Store the D-string pointer for later retrieval
         # We'll allocate storage and track this as a D-string variable
@@ -823,24 +925,11 @@ class CodeGenerator:
         self._last_dstring_id = dstring_id
         
         # Return current string value (for immediate use)
+        self._flush_dirty_marks()
         result = self._new_temp()
-        self._emit(f"  {result} = call i8* @DString_get(%DString* %dstr_{dstring_id})")
+        self._emit(self.dstring_codegen.generate_dstring_get(dstr_reg, result, hot=bool(self.loop_stack)))
         return result
     
-    def _get_dstring_type_code(self, sinter_type: Optional[SinterType]) -> int:
-        """Get the D-string variable type code for a Sinter type"""
-        if not sinter_type:
-            return 0  # INT by default
-        
-        type_map = {
-            "int": 0,      # DStringVarType.INT
-            "float": 1,    # DStringVarType.FLOAT
-            "double": 2,   # DStringVarType.DOUBLE
-            "boolean": 3,  # DStringVarType.BOOLEAN
-            "str": 4,      # DStringVarType.STRING
-        }
-        return type_map.get(sinter_type.name, 0)
-    
     def _generate_identifier(self, ident: Identifier) -> str:
         """Generate code for an identifier"""
         if ident.name in self.local_vars:
@@ -850,8 +939,9 @@ class CodeGenerator:
                 self._emit(f"  ; Load D-string variable '{ident.name}' (D-string {dstring_id})")
                 dstr_ptr = self._new_temp()
                 self._emit(f"  {dstr_ptr} = load %DString*, %DString** {dstr_ptr_alloca}")
+                self._flush_dirty_marks()
                 result = self._new_temp()
-                self._emit(f"  {result} = call i8* @DString_get(%DString* {dstr_ptr})")
+                self._emit(self.dstring_codegen.generate_dstring_get(dstr_ptr, result, hot=bool(self.loop_stack)))
                 return result
             
             ptr = self.local_vars[ident.name]
@@ -882,7 +972,7 @@ class CodeGenerator:
         self._emit(f"  {temp1} = load %class.{self.current_class.name}*, %class.{self.current_class.name}** {this_ptr}")
         
         # Get field index
-        field_idx = list(self.current_class.fields.keys()).index(name) + 1  # +1 for vtable
+        field_idx = self.current_class.field_slots[name]
         
         # Get field pointer
         temp2 = self._new_temp()
@@ -904,7 +994,7 @@ class CodeGenerator:
         self._emit(f"  {temp1} = load %class.{self.current_class.name}*, %class.{self.current_class.name}** {this_ptr}")
         
         # Get field index
-        field_idx = list(self.current_class.fields.keys()).index(name) + 1
+        field_idx = self.current_class.field_slots[name]
         
         # Get field pointer
         temp2 = self._new_temp()
@@ -981,10 +1071,13 @@ class CodeGenerator:
         buf = self._new_temp()
         self._emit(f"  {buf} = call i8* @malloc(i64 {buf_size})")
         
-        # Copy first string
-        self._emit(f"  call i8* @strcpy(i8* {buf}, i8* {left})")
-        # Concatenate second string
-        self._emit(f"  call i8* @strcat(i8* {buf}, i8* {right})")
+        # Copy both strings with their known lengths (the second with its terminator)
+        self._emit(f"  call void @llvm.memcpy.p0i8.p0i8.i64(i8* {buf}, i8* {left}, i64 {len1}, i1 false)")
+        tail = self._new_temp()
+        self._emit(f"  {tail} = getelementptr i8, i8* {buf}, i64 {len1}")
+        right_size = self._new_temp()
+        self._emit(f"  {right_size} = add i64 {len2}, 1")
+        self._emit(f"  call void @llvm.memcpy.p0i8.p0i8.i64(i8* {tail}, i8* {right}, i64 {right_size}, i1 false)")
         
         return buf
     
@@ -1018,11 +1111,13 @@ class CodeGenerator:
             if isinstance(expr.operand, Identifier) and expr.operand.name in self.local_vars:
                 ptr = self.local_vars[expr.operand.name]
                 self._emit(f"  store {llvm_type} {temp}, {llvm_type}* {ptr}")
+                self._mark_dstrings_dirty_for_var(expr.operand.name)
         elif expr.operator == "--":
             self._emit(f"  {temp} = sub {llvm_type} {operand}, 1")
             if isinstance(expr.operand, Identifier) and expr.operand.name in self.local_vars:
                 ptr = self.local_vars[expr.operand.name]
                 self._emit(f"  store {llvm_type} {temp}, {llvm_type}* {ptr}")
+                self._mark_dstrings_dirty_for_var(expr.operand.name)
         else:
             return operand
         
@@ -1045,7 +1140,7 @@ class CodeGenerator:
             field = actual_type.get_field(expr.member)
             if field:
                 llvm_type = self._get_llvm_type(field.field_type)
-                field_idx = list(actual_type.fields.keys()).index(expr.member) + 1
+                field_idx = actual_type.field_slots[expr.member]
                 
                 temp1 = self._new_temp()
                 self._emit(f"  {temp1} = getelementptr %class.{actual_type.name}, %class.{actual_type.name}* {obj}, i32 0, i32 {field_idx}")
@@ -1073,7 +1168,7 @@ class CodeGenerator:
             field = actual_type.get_field(expr.member)
             if field:
                 llvm_type = self._get_llvm_type(field.field_type)
-                field_idx = list(actual_type.fields.keys()).index(expr.member) + 1
+                field_idx = actual_type.field_slots[expr.member]
                 
                 temp1 = self._new_temp()
                 self._emit(f"  {temp1} = getelementptr %class.{actual_type.name}, %class.{actual_type.name}* {obj}, i32 0, i32 {field_idx}")
@@ -1083,7 +1178,7 @@ class CodeGenerator:
     def _generate_method_call(self, expr: MethodCall) -> str:
         """Generate code for a method call"""
         # Handle Class.new() constructor call
-        if isinstance(expr.callee, MemberAccess) and expr.callee.member == "new":
+        if expr.callee_kind == CALLEE_MEMBER and expr.callee.member == "new":
             if isinstance(expr.callee.object_expr, Identifier):
                 class_name = expr.callee.object_expr.name
                 temp = self._new_temp()
@@ -1091,7 +1186,7 @@ class CodeGenerator:
                 return temp
         
         # Regular method call
-        if isinstance(expr.callee, MemberAccess):
+        if expr.callee_kind == CALLEE_MEMBER:
             obj = self._generate_expression(expr.callee.object_expr)
             obj_type = self._infer_type(expr.callee.object_expr)
             
@@ -1130,7 +1225,7 @@ class CodeGenerator:
                             return temp
         
         # Function call
-        if isinstance(expr.callee, Identifier):
+        if expr.callee_kind == CALLEE_IDENTIFIER:
             func_name = expr.callee.name
             symbol = self.symbol_table.resolve(func_name)
             
@@ -1286,7 +1381,7 @@ class CodeGenerator:
                 return self.type_registry.get_or_create_pointer(class_type)
         
         elif isinstance(expr, MethodCall):
-            if isinstance(expr.callee, MemberAccess):
+            if expr.callee_kind == CALLEE_MEMBER:
                 if expr.callee.member == "new":
                     if isinstance(expr.callee.object_expr, Identifier):
                         class_type = self.type_registry.get(expr.callee.object_expr.name)
@@ -4,6 +4,7 @@ Tokenizes source code into a stream of tokens
 """
 
 import re
+import sys
 from enum import Enum
 from typing import List, Optional, Tuple
 
@@ -328,7 +329,9 @@ class Lexer:
             
             # Check for string literal
             if char in ['"', "'"]:
-                value = self.read_string()
+                # Interned so repeated literals share one object, which
+                # makes the codegen's string-constant dedup an identity hit
+                value = sys.intern(self.read_string())
                 self.tokens.append(Token(TokenType.STRING_LITERAL, value, start_line, start_col))
                 continue
             
@@ -346,7 +349,9 @@ class Lexer:
             
             # Check for identifiers and keywords
             if char.isalpha() or char == "_":
-                value = self.read_identifier_or_keyword()
+                # Interned so every node naming the same identifier shares
+                # one string and name-keyed dict lookups compare by identity
+                value = sys.intern(self.read_identifier_or_keyword())
                 token_type = self.KEYWORDS.get(value, TokenType.IDENTIFIER)
                 self.tokens.append(Token(token_type, value, start_line, start_col))
                 continue
@@ -3,6 +3,7 @@ Parser for Sinter Programming Language
 Builds an AST from a stream of tokens
 """
 
+import sys
 from typing import List, Optional
 from compiler.lexer.lexer import Token, TokenType
 from compiler.sinter_ast.nodes import (
@@ -79,7 +80,7 @@ class Parser:
             self.advance()
             base_type = base_type + "*"
         
-        return base_type
+        return sys.intern(base_type)
 
     def parse(self) -> Program:
         """Parse the entire program"""
@@ -356,11 +357,11 @@ class Parser:
         elif token.type == TokenType.BREAK:
             self.advance()
             self.expect(TokenType.SEMICOLON)
-            return BreakStatement()
+            return BreakStatement(token.line, token.column)
         elif token.type == TokenType.CONTINUE:
             self.advance()
             self.expect(TokenType.SEMICOLON)
-            return ContinueStatement()
+            return ContinueStatement(token.line, token.column)
         elif token.type == TokenType.PRINT:
             return self.parse_print_statement(newline=False)
         elif token.type == TokenType.PRINTLN:
@@ -369,11 +370,11 @@ class Parser:
             # Expression statement
             expr = self.parse_expression()
             self.expect(TokenType.SEMICOLON)
-            return ExpressionStatement(expr)
+            return ExpressionStatement(expr, token.line, token.column)
     
     def parse_for_statement(self) -> Statement:
         """Parse a for statement (traditional or for-each)"""
-        self.expect(TokenType.FOR)
+        for_token = self.expect(TokenType.FOR)
         self.expect(TokenType.LEFT_PAREN)
         
         # Check if it's a for-each: for (var x: Type in collection)
@@ -388,10 +389,12 @@ class Parser:
                 collection = self.parse_expression()
                 self.expect(TokenType.RIGHT_PAREN)
                 body = self.parse_block()
-                return ForEachStatement(var_name.value, var_type, collection, body)
+                return ForEachStatement(var_name.value, var_type, collection, body,
+                                        for_token.line, for_token.column)
             else:
                 # It's a regular for with var declaration
-                init = VariableDeclaration(var_name.value, var_type, None)
+                init = VariableDeclaration(var_name.value, var_type, None,
+                                           var_name.line, var_name.column)
                 if self.current_token() and self.current_token().type == TokenType.ASSIGN:
                     self.advance()
                     init.initial_value = self.parse_expression()
@@ -401,7 +404,7 @@ class Parser:
                 update = self.parse_expression() if self.current_token().type != TokenType.RIGHT_PAREN else None
                 self.expect(TokenType.RIGHT_PAREN)
                 body = self.parse_block()
-                return ForStatement(init, condition, update, body)
+                return ForStatement(init, condition, update, body, for_token.line, for_token.column)
         else:
             # Traditional for: for (init; condition; update)
             init = None
@@ -410,7 +413,7 @@ class Parser:
                 if isinstance(expr, AssignmentStatement):
                     init = expr
                 else:
-                    init = ExpressionStatement(expr)
+                    init = ExpressionStatement(expr, expr.line, expr.column)
             self.expect(TokenType.SEMICOLON)
             
             condition = None
@@ -424,11 +427,11 @@ class Parser:
             self.expect(TokenType.RIGHT_PAREN)
             
             body = self.parse_block()
-            return ForStatement(init, condition, update, body)
+            return ForStatement(init, condition, update, body, for_token.line, for_token.column)
     
     def parse_print_statement(self, newline: bool) -> PrintStatement:
         """Parse a print or println statement"""
-        self.advance()  # skip print/println
+        token = self.advance()  # skip print/println
         self.expect(TokenType.LEFT_PAREN)
         
         arguments = []
@@ -442,20 +445,20 @@ class Parser:
         
         self.expect(TokenType.RIGHT_PAREN)
         self.expect(TokenType.SEMICOLON)
-        return PrintStatement(arguments, newline)
+        return PrintStatement(arguments, newline, token.line, token.column)
 
     def parse_return_statement(self) -> ReturnStatement:
         """Parse a return statement"""
-        self.expect(TokenType.RETURN)
+        token = self.expect(TokenType.RETURN)
         value = None
         if self.current_token() and self.current_token().type != TokenType.SEMICOLON:
             value = self.parse_expression()
         self.expect(TokenType.SEMICOLON)
-        return ReturnStatement(value)
+        return ReturnStatement(value, token.line, token.column)
 
     def parse_if_statement(self) -> IfStatement:
         """Parse an if statement"""
-        self.expect(TokenType.IF)
+        token = self.expect(TokenType.IF)
         self.expect(TokenType.LEFT_PAREN)
         condition = self.parse_expression()
         self.expect(TokenType.RIGHT_PAREN)
@@ -466,20 +469,20 @@ class Parser:
             self.advance()
             else_block = self.parse_block()
         
-        return IfStatement(condition, then_block, else_block)
+        return IfStatement(condition, then_block, else_block, token.line, token.column)
 
     def parse_while_statement(self) -> WhileStatement:
         """Parse a while statement"""
-        self.expect(TokenType.WHILE)
+        token = self.expect(TokenType.WHILE)
         self.expect(TokenType.LEFT_PAREN)
         condition = self.parse_expression()
         self.expect(TokenType.RIGHT_PAREN)
         body = self.parse_block()
-        return WhileStatement(condition, body)
+        return WhileStatement(condition, body, token.line, token.column)
 
     def parse_variable_declaration(self) -> VariableDeclaration:
         """Parse a variable declaration"""
-        self.expect(TokenType.VAR)
+        token = self.expect(TokenType.VAR)
         name_token = self.expect(TokenType.IDENTIFIER, "Expected variable name")
         self.expect(TokenType.COLON)
         type_name = self.parse_type()
@@ -490,7 +493,7 @@ class Parser:
             initial_value = self.parse_expression()
         
         self.expect(TokenType.SEMICOLON)
-        return VariableDeclaration(name_token.value, type_name, initial_value)
+        return VariableDeclaration(name_token.value, type_name, initial_value, token.line, token.column)
 
     def parse_expression(self) -> Expression:
         """Parse an expression (using operator precedence)"""
@@ -503,7 +506,7 @@ class Parser:
         if self.current_token() and self.current_token().type == TokenType.ASSIGN:
             self.advance()
             right = self.parse_assignment()
-            return AssignmentStatement(left, right)
+            return AssignmentStatement(left, right, left.line, left.column)
         
         return left
 
@@ -514,7 +517,7 @@ class Parser:
         while self.current_token() and self.current_token().type == TokenType.OR:
             op_token = self.advance()
             right = self.parse_logical_and()
-            left = BinaryExpression(left, op_token.value, right)
+            left = BinaryExpression(left, op_token.value, right, op_token.line, op_token.column)
         
         return left
 
@@ -525,7 +528,7 @@ class Parser:
         while self.current_token() and self.current_token().type == TokenType.AND:
             op_token = self.advance()
             right = self.parse_equality()
-            left = BinaryExpression(left, op_token.value, right)
+            left = BinaryExpression(left, op_token.value, right, op_token.line, op_token.column)
         
         return left
 
@@ -536,7 +539,7 @@ class Parser:
         while self.current_token() and self.current_token().type in [TokenType.EQUALS, TokenType.NOT_EQUALS]:
             op_token = self.advance()
             right = self.parse_relational()
-            left = BinaryExpression(left, op_token.value, right)
+            left = BinaryExpression(left, op_token.value, right, op_token.line, op_token.column)
         
         return left
 
@@ -550,7 +553,7 @@ class Parser:
         ]:
             op_token = self.advance()
             right = self.parse_additive()
-            left = BinaryExpression(left, op_token.value, right)
+            left = BinaryExpression(left, op_token.value, right, op_token.line, op_token.column)
         
         return left
 
@@ -561,7 +564,7 @@ class Parser:
         while self.current_token() and self.current_token().type in [TokenType.PLUS, TokenType.MINUS]:
             op_token = self.advance()
             right = self.parse_multiplicative()
-            left = BinaryExpression(left, op_token.value, right)
+            left = BinaryExpression(left, op_token.value, right, op_token.line, op_token.column)
         
         return left
 
@@ -574,7 +577,7 @@ class Parser:
         ]:
             op_token = self.advance()
             right = self.parse_unary()
-            left = BinaryExpression(left, op_token.value, right)
+            left = BinaryExpression(left, op_token.value, right, op_token.line, op_token.column)
         
         return left
 
@@ -585,7 +588,7 @@ class Parser:
         if token and token.type in [TokenType.NOT, TokenType.MINUS, TokenType.DEREFERENCE, TokenType.ADDRESS_OF]:
             self.advance()
             operand = self.parse_unary()
-            return UnaryExpression(token.value, operand)
+            return UnaryExpression(token.value, operand, token.line, token.column)
         
         return self.parse_postfix()
 
@@ -604,10 +607,10 @@ class Parser:
                 member_token = self.current_token()
                 if member_token and member_token.type == TokenType.NEW:
                     self.advance()
-                    expr = MemberAccess(expr, "new")
+                    expr = MemberAccess(expr, "new", expr.line, expr.column)
                 elif member_token and member_token.type == TokenType.IDENTIFIER:
                     self.advance()
-                    expr = MemberAccess(expr, member_token.value)
+                    expr = MemberAccess(expr, member_token.value, expr.line, expr.column)
                 else:
                     raise SyntaxError(f"Expected member name at line {member_token.line if member_token else '?'}, column {member_token.column if member_token else '?'}")
             elif token.type == TokenType.LEFT_PAREN:
@@ -621,16 +624,16 @@ class Parser:
                         else:
                             break
                 self.expect(TokenType.RIGHT_PAREN)
-                expr = MethodCall(expr, arguments)
+                expr = MethodCall(expr, arguments, expr.line, expr.column)
             elif token.type == TokenType.LEFT_BRACKET:
                 # Array access
                 self.advance()
                 index = self.parse_expression()
                 self.expect(TokenType.RIGHT_BRACKET)
-                expr = ArrayAccess(expr, index)
+                expr = ArrayAccess(expr, index, expr.line, expr.column)
             elif token.type == TokenType.INCREMENT or token.type == TokenType.DECREMENT:
                 self.advance()
-                expr = UnaryExpression(token.value, expr)
+                expr = UnaryExpression(token.value, expr, expr.line, expr.column)
             else:
                 break
         
@@ -649,31 +652,31 @@ class Parser:
         
         elif token.type == TokenType.INTEGER_LITERAL:
             self.advance()
-            return Literal(int(token.value), "int")
+            return Literal(int(token.value), "int", token.line, token.column)
         
         elif token.type == TokenType.FLOAT_LITERAL:
             self.advance()
-            return Literal(float(token.value), "float")
+            return Literal(float(token.value), "float", token.line, token.column)
         
         elif token.type == TokenType.STRING_LITERAL:
             self.advance()
-            return Literal(token.value, "str")
+            return Literal(token.value, "str", token.line, token.column)
         
         elif token.type == TokenType.D_STRING_LITERAL:
             self.advance()
-            return Literal(token.value, "d_str")
+            return Literal(token.value, "d_str", token.line, token.column)
         
         elif token.type == TokenType.TRUE:
             self.advance()
-            return Literal(True, "boolean")
+            return Literal(True, "boolean", token.line, token.column)
         
         elif token.type == TokenType.FALSE:
             self.advance()
-            return Literal(False, "boolean")
+            return Literal(False, "boolean", token.line, token.column)
         
         elif token.type == TokenType.NULL:
             self.advance()
-            return Literal(None, "null")
+            return Literal(None, "null", token.line, token.column)
         
         elif token.type == TokenType.NEW:
             return self.parse_new_expression()
@@ -696,14 +699,14 @@ class Parser:
                     else:
                         break
             self.expect(TokenType.RIGHT_BRACKET)
-            return ArrayLiteral(elements)
+            return ArrayLiteral(elements, token.line, token.column)
         
         else:
             raise SyntaxError(f"Unexpected token in expression: {token.type.name}")
 
     def parse_new_expression(self) -> NewExpression:
         """Parse a 'new' expression"""
-        self.expect(TokenType.NEW)
+        token = self.expect(TokenType.NEW)
         class_token = self.expect(TokenType.IDENTIFIER, "Expected class name")
         
         type_arguments = []
@@ -727,4 +730,4 @@ class Parser:
                     break
         self.expect(TokenType.RIGHT_PAREN)
         
-        return NewExpression(class_token.value, type_arguments, arguments)
+        return NewExpression(class_token.value, type_arguments, arguments, token.line, token.column)
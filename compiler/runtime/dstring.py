@@ -12,7 +12,9 @@ any referenced variable changes value. Example:
     println(msg);  // "Count is 5" (auto-updated!)
 """
 
-from typing import Dict, List, Tuple, Set, Optional
+from typing import Dict, Iterator, List, Tuple, Set, Optional
+from array import array
+import hashlib
 import re
 
 
@@ -69,23 +71,51 @@ class DStringRegistry:
     """
     
     def __init__(self):
-        # Map: variable_name -> list of (dstring_id, dstring_llvm_ptr)
-        self.var_to_dstrings: Dict[str, List[Tuple[int, str]]] = {}
+        # Variable names are interned to dense ids; each id owns a flat
+        # array of packed (dstring_id << 32 | slot) entries, where slot is
+        # the variable's index in that D-string.
+        self._var_id: Dict[str, int] = {}
+        self._by_var: List[array] = []
+        # Map: dstring_id -> dstring_llvm_ptr
+        self.dstring_ptrs: Dict[int, str] = {}
         # Map: dstring_id -> list of variable names
         self.dstring_vars: Dict[int, List[str]] = {}
         self.next_id = 0
     
+    def intern_var(self, var_name: str) -> int:
+        """Get the dense id for a variable name, allocating one if needed"""
+        var_id = self._var_id.get(var_name)
+        if var_id is None:
+            var_id = len(self._by_var)
+            self._var_id[var_name] = var_id
+            self._by_var.append(array("q"))
+        return var_id
+    
+    def lookup_var(self, var_name: str) -> int:
+        """Get the dense id for a variable name, or -1 if no D-string uses it"""
+        return self._var_id.get(var_name, -1)
+    
     def register_dstring(self, dstring_id: int, dstring_ptr: str, variables: List[str]):
         """Register a D-string and its variable dependencies"""
         self.dstring_vars[dstring_id] = variables
-        for var in variables:
-            if var not in self.var_to_dstrings:
-                self.var_to_dstrings[var] = []
-            self.var_to_dstrings[var].append((dstring_id, dstring_ptr))
+        self.dstring_ptrs[dstring_id] = dstring_ptr
+        for slot, var in enumerate(variables):
+            self._by_var[self.intern_var(var)].append(dstring_id << 32 | slot)
+    
+    def iter_marks_for_var(self, var_id: int) -> Iterator[int]:
+        """
+        Iterate the packed (dstring_id << 32 | slot) entries for a variable id.
+        Unpack with `entry >> 32` and `entry & 0xFFFFFFFF`.
+        """
+        if 0 <= var_id < len(self._by_var):
+            return iter(self._by_var[var_id])
+        return iter(())
     
     def get_dstrings_for_var(self, var_name: str) -> List[Tuple[int, str]]:
         """Get all D-strings that reference a variable"""
-        return self.var_to_dstrings.get(var_name, [])
+        ptrs = self.dstring_ptrs
+        return [(entry >> 32, ptrs[entry >> 32])
+                for entry in self.iter_marks_for_var(self.lookup_var(var_name))]
     
     def allocate_id(self) -> int:
         """Allocate a new D-string ID"""
@@ -101,6 +131,14 @@ class DStringCodeGen:
         self.dstring_counter = 0
         self.format_strings: Dict[int, Tuple[str, int]] = {}  # id -> (format, length)
         self.registry = DStringRegistry()
+        # Interned format templates: (escaped, length) -> constant name
+        self._fmt_intern: Dict[Tuple[str, int], str] = {}
+        self.format_constants: List[str] = []  # Definitions to emit, one per template
+        # Dirty marks deferred until the next read or block terminator.
+        # Maps dstring_ptr -> dstring_id; insertion order follows the writes.
+        self.pending_dirty: Dict[str, int] = {}
+        # Dependents-table marks, same deferral: table_ptr -> (var_name, capacity)
+        self.pending_tables: Dict[str, Tuple[str, int]] = {}
     
     def get_registry(self) -> DStringRegistry:
         """Get the D-string registry for variable tracking"""
@@ -135,9 +173,9 @@ entry:
     %dstr_mem = call i8* @malloc(i64 64)
     %dstr = bitcast i8* %dstr_mem to %DString*
     
-    ; Copy format string (we own it)
+    ; Copy format string (we own it); format_len includes the terminator
     %format_buf = call i8* @malloc(i64 %format_len)
-    call i8* @strcpy(i8* %format_buf, i8* %format)
+    call void @llvm.memcpy.p0i8.p0i8.i64(i8* %format_buf, i8* %format, i64 %format_len, i1 false)
     
     ; Store format string
     %fmt_ptr = getelementptr %DString, %DString* %dstr, i32 0, i32 0
@@ -211,6 +249,36 @@ entry:
     ret void
 }
 
+; Mark every D-string in a dependents table dirty (null slots are skipped)
+; Used when a variable has enough dependents that one call beats K calls
+define void @DString_markAll(%DString** %tbl, i32 %n) {
+entry:
+    br label %loop
+
+loop:
+    %i = phi i32 [ 0, %entry ], [ %next, %advance ]
+    %done = icmp sge i32 %i, %n
+    br i1 %done, label %exit, label %body
+
+body:
+    %slot = getelementptr %DString*, %DString** %tbl, i32 %i
+    %dstr = load %DString*, %DString** %slot
+    %is_null = icmp eq %DString* %dstr, null
+    br i1 %is_null, label %advance, label %mark
+
+mark:
+    %dirty_ptr = getelementptr %DString, %DString* %dstr, i32 0, i32 7
+    store i1 1, i1* %dirty_ptr
+    br label %advance
+
+advance:
+    %next = add i32 %i, 1
+    br label %loop
+
+exit:
+    ret void
+}
+
 ; Convert an integer to string (helper)
 define i8* @DString_itoa(i32 %val) {
 entry:
@@ -248,14 +316,28 @@ false_case:
 
 ; Get the current string value (regenerates if dirty)
 ; This is the core D-string magic!
+; Reads are overwhelmingly clean, so the dirty branch is weighted as
+; unlikely and the rebuild lives out of line in DString_regenerate.
 define i8* @DString_get(%DString* %dstr) {
 entry:
     ; Check dirty flag
     %dirty_ptr = getelementptr %DString, %DString* %dstr, i32 0, i32 7
     %dirty = load i1, i1* %dirty_ptr
-    br i1 %dirty, label %regenerate, label %return_cached
+    br i1 %dirty, label %regenerate, label %return_cached, !prof !{!"branch_weights", i32 1, i32 1000}
 
 regenerate:
+    call void @DString_regenerate(%DString* %dstr)
+    br label %return_cached
+
+return_cached:
+    %cache_ptr = getelementptr %DString, %DString* %dstr, i32 0, i32 2
+    %result = load i8*, i8** %cache_ptr
+    ret i8* %result
+}
+
+; Rebuild the cached string of a dirty D-string and clear the dirty flag
+define void @DString_regenerate(%DString* %dstr) cold noinline {
+entry:
     ; Free old cache if exists
     %cache_ptr = getelementptr %DString, %DString* %dstr, i32 0, i32 2
     %old_cache = load i8*, i8** %cache_ptr
@@ -283,7 +365,9 @@ do_regen:
     br i1 %has_vars, label %substitute_vars, label %copy_format
 
 copy_format:
-    call i8* @strcpy(i8* %result_buf, i8* %format)
+    %fmt_len_ptr = getelementptr %DString, %DString* %dstr, i32 0, i32 1
+    %format_len = load i64, i64* %fmt_len_ptr
+    call void @llvm.memcpy.p0i8.p0i8.i64(i8* %result_buf, i8* %format, i64 %format_len, i1 false)
     br label %store_result
 
 substitute_vars:
@@ -308,18 +392,16 @@ store_result:
     store i64 %result_len, i64* %cache_len_ptr
     
     ; Clear dirty flag
+    %dirty_ptr = getelementptr %DString, %DString* %dstr, i32 0, i32 7
     store i1 0, i1* %dirty_ptr
     
-    br label %return_cached
-
-return_cached:
-    %final_cache_ptr = getelementptr %DString, %DString* %dstr, i32 0, i32 2
-    %result = load i8*, i8** %final_cache_ptr
-    ret i8* %result
+    ret void
 }
 
 ; Substitute variables into format string
 ; This handles the actual {var} -> value replacement
+; The scan position, output position and variable index are SSA values
+; threaded through phi nodes, so the function needs no stack slots.
 define void @DString_substitute(%DString* %dstr, i8* %output) {
 entry:
     ; Get format
@@ -336,22 +418,17 @@ entry:
     %var_types_ptr = getelementptr %DString, %DString* %dstr, i32 0, i32 5
     %var_types = load i32*, i32** %var_types_ptr
     
-    ; Initialize output position
-    %out_pos = alloca i64
-    store i64 0, i64* %out_pos
-    
-    ; Variable index for substitution
-    %var_idx = alloca i32
-    store i32 0, i32* %var_idx
-    
-    ; Scan through format string
-    %fmt_len = call i64 @strlen(i8* %format)
-    %i = alloca i64
-    store i64 0, i64* %i
+    ; Scan through format string (the stored length counts the terminator)
+    %fmt_size_ptr = getelementptr %DString, %DString* %dstr, i32 0, i32 1
+    %fmt_size = load i64, i64* %fmt_size_ptr
+    %fmt_len = sub i64 %fmt_size, 1
     br label %loop_start
 
 loop_start:
-    %curr_i = load i64, i64* %i
+    ; Input position, output position and next variable index
+    %curr_i = phi i64 [ 0, %entry ], [ %skip_i, %skip_free ], [ %new_i, %copy_char ]
+    %out_pos = phi i64 [ 0, %entry ], [ %new_out_pos, %skip_free ], [ %new_out_pos2, %copy_char ]
+    %var_idx = phi i32 [ 0, %entry ], [ %new_var_idx, %skip_free ], [ %var_idx, %copy_char ]
     %done = icmp sge i64 %curr_i, %fmt_len
     br i1 %done, label %loop_end, label %loop_body
 
@@ -377,32 +454,29 @@ check_s_char:
     br i1 %is_s, label %do_substitute, label %copy_char
 
 do_substitute:
-    ; Get current variable index
-    %curr_var_idx = load i32, i32* %var_idx
-    %var_in_range = icmp slt i32 %curr_var_idx, %var_count
+    ; Check the current variable index is in range
+    %var_in_range = icmp slt i32 %var_idx, %var_count
     br i1 %var_in_range, label %substitute_var, label %skip_percent_s
 
 substitute_var:
     ; Get variable pointer
-    %var_ptr_slot = getelementptr i8*, i8** %var_ptrs, i32 %curr_var_idx
+    %var_ptr_slot = getelementptr i8*, i8** %var_ptrs, i32 %var_idx
     %var_ptr = load i8*, i8** %var_ptr_slot
     
     ; Get variable type
-    %type_slot = getelementptr i32, i32* %var_types, i32 %curr_var_idx
+    %type_slot = getelementptr i32, i32* %var_types, i32 %var_idx
     %var_type = load i32, i32* %type_slot
     
     ; Convert to string based on type
     %str_val = call i8* @DString_varToString(i8* %var_ptr, i32 %var_type)
     
-    ; Copy string value to output
-    %curr_out_pos = load i64, i64* %out_pos
-    %out_ptr = getelementptr i8, i8* %output, i64 %curr_out_pos
-    call i8* @strcpy(i8* %out_ptr, i8* %str_val)
+    ; Copy string value to output (the terminator is written at the end)
+    %str_len = call i64 @strlen(i8* %str_val)
+    %out_ptr = getelementptr i8, i8* %output, i64 %out_pos
+    call void @llvm.memcpy.p0i8.p0i8.i64(i8* %out_ptr, i8* %str_val, i64 %str_len, i1 false)
     
     ; Update output position
-    %str_len = call i64 @strlen(i8* %str_val)
-    %new_out_pos = add i64 %curr_out_pos, %str_len
-    store i64 %new_out_pos, i64* %out_pos
+    %new_out_pos = add i64 %out_pos, %str_len
     
     ; Free temp string if it was allocated (not for booleans)
     %is_bool = icmp eq i32 %var_type, 3
@@ -417,13 +491,9 @@ do_free:
     br label %skip_free
 
 skip_free:
-    ; Increment variable index
-    %new_var_idx = add i32 %curr_var_idx, 1
-    store i32 %new_var_idx, i32* %var_idx
-    
-    ; Skip the %s in format
+    ; Advance to the next variable and skip the %s in format
+    %new_var_idx = add i32 %var_idx, 1
     %skip_i = add i64 %curr_i, 2
-    store i64 %skip_i, i64* %i
     br label %loop_start
 
 skip_percent_s:
@@ -432,23 +502,17 @@ skip_percent_s:
 
 copy_char:
     ; Copy single character
-    %curr_out_pos2 = load i64, i64* %out_pos
-    %out_char_ptr = getelementptr i8, i8* %output, i64 %curr_out_pos2
+    %out_char_ptr = getelementptr i8, i8* %output, i64 %out_pos
     store i8 %char, i8* %out_char_ptr
     
-    ; Increment output position
-    %new_out_pos2 = add i64 %curr_out_pos2, 1
-    store i64 %new_out_pos2, i64* %out_pos
-    
-    ; Increment input position
+    ; Advance output and input positions
+    %new_out_pos2 = add i64 %out_pos, 1
     %new_i = add i64 %curr_i, 1
-    store i64 %new_i, i64* %i
     br label %loop_start
 
 loop_end:
     ; Null terminate
-    %final_out_pos = load i64, i64* %out_pos
-    %null_ptr = getelementptr i8, i8* %output, i64 %final_out_pos
+    %null_ptr = getelementptr i8, i8* %output, i64 %out_pos
     store i8 0, i8* %null_ptr
     ret void
 }
@@ -560,7 +624,8 @@ free_arrays:
         return type_map.get(type_name, DStringVarType.INT)
 
     def generate_dstring_creation(self, dstring_id: int, format_template: str, 
-                                   var_infos: List[Tuple[str, str, int]]) -> Tuple[str, str]:
+                                   var_infos: List[Tuple[str, str, int]],
+                                   var_ptr_types: Optional[List[str]] = None) -> Tuple[str, str]:
         """
         Generate code to create a D-string.
         
@@ -568,16 +633,16 @@ free_arrays:
             dstring_id: Unique ID for this D-string
             format_template: Format string with %s placeholders
             var_infos: List of (var_name, llvm_var_ptr, var_type_code)
+            var_ptr_types: LLVM pointer type of each llvm_var_ptr (default i8*)
         
         Returns:
             (code, result_register)
         """
         lines = []
         var_count = len(var_infos)
-        format_len = len(format_template) + 1  # +1 for null terminator
         
-        # Create format string constant name
-        const_name = f"@.dstr.fmt.{dstring_id}"
+        # Shared format string constant for this template
+        const_name, format_len = self.intern_format_string(format_template)
         
         lines.append(f"  ; Create D-string {dstring_id} with {var_count} variables")
         lines.append(f"  %dstr_{dstring_id}_fmt_ptr = getelementptr [{format_len} x i8], [{format_len} x i8]* {const_name}, i32 0, i32 0")
@@ -585,26 +650,129 @@ free_arrays:
         
         # Set each variable reference
         for idx, (var_name, var_ptr, var_type) in enumerate(var_infos):
+            ptr_type = var_ptr_types[idx] if var_ptr_types else "i8*"
             lines.append(f"  ; Set variable {idx}: {var_name}")
-            lines.append(f"  %dstr_{dstring_id}_var_{idx}_ptr = bitcast i8* {var_ptr} to i8*")
+            lines.append(f"  %dstr_{dstring_id}_var_{idx}_ptr = bitcast {ptr_type} {var_ptr} to i8*")
             lines.append(f"  call void @DString_setVar(%DString* %dstr_{dstring_id}, i32 {idx}, i8* %dstr_{dstring_id}_var_{idx}_ptr, i32 {var_type})")
         
         return "\n".join(lines), f"%dstr_{dstring_id}"
 
-    def generate_format_string_constant(self, dstring_id: int, format_template: str) -> str:
-        """Generate the format string constant for a D-string"""
+    def generate_dstring_creation_auto(self, format_string: str,
+                                       var_refs: Dict[str, Tuple[str, str, str]]) -> Tuple[str, str, int]:
+        """
+        Generate code to create a D-string from its source text, allocating the ID.
+        
+        Args:
+            format_string: D-string contents with {var} references
+            var_refs: var_name -> (llvm_var_ptr, llvm_ptr_type, sinter_type_name)
+                      for the variables in scope; unknown names are skipped
+        
+        Returns:
+            (code, result_register, dstring_id)
+        """
+        template, variables = DStringParser.parse(format_string)
+        dstring_id = self.dstring_counter
+        self.dstring_counter += 1
+        
+        var_infos = []
+        var_ptr_types = []
+        for var_name in variables:
+            if var_name in var_refs:
+                var_ptr, ptr_type, type_name = var_refs[var_name]
+                var_infos.append((var_name, var_ptr, self.get_var_type_code(type_name)))
+                var_ptr_types.append(ptr_type)
+        
+        code, result = self.generate_dstring_creation(dstring_id, template, var_infos, var_ptr_types)
+        self.registry.register_dstring(dstring_id, result, [name for name, _, _ in var_infos])
+        return code, result, dstring_id
+
+    def intern_format_string(self, format_template: str) -> Tuple[str, int]:
+        """
+        Get the constant holding a format template, creating it on first use.
+        
+        D-strings with the same template share one constant. The name is
+        derived from the content and the constant is linkonce_odr, so the
+        linker also folds identical templates across modules.
+        
+        Returns (const_name, length)
+        """
         # Escape the format string for LLVM
-        escaped = format_template.replace("\\", "\\\\").replace('"', '\\"')
+        escaped = format_template.replace("\\", "\\5C").replace('"', "\\22").replace("\n", "\\0A")
         length = len(format_template) + 1  # +1 for null terminator
         
-        # Convert to LLVM string constant format
-        const_name = f"@.dstr.fmt.{dstring_id}"
-        return f'{const_name} = private unnamed_addr constant [{length} x i8] c"{escaped}\\00"'
+        key = (escaped, length)
+        const_name = self._fmt_intern.get(key)
+        if const_name is None:
+            digest = hashlib.sha1(escaped.encode("utf-8")).hexdigest()[:16]
+            const_name = f"@.dstr.fmt.{digest}"
+            self._fmt_intern[key] = const_name
+            self.format_constants.append(
+                f'{const_name} = linkonce_odr unnamed_addr constant [{length} x i8] c"{escaped}\\00"'
+            )
+        return const_name, length
+
+    def generate_format_string_constants(self) -> str:
+        """Generate the definitions of all interned format string constants"""
+        return "\n".join(self.format_constants)
 
     def generate_dirty_mark(self, dstring_ptr: str) -> str:
         """Generate code to mark a D-string as dirty"""
         return f"  call void @DString_markDirty(%DString* {dstring_ptr})"
 
-    def generate_dstring_get(self, dstring_ptr: str, result_reg: str) -> str:
-        """Generate code to get the current value of a D-string"""
-        return f"  {result_reg} = call i8* @DString_get(%DString* {dstring_ptr})"
+    def queue_dirty_mark(self, dstring_id: int, dstring_ptr: str):
+        """
+        Defer marking a D-string dirty until the next flush point.
+        Repeated writes to the same variable coalesce into a single mark.
+        """
+        if dstring_ptr not in self.pending_dirty:
+            self.pending_dirty[dstring_ptr] = dstring_id
+
+    def generate_dependents_table(self, table_ptr: str, capacity: int) -> str:
+        """Generate a zeroed stack table for the D-strings depending on one variable"""
+        table_type = f"[{capacity} x %DString*]"
+        return (f"  {table_ptr}.arr = alloca {table_type}\n"
+                f"  store {table_type} zeroinitializer, {table_type}* {table_ptr}.arr\n"
+                f"  {table_ptr} = bitcast {table_type}* {table_ptr}.arr to %DString**")
+
+    def generate_table_store(self, table_ptr: str, slot: int, dstring_ptr: str) -> str:
+        """Generate code to record a D-string in slot `slot` of a dependents table"""
+        slot_ptr = f"{table_ptr}.{slot}"
+        return (f"  {slot_ptr} = getelementptr %DString*, %DString** {table_ptr}, i32 {slot}\n"
+                f"  store %DString* {dstring_ptr}, %DString** {slot_ptr}")
+
+    def generate_table_mark(self, table_ptr: str, capacity: int) -> str:
+        """Generate code to mark every D-string in a dependents table dirty"""
+        return f"  call void @DString_markAll(%DString** {table_ptr}, i32 {capacity})"
+
+    def queue_table_mark(self, var_name: str, table_ptr: str, capacity: int):
+        """Defer marking all dependents of a variable, like queue_dirty_mark"""
+        if table_ptr not in self.pending_tables:
+            self.pending_tables[table_ptr] = (var_name, capacity)
+
+    def flush_dirty_marks(self, keep_pending: bool = False) -> List[str]:
+        """
+        Generate one dirty mark per pending D-string or dependents table.
+        
+        Called before a DString_get, a block terminator, or a loop exit.
+        With keep_pending the marks stay queued (used for early returns
+        out of a loop whose marks are hoisted to the loop exit).
+        """
+        lines = []
+        for table_ptr, (var_name, capacity) in self.pending_tables.items():
+            lines.append(f"  ; Mark all D-strings referencing '{var_name}' dirty")
+            lines.append(self.generate_table_mark(table_ptr, capacity))
+        for dstring_ptr, dstring_id in self.pending_dirty.items():
+            lines.append(f"  ; Mark D-string {dstring_id} dirty")
+            lines.append(self.generate_dirty_mark(dstring_ptr))
+        if not keep_pending:
+            self.pending_dirty = {}
+            self.pending_tables = {}
+        return lines
+
+    def generate_dstring_get(self, dstring_ptr: str, result_reg: str, hot: bool = False) -> str:
+        """
+        Generate code to get the current value of a D-string.
+        Hot call sites (e.g. inside loops) ask for DString_get to be inlined.
+        """
+        attrs = " alwaysinline" if hot else ""
+        return f"  {result_reg} = call i8* @DString_get(%DString* {dstring_ptr}){attrs}"
@@ -10,13 +10,55 @@ from compiler.sinter_types.types import (
 )
 
 
+# Sinter type name -> LLVM type of a serialized field (anything else is i32)
+_LLVM_TYPE_MAP = {
+    "int": "i32",
+    "float": "float",
+    "double": "double",
+    "boolean": "i1",
+    "byte": "i8",
+    "short": "i16",
+    "long": "i64",
+    "str": "i8*",
+}
+
+
 class SerializationCodeGen:
     """Generates serialization code for Sinter classes"""
     
+    # Longest formatted value written for each fixed-width field type, without
+    # terminator (e.g. "-2147483648" for int). str values are measured at
+    # runtime instead (see STR_EXPANSION). Other types have no value emitter:
+    # JSON writes null for them and XML leaves the element empty.
+    VALUE_WIDTHS = {
+        "int": 11,
+        "byte": 4,
+        "short": 6,
+        "long": 20,
+        "float": 15,   # %.9g
+        "double": 24,  # %.17g
+        "boolean": 5,
+    }
+    
+    # Most bytes one character of a str value escapes to, per format
+    # ("\u00XX" for a control character in JSON, "&amp;" for "&" in XML)
+    STR_EXPANSION = {"json": 6, "xml": 5}
+    # Bytes a str value adds besides its characters (JSON's quotes, or null)
+    STR_OVERHEAD = {"json": 4, "xml": 0}
+    # Bytes written for a value with no emitter (JSON's null)
+    FALLBACK_WIDTH = {"json": 4, "xml": 0}
+    
+    # Stands in for the class name in cached serializer templates
+    CLASS_PLACEHOLDER = "{CLASS}"
+    
+    # Attribute group shared by every function defined here (declared once
+    # in generate_runtime_declarations)
+    FN_ATTRS = "#0"
+    
     def __init__(self, type_registry: TypeRegistry):
         self.type_registry = type_registry
-        self.json_buffer_size = 4096
-        self.xml_buffer_size = 8192
+        # Serializer IR per field shape, with the class name left as CLASS_PLACEHOLDER
+        self._template_cache: Dict[Tuple, str] = {}
     
     def generate_runtime_declarations(self) -> str:
         """Generate runtime function declarations for serialization"""
@@ -35,206 +77,641 @@ class SerializationCodeGen:
 @.json.true = private unnamed_addr constant [5 x i8] c"true\\00"
 @.json.false = private unnamed_addr constant [6 x i8] c"false\\00"
 @.json.int_fmt = private unnamed_addr constant [3 x i8] c"%d\\00"
-@.json.float_fmt = private unnamed_addr constant [3 x i8] c"%f\\00"
+@.json.long_fmt = private unnamed_addr constant [5 x i8] c"%lld\\00"
+@.json.float_fmt = private unnamed_addr constant [5 x i8] c"%.9g\\00"
+@.json.double_fmt = private unnamed_addr constant [6 x i8] c"%.17g\\00"
 @.json.str_fmt = private unnamed_addr constant [5 x i8] c"\\22%s\\22\\00"
 
+; Empty string that strlen sees in place of a null str field
+@.ser.empty_str = private unnamed_addr constant [1 x i8] zeroinitializer
+
+declare void @llvm.memcpy.inline.p0i8.p0i8.i64(i8*, i8*, i64, i1)
+
 ; XML serialization helpers
 @.xml.lt = private unnamed_addr constant [2 x i8] c"<\\00"
 @.xml.gt = private unnamed_addr constant [2 x i8] c">\\00"
 @.xml.lt_slash = private unnamed_addr constant [3 x i8] c"</\\00"
 @.xml.newline = private unnamed_addr constant [2 x i8] c"\\0A\\00"
+
+; Serializers only compute and write their own buffers
+attributes """ + self.FN_ATTRS + """ = { nounwind willreturn }
+""" + self.generate_arena_runtime() + self.generate_string_runtime()
+    
+    def generate_arena_runtime(self) -> str:
+        """
+        Generate the bump allocator that serializer buffers come from.
+        
+        Each thread allocates from a chain of slabs (64 KiB, or larger for
+        a single big request). Buffers are never freed individually; the
+        host calls sinter_arena_reset() to release them all at once, e.g.
+        after each response is written.
+        """
+        return f"""
+; Serialization arena: slab header = {{ previous slab, bytes used, capacity, pad }}
+; followed by the slab's data
+%SinterArenaSlab = type {{ %SinterArenaSlab*, i64, i64, i64 }}
+@.arena.current = internal thread_local global %SinterArenaSlab* null
+
+; Bump-allocate `size` bytes (16-byte aligned) from the current thread's arena
+define noalias i8* @sinter_arena_alloc(i64 %size) {self.FN_ATTRS} {{
+entry:
+    %size_pad = add i64 %size, 15
+    %aligned = and i64 %size_pad, -16
+    %slab = load %SinterArenaSlab*, %SinterArenaSlab** @.arena.current
+    %has_slab = icmp ne %SinterArenaSlab* %slab, null
+    br i1 %has_slab, label %check, label %grow
+
+check:
+    %used_ptr = getelementptr %SinterArenaSlab, %SinterArenaSlab* %slab, i32 0, i32 1
+    %used = load i64, i64* %used_ptr
+    %cap_ptr = getelementptr %SinterArenaSlab, %SinterArenaSlab* %slab, i32 0, i32 2
+    %cap = load i64, i64* %cap_ptr
+    %new_used = add i64 %used, %aligned
+    %fits = icmp ule i64 %new_used, %cap
+    br i1 %fits, label %bump, label %grow, !prof !{{!"branch_weights", i32 1000, i32 1}}
+
+bump:
+    store i64 %new_used, i64* %used_ptr
+    %slab_bytes = bitcast %SinterArenaSlab* %slab to i8*
+    %offset = add i64 %used, 32
+    %ptr = getelementptr i8, i8* %slab_bytes, i64 %offset
+    ret i8* %ptr
+
+grow:
+    ; Start a new slab; the old one stays on the chain until reset
+    %is_big = icmp ugt i64 %aligned, 65536
+    %new_cap = select i1 %is_big, i64 %aligned, i64 65536
+    %total = add i64 %new_cap, 32
+    %mem = call i8* @malloc(i64 %total)
+    %new_slab = bitcast i8* %mem to %SinterArenaSlab*
+    %prev_ptr = getelementptr %SinterArenaSlab, %SinterArenaSlab* %new_slab, i32 0, i32 0
+    store %SinterArenaSlab* %slab, %SinterArenaSlab** %prev_ptr
+    %new_used_ptr = getelementptr %SinterArenaSlab, %SinterArenaSlab* %new_slab, i32 0, i32 1
+    store i64 %aligned, i64* %new_used_ptr
+    %new_cap_ptr = getelementptr %SinterArenaSlab, %SinterArenaSlab* %new_slab, i32 0, i32 2
+    store i64 %new_cap, i64* %new_cap_ptr
+    store %SinterArenaSlab* %new_slab, %SinterArenaSlab** @.arena.current
+    %first = getelementptr i8, i8* %mem, i64 32
+    ret i8* %first
+}}
+
+; Free every buffer the current thread's arena has handed out
+define void @sinter_arena_reset() {self.FN_ATTRS} {{
+entry:
+    %head = load %SinterArenaSlab*, %SinterArenaSlab** @.arena.current
+    store %SinterArenaSlab* null, %SinterArenaSlab** @.arena.current
+    br label %loop
+
+loop:
+    %slab = phi %SinterArenaSlab* [ %head, %entry ], [ %prev, %free_slab ]
+    %done = icmp eq %SinterArenaSlab* %slab, null
+    br i1 %done, label %exit, label %free_slab
+
+free_slab:
+    %prev_ptr = getelementptr %SinterArenaSlab, %SinterArenaSlab* %slab, i32 0, i32 0
+    %prev = load %SinterArenaSlab*, %SinterArenaSlab** %prev_ptr
+    %slab_bytes = bitcast %SinterArenaSlab* %slab to i8*
+    call void @free(i8* %slab_bytes)
+    br label %loop
+
+exit:
+    ret void
+}}
 """
     
-    def generate_json_serializer(self, class_type: ClassType) -> str:
-        """Generate as_json() method for a class"""
-        class_name = class_type.name
+    def generate_string_runtime(self) -> str:
+        """
+        Generate the writers for str field values. Each copies a string to
+        dst with the format's escaping and returns the number of bytes
+        written (at most STR_EXPANSION per character plus STR_OVERHEAD).
+        """
+        return f"""
+@.json.hex_digits = private unnamed_addr constant [17 x i8] c"0123456789abcdef\\00"
+
+; Write src as a quoted JSON string ("\\"" and "\\\\" escaped, control
+; characters as \\u00XX), or null if src is null
+define i64 @sinter_json_write_str(i8* %dst, i8* %src) {self.FN_ATTRS} {{
+entry:
+    %is_null = icmp eq i8* %src, null
+    br i1 %is_null, label %null, label %open
+
+null:
+    %null_w = bitcast i8* %dst to i32*
+    store i32 {int.from_bytes(b"null", "little")}, i32* %null_w, align 1
+    ret i64 4
+
+open:
+    store i8 {ord('"')}, i8* %dst
+    br label %loop
+
+loop:
+    %i = phi i64 [ 0, %open ], [ %i_next, %next ]
+    %out = phi i64 [ 1, %open ], [ %out_next, %next ]
+    %src_p = getelementptr i8, i8* %src, i64 %i
+    %c = load i8, i8* %src_p
+    %dst_p = getelementptr i8, i8* %dst, i64 %out
+    switch i8 %c, label %plain [
+        i8 0, label %close
+        i8 {ord('"')}, label %backslash
+        i8 {ord(chr(92))}, label %backslash
+    ]
+
+plain:
+    %is_control = icmp ult i8 %c, 32
+    br i1 %is_control, label %control, label %copy, !prof !{{!"branch_weights", i32 1, i32 1000}}
+
+copy:
+    store i8 %c, i8* %dst_p
+    br label %next
+
+backslash:
+    store i8 {ord(chr(92))}, i8* %dst_p
+    %escaped_p = getelementptr i8, i8* %dst_p, i64 1
+    store i8 %c, i8* %escaped_p
+    br label %next
+
+control:
+    %u_w = bitcast i8* %dst_p to i32*
+    store i32 {int.from_bytes(chr(92).encode() + b"u00", "little")}, i32* %u_w, align 1
+    %hi = lshr i8 %c, 4
+    %hi_64 = zext i8 %hi to i64
+    %hi_src = getelementptr [17 x i8], [17 x i8]* @.json.hex_digits, i64 0, i64 %hi_64
+    %hi_digit = load i8, i8* %hi_src
+    %hi_dst = getelementptr i8, i8* %dst_p, i64 4
+    store i8 %hi_digit, i8* %hi_dst
+    %lo = and i8 %c, 15
+    %lo_64 = zext i8 %lo to i64
+    %lo_src = getelementptr [17 x i8], [17 x i8]* @.json.hex_digits, i64 0, i64 %lo_64
+    %lo_digit = load i8, i8* %lo_src
+    %lo_dst = getelementptr i8, i8* %dst_p, i64 5
+    store i8 %lo_digit, i8* %lo_dst
+    br label %next
+
+next:
+    %width = phi i64 [ 1, %copy ], [ 2, %backslash ], [ 6, %control ]
+    %out_next = add i64 %out, %width
+    %i_next = add i64 %i, 1
+    br label %loop
+
+close:
+    store i8 {ord('"')}, i8* %dst_p
+    %written = add i64 %out, 1
+    ret i64 %written
+}}
+
+; Write src as XML character data ("&", "<" and ">" escaped); nothing if
+; src is null
+define i64 @sinter_xml_write_str(i8* %dst, i8* %src) {self.FN_ATTRS} {{
+entry:
+    %is_null = icmp eq i8* %src, null
+    br i1 %is_null, label %done, label %loop
+
+loop:
+    %i = phi i64 [ 0, %entry ], [ %i_next, %next ]
+    %out = phi i64 [ 0, %entry ], [ %out_next, %next ]
+    %src_p = getelementptr i8, i8* %src, i64 %i
+    %c = load i8, i8* %src_p
+    %dst_p = getelementptr i8, i8* %dst, i64 %out
+    %entity_w = bitcast i8* %dst_p to i32*
+    switch i8 %c, label %copy [
+        i8 0, label %done
+        i8 {ord("&")}, label %amp
+        i8 {ord("<")}, label %lt
+        i8 {ord(">")}, label %gt
+    ]
+
+copy:
+    store i8 %c, i8* %dst_p
+    br label %next
+
+amp:
+    store i32 {int.from_bytes(b"&amp", "little")}, i32* %entity_w, align 1
+    %amp_end = getelementptr i8, i8* %dst_p, i64 4
+    store i8 {ord(";")}, i8* %amp_end
+    br label %next
+
+lt:
+    store i32 {int.from_bytes(b"&lt;", "little")}, i32* %entity_w, align 1
+    br label %next
+
+gt:
+    store i32 {int.from_bytes(b"&gt;", "little")}, i32* %entity_w, align 1
+    br label %next
+
+next:
+    %width = phi i64 [ 1, %copy ], [ 5, %amp ], [ 4, %lt ], [ 4, %gt ]
+    %out_next = add i64 %out, %width
+    %i_next = add i64 %i, 1
+    br label %loop
+
+done:
+    %written = phi i64 [ 0, %entry ], [ %out, %loop ]
+    ret i64 %written
+}}
+"""
+    
+    def generate_json_serializer(self, class_type: ClassType,
+                                 shape: Optional[Tuple[Tuple[str, str, str, int], ...]] = None) -> str:
+        """
+        Generate as_json() method for a class.
+        shape is the class's _serializer_shape, if the caller already has it.
+        """
+        if shape is None:
+            shape = self._serializer_shape(class_type)
+        key = ("json", shape)
+        template = self._template_cache.get(key)
+        if template is None:
+            template = self._generate_json_template(key[1])
+            self._template_cache[key] = template
+        return template.replace(self.CLASS_PLACEHOLDER, class_type.name)
+    
+    # First four bytes of "true" / "false" as little-endian words
+    JSON_TRUE_WORD = int.from_bytes(b"true", "little")
+    JSON_FALS_WORD = int.from_bytes(b"fals", "little")
+    
+    # Field types the single-snprintf JSON path can format, and their conversions
+    JSON_FORMAT_SPECS = {
+        "int": "%d",
+        "boolean": "%s",
+    }
+    
+    def _generate_json_template(self, shape: Tuple[Tuple[str, str, str, int], ...]) -> str:
+        """Generate the as_json() IR for a field shape, with a placeholder class name"""
+        if shape and all(type_name in self.JSON_FORMAT_SPECS for _, type_name, _, _ in shape):
+            return self._generate_json_format_template(shape)
         
-        # Get serializable fields
-        serializable_fields = [
-            (name, field) for name, field in class_type.fields.items()
-            if field.visibility == "public" and 
-               field.is_serializable and 
-               not field.is_derived
-        ]
+        class_name = self.CLASS_PLACEHOLDER
         
-        code = f"""
+        parts = [f"""
 ; JSON serializer for {class_name}
-define i8* @{class_name}_as_json(%class.{class_name}* %this) {{
+; Every write copies a literal of known length or uses snprintf's return
+; value. The write position is an SSA value, so the output is never
+; rescanned or spilled, and booleans are written without branching.
+; Literals between two values are coalesced into as few stores as possible.
+define noalias i8* @{class_name}_as_json(%class.{class_name}* %this) {self.FN_ATTRS} {{
 entry:
     ; Allocate buffer
-    %buffer = call i8* @malloc(i64 {self.json_buffer_size})
-    %pos = alloca i64
-    store i64 0, i64* %pos
-    
-    ; Start object
-    %start = getelementptr [2 x i8], [2 x i8]* @.json.obj_start, i32 0, i32 0
-    call i8* @strcpy(i8* %buffer, i8* %start)
-    %len1 = call i64 @strlen(i8* %buffer)
-    store i64 %len1, i64* %pos
-"""
+{self._allocate_buffer(*self._estimate_buffer_size(shape, "json"))}
+"""]
+        pos = "0"  # Current write position: an SSA register or a constant
+        pending = [("{", "@.json.obj_start", 1)]  # Literals not yet written
         
         # Add each serializable field
-        for i, (field_name, field) in enumerate(serializable_fields):
-            field_idx = list(class_type.fields.keys()).index(field_name) + 1
-            llvm_type = self._get_llvm_type(field.field_type)
+        for i, (field_name, type_name, llvm_type, field_idx) in enumerate(shape):
+            key = f'"{field_name}": '
+            pending.append((key, f"@.json.{class_name}.{field_name}", len(key)))
             
-            # Generate field name string constant
-            code += f"""
+            # Write the separator and key
+            code, pos = self._write_pieces(pending, pos, f"key_{i}")
+            pending = []
+            parts.append(f"""
     ; Field: {field_name}
-    %field_{i}_name_ptr = getelementptr [64 x i8], [64 x i8]* @.json.{class_name}.{field_name}, i32 0, i32 0
-"""
+{code}
+""")
             
-            # Get field value
-            code += f"""
+            emitter = self._JSON_VALUE_EMITTERS.get(type_name)
+            if emitter is None:
+                # No value emitter for this type: write null
+                pending.append(("null", "@.json.null", 4))
+            else:
+                parts.append(f"""
     %field_{i}_ptr = getelementptr %class.{class_name}, %class.{class_name}* %this, i32 0, i32 {field_idx}
     %field_{i}_val = load {llvm_type}, {llvm_type}* %field_{i}_ptr
-"""
+""")
+                code, pos = emitter(self, llvm_type, f"%field_{i}_val", pos, f"val_{i}")
+                parts.append(code)
             
-            # Format based on type
-            if field.field_type.name == "int":
-                code += f"""
-    %pos_{i} = load i64, i64* %pos
-    %buf_{i} = getelementptr i8, i8* %buffer, i64 %pos_{i}
-    %fmt_{i} = getelementptr [3 x i8], [3 x i8]* @.json.int_fmt, i32 0, i32 0
-    %written_{i} = call i32 (i8*, i64, i8*, ...) @snprintf(i8* %buf_{i}, i64 256, i8* %fmt_{i}, {llvm_type} %field_{i}_val)
-    %written_{i}_64 = sext i32 %written_{i} to i64
-    %newpos_{i} = add i64 %pos_{i}, %written_{i}_64
-    store i64 %newpos_{i}, i64* %pos
-"""
-            elif field.field_type.name == "boolean":
-                code += f"""
-    %pos_{i} = load i64, i64* %pos
-    %buf_{i} = getelementptr i8, i8* %buffer, i64 %pos_{i}
-    br i1 %field_{i}_val, label %true_{i}, label %false_{i}
-true_{i}:
-    %true_str_{i} = getelementptr [5 x i8], [5 x i8]* @.json.true, i32 0, i32 0
-    call i8* @strcpy(i8* %buf_{i}, i8* %true_str_{i})
-    br label %cont_{i}
-false_{i}:
-    %false_str_{i} = getelementptr [6 x i8], [6 x i8]* @.json.false, i32 0, i32 0
-    call i8* @strcpy(i8* %buf_{i}, i8* %false_str_{i})
-    br label %cont_{i}
-cont_{i}:
-    %len_{i} = call i64 @strlen(i8* %buf_{i})
-    %newpos_{i} = add i64 %pos_{i}, %len_{i}
-    store i64 %newpos_{i}, i64* %pos
-"""
-            
-            # Add comma if not last field
-            if i < len(serializable_fields) - 1:
-                code += f"""
-    ; Add comma
-    %comma_pos_{i} = load i64, i64* %pos
-    %comma_buf_{i} = getelementptr i8, i8* %buffer, i64 %comma_pos_{i}
-    %comma_str_{i} = getelementptr [3 x i8], [3 x i8]* @.json.comma, i32 0, i32 0
-    call i8* @strcpy(i8* %comma_buf_{i}, i8* %comma_str_{i})
-    %comma_len_{i} = call i64 @strlen(i8* %comma_buf_{i})
-    %comma_newpos_{i} = add i64 %comma_pos_{i}, %comma_len_{i}
-    store i64 %comma_newpos_{i}, i64* %pos
-"""
+            # Comma before the next key
+            if i < len(shape) - 1:
+                pending.append((", ", "@.json.comma", 2))
         
-        # End object
-        code += """
+        # End object, with the terminator
+        pending.append(("}" + chr(0), "@.json.obj_end", 2))
+        code, _ = self._write_pieces(pending, pos, "end", last=True)
+        parts.append(f"""
     ; End object
-    %end_pos = load i64, i64* %pos
-    %end_buf = getelementptr i8, i8* %buffer, i64 %end_pos
-    %end_str = getelementptr [2 x i8], [2 x i8]* @.json.obj_end, i32 0, i32 0
-    call i8* @strcpy(i8* %end_buf, i8* %end_str)
+{code}
     
     ret i8* %buffer
-}
-"""
-        return code
+}}
+""")
+        return "".join(parts)
     
-    def generate_xml_serializer(self, class_type: ClassType) -> str:
-        """Generate as_xml() method for a class"""
-        class_name = class_type.name
+    def _generate_json_format_template(self, shape: Tuple[Tuple[str, str, str, int], ...]) -> str:
+        """
+        as_json() for classes whose fields all have a JSON_FORMAT_SPECS entry:
+        the whole object is one format string, filled by a single snprintf
+        """
+        class_name = self.CLASS_PLACEHOLDER
+        fmt = "{" + ", ".join(
+            f'"{field_name}": {self.JSON_FORMAT_SPECS[type_name]}'
+            for field_name, type_name, _, _ in shape
+        ) + "}"
+        fmt_len = len(fmt) + 1
+        escaped_fmt = fmt.replace('"', "\\22")
+        _, buffer_size = self._estimate_buffer_size(shape, "json")
+        true_ptr = self._const_ptr("@.json.true", 5)
+        false_ptr = self._const_ptr("@.json.false", 6)
         
-        # Get serializable fields
-        serializable_fields = [
-            (name, field) for name, field in class_type.fields.items()
-            if field.visibility == "public" and 
-               field.is_serializable and 
-               not field.is_derived
-        ]
+        parts = [f"""
+; JSON format string for {class_name}
+@.json.fmt.{class_name} = private unnamed_addr constant [{fmt_len} x i8] c"{escaped_fmt}\\00"
+
+; JSON serializer for {class_name} (single snprintf)
+define noalias i8* @{class_name}_as_json(%class.{class_name}* %this) {self.FN_ATTRS} {{
+entry:
+    ; Allocate buffer
+{self._allocate_buffer("", buffer_size)}
+"""]
+        args = []
+        for i, (field_name, type_name, llvm_type, field_idx) in enumerate(shape):
+            parts.append(f"""
+    ; Field: {field_name}
+    %field_{i}_ptr = getelementptr %class.{class_name}, %class.{class_name}* %this, i32 0, i32 {field_idx}
+    %field_{i}_val = load {llvm_type}, {llvm_type}* %field_{i}_ptr
+""")
+            if type_name == "boolean":
+                parts.append(f"""    %field_{i}_str = select i1 %field_{i}_val, i8* {true_ptr}, i8* {false_ptr}
+""")
+                args.append(f"i8* %field_{i}_str")
+            else:
+                args.append(f"{llvm_type} %field_{i}_val")
         
-        code = f"""
+        parts.append(f"""
+    %fmt = getelementptr [{fmt_len} x i8], [{fmt_len} x i8]* @.json.fmt.{class_name}, i32 0, i32 0
+    call i32 (i8*, i64, i8*, ...) @snprintf(i8* %buffer, i64 {buffer_size}, i8* %fmt, {", ".join(args)})
+    
+    ret i8* %buffer
+}}
+""")
+        return "".join(parts)
+    
+    def generate_xml_serializer(self, class_type: ClassType,
+                                shape: Optional[Tuple[Tuple[str, str, str, int], ...]] = None) -> str:
+        """
+        Generate as_xml() method for a class.
+        shape is the class's _serializer_shape, if the caller already has it.
+        """
+        if shape is None:
+            shape = self._serializer_shape(class_type)
+        # Tag offsets depend on the class name's length, so it is part of the key
+        key = ("xml", len(class_type.name), shape)
+        template = self._template_cache.get(key)
+        if template is None:
+            template = self._generate_xml_template(key[2], key[1])
+            self._template_cache[key] = template
+        return template.replace(self.CLASS_PLACEHOLDER, class_type.name)
+    
+    def _generate_xml_template(self, shape: Tuple[Tuple[str, str, str, int], ...], class_len: int) -> str:
+        """Generate the as_xml() IR for a field shape, with a placeholder class name"""
+        class_name = self.CLASS_PLACEHOLDER
+        class_const = f"@.xml.{class_name}"
+        
+        parts = [f"""
 ; XML serializer for {class_name}
-define i8* @{class_name}_as_xml(%class.{class_name}* %this) {{
+; Tag and class names have lengths known here, so every literal is written
+; at a fixed offset. The write position is an SSA value advanced by
+; constants (or by snprintf's return value), never rescanned or spilled.
+; The literals between two values (e.g. "</a>\\n<b>") are coalesced into
+; as few stores as possible.
+define noalias i8* @{class_name}_as_xml(%class.{class_name}* %this) {self.FN_ATTRS} {{
 entry:
     ; Allocate buffer
-    %buffer = call i8* @malloc(i64 {self.xml_buffer_size})
-    %pos = alloca i64
-    store i64 0, i64* %pos
-    
-    ; Start root element
-    %lt = getelementptr [2 x i8], [2 x i8]* @.xml.lt, i32 0, i32 0
-    call i8* @strcpy(i8* %buffer, i8* %lt)
-    %class_name = getelementptr [32 x i8], [32 x i8]* @.xml.{class_name}.name, i32 0, i32 0
-    call i8* @strcat(i8* %buffer, i8* %class_name)
-    %gt = getelementptr [2 x i8], [2 x i8]* @.xml.gt, i32 0, i32 0
-    call i8* @strcat(i8* %buffer, i8* %gt)
-    %nl = getelementptr [2 x i8], [2 x i8]* @.xml.newline, i32 0, i32 0
-    call i8* @strcat(i8* %buffer, i8* %nl)
-    %len1 = call i64 @strlen(i8* %buffer)
-    store i64 %len1, i64* %pos
-"""
+{self._allocate_buffer(*self._estimate_buffer_size(shape, "xml", class_len))}
+"""]
+        pos = "0"  # Current write position: an SSA register or a constant
+        # Root element: <{class_name}>\n (the name is only known by length here)
+        pending = [("<", "@.xml.lt", 1), (None, class_const, class_len), (">" + chr(10), "@.xml.gt", 2)]
         
         # Add each serializable field
-        for i, (field_name, field) in enumerate(serializable_fields):
-            field_idx = list(class_type.fields.keys()).index(field_name) + 1
-            llvm_type = self._get_llvm_type(field.field_type)
+        for i, (field_name, type_name, llvm_type, field_idx) in enumerate(shape):
+            tag_const = f"@.xml.{class_name}.{field_name}"
+            pending += [("<", "@.xml.lt", 1), (field_name, tag_const, len(field_name)), (">", "@.xml.gt", 1)]
             
-            code += f"""
+            # Write the pending close tag and this field's open tag
+            code, pos = self._write_pieces(pending, pos, f"otag_{i}")
+            pending = []
+            parts.append(f"""
     ; Field: {field_name}
-    %fpos_{i} = load i64, i64* %pos
-    %fbuf_{i} = getelementptr i8, i8* %buffer, i64 %fpos_{i}
-    
-    ; Open tag
-    call i8* @strcpy(i8* %fbuf_{i}, i8* %lt)
-    %ftag_{i} = getelementptr [32 x i8], [32 x i8]* @.xml.{class_name}.{field_name}, i32 0, i32 0
-    call i8* @strcat(i8* %fbuf_{i}, i8* %ftag_{i})
-    call i8* @strcat(i8* %fbuf_{i}, i8* %gt)
-    
-    ; Get field value
+{code}
+""")
+            
+            # Types without a value emitter leave the element empty
+            emitter = self._XML_VALUE_EMITTERS.get(type_name)
+            if emitter is not None:
+                parts.append(f"""
     %fptr_{i} = getelementptr %class.{class_name}, %class.{class_name}* %this, i32 0, i32 {field_idx}
     %fval_{i} = load {llvm_type}, {llvm_type}* %fptr_{i}
-"""
-            
-            # Format value based on type
-            if field.field_type.name == "int":
-                code += f"""
-    %vlen_{i} = call i64 @strlen(i8* %fbuf_{i})
-    %vbuf_{i} = getelementptr i8, i8* %fbuf_{i}, i64 %vlen_{i}
-    %vfmt_{i} = getelementptr [3 x i8], [3 x i8]* @.json.int_fmt, i32 0, i32 0
-    call i32 (i8*, i64, i8*, ...) @snprintf(i8* %vbuf_{i}, i64 64, i8* %vfmt_{i}, {llvm_type} %fval_{i})
-"""
+""")
+                code, pos = emitter(self, llvm_type, f"%fval_{i}", pos, f"val_{i}")
+                parts.append(code)
             
-            code += f"""
-    ; Close tag
-    %lt_slash = getelementptr [3 x i8], [3 x i8]* @.xml.lt_slash, i32 0, i32 0
-    call i8* @strcat(i8* %fbuf_{i}, i8* %lt_slash)
-    call i8* @strcat(i8* %fbuf_{i}, i8* %ftag_{i})
-    call i8* @strcat(i8* %fbuf_{i}, i8* %gt)
-    call i8* @strcat(i8* %fbuf_{i}, i8* %nl)
-    
-    %fnewlen_{i} = call i64 @strlen(i8* %buffer)
-    store i64 %fnewlen_{i}, i64* %pos
-"""
+            # Close tag, written with the next open tag
+            pending = [("</", "@.xml.lt_slash", 2), (field_name, tag_const, len(field_name)), (">" + chr(10), "@.xml.gt", 2)]
         
-        # End root element
-        code += f"""
+        # End root element: </{class_name}> and the terminator
+        pending += [("</", "@.xml.lt_slash", 2), (None, class_const, class_len), (">" + chr(0), "@.xml.gt", 2)]
+        code, _ = self._write_pieces(pending, pos, "end", last=True)
+        parts.append(f"""
     ; End root element
-    %epos = load i64, i64* %pos
-    %ebuf = getelementptr i8, i8* %buffer, i64 %epos
-    call i8* @strcpy(i8* %ebuf, i8* %lt_slash)
-    call i8* @strcat(i8* %ebuf, i8* %class_name)
-    call i8* @strcat(i8* %ebuf, i8* %gt)
+{code}
     
     ret i8* %buffer
 }}
-"""
-        return code
+""")
+        return "".join(parts)
+    
+    # Value emitters: each writes a loaded field value at `pos` in %buffer
+    # and returns (code, position after the value). tag keeps the registers
+    # unique within the function.
+    
+    def _emit_formatted_value(self, width: int, fmt_const: str, fmt_size: int,
+                              arg: str, pos: str, tag: str) -> Tuple[str, str]:
+        """Write a value with snprintf, bounded by its VALUE_WIDTHS entry"""
+        return f"""
+    %{tag}_buf = getelementptr i8, i8* %buffer, i64 {pos}
+    %{tag}_len = call i32 (i8*, i64, i8*, ...) @snprintf(i8* %{tag}_buf, i64 {width + 1}, i8* {self._const_ptr(fmt_const, fmt_size)}, {arg})
+    %{tag}_len_64 = sext i32 %{tag}_len to i64
+    %{tag}_end = add i64 {pos}, %{tag}_len_64
+""", f"%{tag}_end"
+    
+    def _emit_int_value(self, llvm_type: str, val: str, pos: str, tag: str) -> Tuple[str, str]:
+        """int, short and byte (varargs take them widened to i32)"""
+        code = ""
+        if llvm_type != "i32":
+            code = f"    %{tag}_i32 = sext {llvm_type} {val} to i32\n"
+            val = f"%{tag}_i32"
+        value_code, end = self._emit_formatted_value(self.VALUE_WIDTHS["int"], "@.json.int_fmt", 3,
+                                                     f"i32 {val}", pos, tag)
+        return code + value_code, end
+    
+    def _emit_long_value(self, llvm_type: str, val: str, pos: str, tag: str) -> Tuple[str, str]:
+        """long"""
+        return self._emit_formatted_value(self.VALUE_WIDTHS["long"], "@.json.long_fmt", 5,
+                                          f"i64 {val}", pos, tag)
+    
+    def _emit_float_value(self, llvm_type: str, val: str, pos: str, tag: str) -> Tuple[str, str]:
+        """float, promoted to double for varargs"""
+        code, end = self._emit_formatted_value(self.VALUE_WIDTHS["float"], "@.json.float_fmt", 5,
+                                               f"double %{tag}_f64", pos, tag)
+        return f"    %{tag}_f64 = fpext float {val} to double\n" + code, end
+    
+    def _emit_double_value(self, llvm_type: str, val: str, pos: str, tag: str) -> Tuple[str, str]:
+        """double, with enough digits to round-trip"""
+        return self._emit_formatted_value(self.VALUE_WIDTHS["double"], "@.json.double_fmt", 6,
+                                          f"double {val}", pos, tag)
+    
+    def _emit_bool_value(self, llvm_type: str, val: str, pos: str, tag: str) -> Tuple[str, str]:
+        """
+        true/false without branching: "true" or "fals" as one word, then an
+        "e" that only counts for false (a true value's next write, which
+        always follows, overwrites it)
+        """
+        return f"""
+    %{tag}_buf = getelementptr i8, i8* %buffer, i64 {pos}
+    %{tag}_word = select i1 {val}, i32 {self.JSON_TRUE_WORD}, i32 {self.JSON_FALS_WORD}
+    %{tag}_w = bitcast i8* %{tag}_buf to i32*
+    store i32 %{tag}_word, i32* %{tag}_w, align 1
+    %{tag}_e = getelementptr i8, i8* %{tag}_buf, i64 4
+    store i8 {ord("e")}, i8* %{tag}_e
+    %{tag}_short = zext i1 {val} to i64
+    %{tag}_size = sub i64 5, %{tag}_short
+    %{tag}_end = add i64 {pos}, %{tag}_size
+""", f"%{tag}_end"
+    
+    def _emit_str_writer(self, writer: str, val: str, pos: str, tag: str) -> Tuple[str, str]:
+        """Write a str value with one of the generate_string_runtime writers"""
+        return f"""
+    %{tag}_buf = getelementptr i8, i8* %buffer, i64 {pos}
+    %{tag}_len = call i64 @{writer}(i8* %{tag}_buf, i8* {val})
+    %{tag}_end = add i64 {pos}, %{tag}_len
+""", f"%{tag}_end"
+    
+    def _emit_json_str_value(self, llvm_type: str, val: str, pos: str, tag: str) -> Tuple[str, str]:
+        """str as an escaped JSON string (null for a null pointer)"""
+        return self._emit_str_writer("sinter_json_write_str", val, pos, tag)
+    
+    def _emit_xml_str_value(self, llvm_type: str, val: str, pos: str, tag: str) -> Tuple[str, str]:
+        """str as escaped XML character data (nothing for a null pointer)"""
+        return self._emit_str_writer("sinter_xml_write_str", val, pos, tag)
+    
+    # Field type name -> value emitter, shared by the JSON and XML serializers
+    _VALUE_EMITTERS = {
+        "int": _emit_int_value,
+        "short": _emit_int_value,
+        "byte": _emit_int_value,
+        "long": _emit_long_value,
+        "float": _emit_float_value,
+        "double": _emit_double_value,
+        "boolean": _emit_bool_value,
+    }
+    # str values are escaped differently per format
+    _JSON_VALUE_EMITTERS = {**_VALUE_EMITTERS, "str": _emit_json_str_value}
+    _XML_VALUE_EMITTERS = {**_VALUE_EMITTERS, "str": _emit_xml_str_value}
+    
+    # Widest single store used when writing literal bytes
+    MAX_INLINE_STORE = 8
+    
+    def _write_pieces(self, pieces: List[Tuple[Optional[str], str, int]], pos: str,
+                      tag: str, last: bool = False) -> Tuple[str, str]:
+        """
+        Write consecutive literals to %buffer at pos and advance past them.
+        
+        Each piece is (text, const_name, length). text is None when only the
+        length is known here (the class name in a cached template); such
+        pieces are copied from const_name. Neighbouring pieces with known
+        text are merged, so e.g. "</a>\\n<b>" becomes a single i64 store.
+        
+        Returns (code, new_pos); new_pos stays a constant if pos was one.
+        With last=True nothing is written afterwards, so new_pos is not
+        computed (the returned value is pos).
+        """
+        lines = []
+        base = "%buffer"
+        if pos != "0":
+            lines.append(f"    %{tag}_buf = getelementptr i8, i8* %buffer, i64 {pos}")
+            base = f"%{tag}_buf"
+        offset = 0
+        run = b""  # Known bytes not yet written, starting at run_start
+        run_start = 0
+        
+        def flush_run():
+            if run:
+                dst = self._offset_ptr(base, run_start, f"{tag}_r{run_start}", lines)
+                lines.append(self._inline_bytes(dst, run, f"{tag}_r{run_start}"))
+        
+        for text, const_name, length in pieces:
+            data = text.encode("utf-8") if text is not None else None
+            if data is not None and len(run) + len(data) <= self.MAX_INLINE_STORE:
+                if not run:
+                    run_start = offset
+                run += data
+            else:
+                flush_run()
+                run = b""
+                if data is not None and len(data) <= self.MAX_INLINE_STORE:
+                    run, run_start = data, offset
+                else:
+                    dst = self._offset_ptr(base, offset, f"{tag}_c{offset}", lines)
+                    lines.append(self._copy_constant(dst, const_name, length + 1, length))
+            offset += length
+        flush_run()
+        
+        if last:
+            return "\n".join(lines), pos
+        if pos.isdigit():
+            return "\n".join(lines), str(int(pos) + offset)
+        lines.append(f"    %{tag}_end = add i64 {pos}, {offset}")
+        return "\n".join(lines), f"%{tag}_end"
+    
+    def _offset_ptr(self, base: str, offset: int, name: str, lines: List[str]) -> str:
+        """Pointer `offset` bytes past base, appending the GEP to lines if needed"""
+        if offset == 0:
+            return base
+        lines.append(f"    %{name}_p = getelementptr i8, i8* {base}, i64 {offset}")
+        return f"%{name}_p"
+    
+    def _inline_bytes(self, dst: str, data: bytes, tag: str) -> str:
+        """
+        Write up to MAX_INLINE_STORE known bytes to dst using the widest
+        integer stores that fit (little-endian packing).
+        """
+        lines = []
+        offset = 0
+        while offset < len(data):
+            width = next(w for w in (8, 4, 2, 1) if w <= len(data) - offset)
+            value = int.from_bytes(data[offset:offset + width], "little")
+            ptr = self._offset_ptr(dst, offset, f"{tag}_{offset}", lines)
+            if width == 1:
+                lines.append(f"    store i8 {value}, i8* {ptr}")
+            else:
+                lines.append(f"    %{tag}_w{offset} = bitcast i8* {ptr} to i{width * 8}*")
+                lines.append(f"    store i{width * 8} {value}, i{width * 8}* %{tag}_w{offset}, align 1")
+            offset += width
+        return "\n".join(lines)
+    
+    def _allocate_buffer(self, code: str, size: str) -> str:
+        """
+        Allocate the serializer's output buffer as %buffer from the arena
+        (it lives until sinter_arena_reset), after the code computing its
+        size. The call is annotated so LLVM knows the result is unaliased
+        and, for a constant size, `size` bytes long.
+        """
+        if not size.isdigit():
+            return f"{code}\n    %buffer = call noalias i8* @sinter_arena_alloc(i64 {size})"
+        return f"    %buffer = call noalias dereferenceable_or_null({size}) i8* @sinter_arena_alloc(i64 {size})"
+    
+    def _copy_constant(self, dst: str, const_name: str, const_size: int, length: int) -> str:
+        """Copy the first `length` bytes of a [const_size x i8] constant to dst"""
+        src = self._const_ptr(const_name, const_size)
+        return f"    call void @llvm.memcpy.inline.p0i8.p0i8.i64(i8* {dst}, i8* {src}, i64 {length}, i1 false)"
+    
+    def _const_ptr(self, const_name: str, const_size: int) -> str:
+        """
+        i8* to the start of a [const_size x i8] constant, as a constant
+        expression so uses need no per-site getelementptr instruction
+        """
+        return f"getelementptr inbounds ([{const_size} x i8], [{const_size} x i8]* {const_name}, i64 0, i64 0)"
     
     def generate_json_deserializer(self, class_type: ClassType) -> str:
         """Generate from_json() method stub for a class"""
@@ -243,7 +720,7 @@ entry:
         # This is a simplified stub - full implementation would need JSON parsing
         code = f"""
 ; JSON deserializer for {class_name} (stub)
-define %class.{class_name}* @{class_name}_from_json(i8* %json_str) {{
+define %class.{class_name}* @{class_name}_from_json(i8* %json_str) {self.FN_ATTRS} {{
 entry:
     ; Create new instance
     %obj = call %class.{class_name}* @{class_name}_new()
@@ -263,7 +740,7 @@ entry:
         # This is a simplified stub - full implementation would need XML parsing
         code = f"""
 ; XML deserializer for {class_name} (stub)
-define %class.{class_name}* @{class_name}_from_xml(i8* %xml_str) {{
+define %class.{class_name}* @{class_name}_from_xml(i8* %xml_str) {self.FN_ATTRS} {{
 entry:
     ; Create new instance
     %obj = call %class.{class_name}* @{class_name}_new()
@@ -280,37 +757,99 @@ entry:
         """Generate string constants needed for serialization"""
         class_name = class_type.name
         
-        code = f"""
+        parts = [f"""
 ; Serialization string constants for {class_name}
-@.xml.{class_name}.name = private unnamed_addr constant [{len(class_name) + 1} x i8] c"{class_name}\\00"
-"""
+@.xml.{class_name} = private unnamed_addr constant [{len(class_name) + 1} x i8] c"{class_name}\\00"
+"""]
         
         for field_name in class_type.fields.keys():
-            code += f'@.xml.{class_name}.{field_name} = private unnamed_addr constant [{len(field_name) + 1} x i8] c"{field_name}\\00"\n'
-            code += f'@.json.{class_name}.{field_name} = private unnamed_addr constant [64 x i8] c"\\"{field_name}\\":\\00"\n'
+            parts.append(f'@.xml.{class_name}.{field_name} = private unnamed_addr constant [{len(field_name) + 1} x i8] c"{field_name}\\00"\n')
+            parts.append(f'@.json.{class_name}.{field_name} = private unnamed_addr constant [{len(field_name) + 5} x i8] c"\\22{field_name}\\22: \\00"\n')
         
-        return code
+        return "".join(parts)
     
     def generate_all_serializers(self, class_type: ClassType) -> str:
         """Generate all serialization methods for a class"""
-        code = ""
-        code += self.generate_string_constants(class_type)
-        code += self.generate_json_serializer(class_type)
-        code += self.generate_xml_serializer(class_type)
-        code += self.generate_json_deserializer(class_type)
-        code += self.generate_xml_deserializer(class_type)
-        return code
+        # Filter the fields once for both serializers
+        shape = self._serializer_shape(class_type)
+        return "".join([
+            self.generate_string_constants(class_type),
+            self.generate_json_serializer(class_type, shape),
+            self.generate_xml_serializer(class_type, shape),
+            self.generate_json_deserializer(class_type),
+            self.generate_xml_deserializer(class_type),
+        ])
+    
+    def _serializable_fields(self, class_type: ClassType) -> List[Tuple[str, FieldInfo]]:
+        """Public, serializable, non-derived fields in declaration order"""
+        return [
+            (name, field) for name, field in class_type.fields.items()
+            if field.visibility == "public" and 
+               field.is_serializable and 
+               not field.is_derived
+        ]
+    
+    def _serializer_shape(self, class_type: ClassType) -> Tuple[Tuple[str, str, str, int], ...]:
+        """
+        Everything the serializers depend on besides the class name:
+        (field_name, type_name, llvm_type, struct_index) per serialized field
+        """
+        field_index = class_type.field_slots
+        return tuple(
+            (name, field.field_type.name, self._get_llvm_type(field.field_type), field_index[name])
+            for name, field in self._serializable_fields(class_type)
+        )
+    
+    def _estimate_buffer_size(self, shape: Tuple[Tuple[str, str, str, int], ...], fmt: str,
+                              class_len: int = 0) -> Tuple[str, str]:
+        """
+        Upper bound on the bytes written by the as_json/as_xml serializer,
+        including the terminator, as (code, size). Everything but the values
+        is a literal of known length and each value is bounded by
+        VALUE_WIDTHS, so size is a constant and code is empty, unless there
+        are str fields: code then measures them with strlen and size is a
+        register holding the constant plus STR_EXPANSION bytes per character.
+        """
+        if fmt == "json":
+            size = 2  # {}
+            for name, _, _, _ in shape:
+                size += len(name) + 4 + 2  # "name": value, 
+        else:
+            size = 2 * class_len + 6  # <Class>\n</Class>
+            for name, _, _, _ in shape:
+                size += 2 * len(name) + 6  # <f>value</f>\n
+        size += 1  # Terminator
+        
+        lines = []
+        chars = None  # Register holding the str fields' total length so far
+        for i, (_, type_name, _, field_idx) in enumerate(shape):
+            if type_name != "str":
+                size += self.VALUE_WIDTHS.get(type_name, self.FALLBACK_WIDTH[fmt])
+                continue
+            size += self.STR_OVERHEAD[fmt]
+            # A null pointer is measured as the empty string
+            lines += [
+                f"    %size_{i}_ptr = getelementptr %class.{self.CLASS_PLACEHOLDER}, "
+                f"%class.{self.CLASS_PLACEHOLDER}* %this, i32 0, i32 {field_idx}",
+                f"    %size_{i}_str = load i8*, i8** %size_{i}_ptr",
+                f"    %size_{i}_null = icmp eq i8* %size_{i}_str, null",
+                f"    %size_{i}_src = select i1 %size_{i}_null, i8* {self._const_ptr('@.ser.empty_str', 1)}, "
+                f"i8* %size_{i}_str",
+                f"    %size_{i}_len = call i64 @strlen(i8* %size_{i}_src)",
+            ]
+            if chars is not None:
+                lines.append(f"    %size_{i}_sum = add i64 {chars}, %size_{i}_len")
+                chars = f"%size_{i}_sum"
+            else:
+                chars = f"%size_{i}_len"
+        if chars is None:
+            return "", str(size)
+        lines += [
+            f"    %size_escaped = mul i64 {chars}, {self.STR_EXPANSION[fmt]}",
+            f"    %size = add i64 %size_escaped, {size}",
+        ]
+        return "\n".join(lines), "%size"
     
     def _get_llvm_type(self, sinter_type: SinterType) -> str:
         """Convert Sinter type to LLVM type"""
-        type_map = {
-            "int": "i32",
-            "float": "float",
-            "double": "double",
-            "boolean": "i1",
-            "byte": "i8",
-            "short": "i16",
-            "long": "i64",
-            "str": "i8*",
-        }
-        return type_map.get(sinter_type.name, "i32")
+        return _LLVM_TYPE_MAP.get(sinter_type.name, "i32")
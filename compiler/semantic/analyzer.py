@@ -12,7 +12,7 @@ from compiler.sinter_ast.nodes import (
     ReturnStatement, VariableDeclaration, IfStatement, WhileStatement,
     AssignmentStatement, Visibility, AttributeAnnotation, ScopeBlock,
     ForStatement, ForEachStatement, BreakStatement, ContinueStatement,
-    PrintStatement, ArrayLiteral, ArrayAccess
+    PrintStatement, ArrayLiteral, ArrayAccess, node_fields, CALLEE_MEMBER
 )
 from compiler.sinter_types.types import (
     SinterType, PrimitiveType, VoidType, NullType, StringType, DStringType,
@@ -22,6 +22,28 @@ from compiler.sinter_types.types import (
 from compiler.sinter_types.symbol_table import SymbolTable, Symbol, SymbolKind, Scope
 
 
+# Numeric type name -> rank in the implicit widening order
+_NUMERIC_RANK = {
+    "byte": 0,
+    "short": 1,
+    "int": 2,
+    "long": 3,
+    "float": 4,
+    "double": 5,
+}
+
+# (target name, source name) pairs that convert implicitly between builtin
+# types: any numeric to any numeric, and d-strings to strings
+_IMPLICIT_CONVERSIONS = frozenset(
+    [(target, source) for target in _NUMERIC_RANK for source in _NUMERIC_RANK]
+    + [("str", "d_str")]
+)
+
+# Binary operators grouped by the type they produce
+_BOOLEAN_BINARY_OPS = frozenset(("==", "!=", "<", ">", "<=", ">=", "&&", "||"))
+_ARITHMETIC_BINARY_OPS = frozenset(("+", "-", "*", "/", "%"))
+
+
 class SemanticError(Exception):
     """Raised when semantic analysis fails"""
     pass
@@ -32,48 +54,197 @@ class PointerCleanupError(Exception):
     pass
 
 
+class AnalysisCache:
+    """
+    Class-phase results of a previous analyze() run, for callers (e.g. an
+    editor integration) that re-analyze the same program after each edit.
+    
+    Classes are analyzed against every class declaration, so the results
+    are reused only when all class declarations are unchanged; functions
+    are always re-analyzed.
+    """
+    
+    def __init__(self):
+        self.class_key: Optional[tuple] = None  # _node_key of every class declaration
+        self.type_registry: Optional[TypeRegistry] = None
+        self.class_symbols: Dict[str, Symbol] = {}  # Global scope after the class passes
+        self.class_scopes: List[Scope] = []
+        self.errors: List[Tuple[str, int, int]] = []
+        self.warnings: List[str] = []
+
+
+def _node_key(value):
+    """Structural key of an AST subtree: equal keys mean identical source"""
+    if isinstance(value, list):
+        return tuple(_node_key(item) for item in value)
+    if isinstance(value, (ASTNode, AttributeAnnotation)):
+        return (type(value).__name__,) + tuple(
+            (name, _node_key(getattr(value, name))) for name in node_fields(type(value))
+        )
+    if isinstance(value, Visibility):
+        return value.value
+    return value
+
+
 class SemanticAnalyzer:
     """Performs semantic analysis on the AST"""
     
+    # Analysis stops once this many errors have been recorded
+    MAX_ERRORS = 100
+    
     def __init__(self):
-        self.type_registry = TypeRegistry()
         self.symbol_table = SymbolTable()
-        self.errors: List[str] = []
+        self._use_registry(TypeRegistry())
+        # Node class -> analyzer method (nodes are matched by exact class)
+        self._stmt_dispatch = {
+            VariableDeclaration: self._analyze_var_declaration,
+            ReturnStatement: self._analyze_return,
+            IfStatement: self._analyze_if,
+            WhileStatement: self._analyze_while,
+            ForStatement: self._analyze_for,
+            ForEachStatement: self._analyze_foreach,
+            BreakStatement: self._analyze_loop_jump,
+            ContinueStatement: self._analyze_loop_jump,
+            PrintStatement: self._analyze_print,
+            ExpressionStatement: self._analyze_expression_statement,
+            AssignmentStatement: self._analyze_assignment,
+        }
+        self._expr_dispatch = {
+            Literal: self._analyze_literal,
+            Identifier: self._analyze_identifier,
+            BinaryExpression: self._analyze_binary,
+            UnaryExpression: self._analyze_unary,
+            MemberAccess: self._analyze_member_access,
+            MethodCall: self._analyze_method_call,
+            NewExpression: self._analyze_new,
+            PointerExpression: self._analyze_pointer_expr,
+            AssignmentStatement: self._analyze_assignment_expr,
+        }
+        # Unary operators whose result type differs from the operand's;
+        # "-", "++" and "--" yield the operand type unchanged
+        self._unary_dispatch = {
+            "!": self._unary_not,
+            "*": self._unary_deref,
+            "&": self._unary_address_of,
+        }
+        self.errors: List[Tuple[str, int, int]] = []  # (message, line, column)
         self.warnings: List[str] = []
         self.current_class: Optional[ClassType] = None
         self.current_method: Optional[MethodInfo] = None
         self.current_return_type: Optional[SinterType] = None
     
-    def analyze(self, ast: Program) -> Tuple[TypeRegistry, SymbolTable]:
-        """Perform semantic analysis on the program"""
+    def _use_registry(self, type_registry: TypeRegistry):
+        """Analyze against type_registry, caching its hot built-in types"""
+        self.type_registry = type_registry
+        # Built-in types looked up on hot paths (the registry never replaces them)
+        self._t_bool = self.type_registry.get("boolean")
+        self._t_int = self.type_registry.get("int")
+        self._t_void = self.type_registry.get("void")
+        self._t_null = self.type_registry.get("null")
+        self._t_float = self.type_registry.get("float")
+        self._t_double = self.type_registry.get("double")
+        self._t_str = self.type_registry.get("str")
+        self._t_dstr = self.type_registry.get("d_str")
+        # Literal kind -> its type (unknown kinds are treated as int)
+        self._literal_types: Dict[str, SinterType] = {
+            "int": self._t_int,
+            "float": self._t_float,
+            "double": self._t_double,
+            "boolean": self._t_bool,
+            "str": self._t_str,
+            "d_str": self._t_dstr,
+            "null": self._t_null,
+        }
+        # Type name -> resolved type. Only successful lookups are cached:
+        # the registry never drops or replaces a type once it resolves.
+        self._type_name_cache: Dict[str, SinterType] = {}
+    
+    def analyze(self, ast: Program, cache: Optional[AnalysisCache] = None) -> Tuple[TypeRegistry, SymbolTable]:
+        """
+        Perform semantic analysis on the program.
+        
+        With a cache, the class passes are skipped when every class
+        declaration matches the previous run, and the cache is updated.
+        """
         self.errors = []
         self.warnings = []
         
-        # First pass: Register all classes (forward declarations)
+        class_key = None
+        if cache is not None:
+            class_key = _node_key([decl for decl in ast.declarations if isinstance(decl, ClassDeclaration)])
+            if cache.class_key == class_key:
+                self._restore_class_phase(cache)
+                for decl in ast.declarations:
+                    if isinstance(decl, FunctionDeclaration):
+                        self._analyze_function(decl)
+                return self._finish()
+        
+        # First pass: Register all classes (forward declarations), sorting
+        # the declarations so later passes only walk the ones they need
+        classes: List[ClassDeclaration] = []
+        functions: List[FunctionDeclaration] = []
         for decl in ast.declarations:
             if isinstance(decl, ClassDeclaration):
                 self._register_class(decl)
+                classes.append(decl)
+            elif isinstance(decl, FunctionDeclaration):
+                functions.append(decl)
         
         # Second pass: Build class hierarchies and resolve types
-        for decl in ast.declarations:
-            if isinstance(decl, ClassDeclaration):
-                self._resolve_class_hierarchy(decl)
+        for decl in classes:
+            self._resolve_class_hierarchy(decl)
+        for decl in classes:
+            class_type = self.type_registry.get_class(decl.name)
+            if class_type is not None:
+                class_type.link_hierarchy()
         
         # Third pass: Analyze class members
-        for decl in ast.declarations:
-            if isinstance(decl, ClassDeclaration):
-                self._analyze_class(decl)
+        for decl in classes:
+            self._analyze_class(decl)
+        # Only now does every class see all of its inherited fields
+        for decl in classes:
+            class_type = self.type_registry.get(decl.name)
+            if isinstance(class_type, ClassType):
+                class_type.finalize()
+        
+        if cache is not None:
+            self._save_class_phase(cache, class_key)
         
         # Fourth pass: Analyze functions
-        for decl in ast.declarations:
-            if isinstance(decl, FunctionDeclaration):
-                self._analyze_function(decl)
+        for decl in functions:
+            self._analyze_function(decl)
         
+        return self._finish()
+    
+    def _finish(self) -> Tuple[TypeRegistry, SymbolTable]:
+        """Raise the recorded errors, if any, or return the analysis results"""
         if self.errors:
-            raise SemanticError("\n".join(self.errors))
+            raise SemanticError(self._format_errors())
         
+        self.type_registry.freeze()
         return self.type_registry, self.symbol_table
     
+    def _save_class_phase(self, cache: AnalysisCache, class_key: tuple):
+        """Record the state the class passes produced"""
+        global_scope = self.symbol_table.global_scope
+        cache.class_key = class_key
+        cache.type_registry = self.type_registry
+        cache.class_symbols = dict(global_scope.symbols)
+        cache.class_scopes = list(global_scope.children)
+        cache.errors = list(self.errors)
+        cache.warnings = list(self.warnings)
+    
+    def _restore_class_phase(self, cache: AnalysisCache):
+        """Start from the state the class passes produced in a previous run"""
+        self._use_registry(cache.type_registry)
+        global_scope = self.symbol_table.global_scope
+        self.symbol_table.define_globals(cache.class_symbols)
+        for scope in cache.class_scopes:
+            scope.parent = global_scope
+            global_scope.add_child(scope)
+        self.errors.extend(cache.errors)
+        self.warnings.extend(cache.warnings)
+    
     def _register_class(self, decl: ClassDeclaration):
         """Register a class in the type registry"""
         if self.type_registry.get(decl.name):
@@ -91,32 +262,30 @@ class SemanticAnalyzer:
     
     def _resolve_class_hierarchy(self, decl: ClassDeclaration):
         """Resolve class inheritance and interfaces"""
-        class_type = self.type_registry.get(decl.name)
-        if not isinstance(class_type, ClassType):
+        class_type = self.type_registry.get_class(decl.name)
+        if class_type is None:
             return
         
         # Resolve parent class
         if decl.extends:
-            parent_type = self.type_registry.get(decl.extends)
-            if not parent_type:
-                self._error(f"Base class '{decl.extends}' not found", decl.line, decl.column)
-            elif not isinstance(parent_type, ClassType):
-                self._error(f"'{decl.extends}' is not a class", decl.line, decl.column)
+            parent_type = self.type_registry.get_class(decl.extends)
+            if parent_type is None:
+                if self.type_registry.get(decl.extends):
+                    self._error(f"'{decl.extends}' is not a class", decl.line, decl.column)
+                else:
+                    self._error(f"Base class '{decl.extends}' not found", decl.line, decl.column)
             else:
+                # Fields are inherited through link_hierarchy() once every
+                # parent is known
                 class_type.parent_class = parent_type
-                # Inherit fields from parent
-                for name, field in parent_type.fields.items():
-                    class_type.fields[name] = field
-                # Inherit vtable from parent
-                class_type.vtable = parent_type.vtable.copy()
         
         # Register interfaces
         class_type.interfaces = decl.implements
     
     def _analyze_class(self, decl: ClassDeclaration):
         """Analyze a class declaration"""
-        class_type = self.type_registry.get(decl.name)
-        if not isinstance(class_type, ClassType):
+        class_type = self.type_registry.get_class(decl.name)
+        if class_type is None:
             return
         
         self.current_class = class_type
@@ -148,7 +317,7 @@ class SemanticAnalyzer:
         field_type = self._resolve_type(field.type_name)
         if not field_type:
             self._error(f"Unknown type '{field.type_name}'", field.line, field.column)
-            field_type = self.type_registry.get("int")  # Default to int
+            field_type = self._t_int  # Default to int
         
         # Check annotation attributes
         is_serializable = False
@@ -198,21 +367,13 @@ class SemanticAnalyzer:
         return_type = self._resolve_type(method.return_type)
         if not return_type:
             self._error(f"Unknown return type '{method.return_type}'", method.line, method.column)
-            return_type = self.type_registry.get("void")
+            return_type = self._t_void
         
         # Analyze parameters
-        param_types = []
-        param_names = []
-        for param in method.parameters:
-            param_type = self._resolve_type(param.type_name)
-            if not param_type:
-                self._error(f"Unknown parameter type '{param.type_name}'", param.line, param.column)
-                param_type = self.type_registry.get("int")
-            param_types.append(param_type)
-            param_names.append(param.name)
+        param_types = self._resolve_param_types(method.parameters)
         
         method_info = MethodInfo(
-            method.name, return_type, param_types, param_names,
+            method.name, return_type, param_types, [param.name for param in method.parameters],
             method.is_static, visibility
         )
         class_type.add_method(method_info)
@@ -229,8 +390,8 @@ class SemanticAnalyzer:
             self.symbol_table.define("this", SymbolKind.PARAMETER, this_type, llvm_name="%this")
         
         # Add parameters to scope
-        for name, ptype in zip(param_names, param_types):
-            self.symbol_table.define(name, SymbolKind.PARAMETER, ptype)
+        for param, ptype in zip(method.parameters, param_types):
+            self.symbol_table.define(param.name, SymbolKind.PARAMETER, ptype)
         
         # Analyze body
         if method.body:
@@ -245,18 +406,10 @@ class SemanticAnalyzer:
         return_type = self._resolve_type(func.return_type)
         if not return_type:
             self._error(f"Unknown return type '{func.return_type}'", func.line, func.column)
-            return_type = self.type_registry.get("void")
+            return_type = self._t_void
         
         # Analyze parameters
-        param_types = []
-        param_names = []
-        for param in func.parameters:
-            param_type = self._resolve_type(param.type_name)
-            if not param_type:
-                self._error(f"Unknown parameter type '{param.type_name}'", param.line, param.column)
-                param_type = self.type_registry.get("int")
-            param_types.append(param_type)
-            param_names.append(param.name)
+        param_types = self._resolve_param_types(func.parameters)
         
         # Register function
         func_type = FunctionType(return_type, param_types)
@@ -270,8 +423,8 @@ class SemanticAnalyzer:
         self.symbol_table.enter_scope(f"function_{func.name}")
         
         # Add parameters to scope
-        for name, ptype in zip(param_names, param_types):
-            self.symbol_table.define(name, SymbolKind.PARAMETER, ptype)
+        for param, ptype in zip(func.parameters, param_types):
+            self.symbol_table.define(param.name, SymbolKind.PARAMETER, ptype)
         
         # Analyze body
         if func.body:
@@ -280,40 +433,70 @@ class SemanticAnalyzer:
         self.symbol_table.exit_scope()
         self.current_return_type = None
     
+    def _resolve_param_types(self, parameters: List[Parameter]) -> List[SinterType]:
+        """Resolve parameter types, reporting unknown ones (which default to int)"""
+        param_types = []
+        for param in parameters:
+            param_type = self._resolve_type(param.type_name)
+            if not param_type:
+                self._error(f"Unknown parameter type '{param.type_name}'", param.line, param.column)
+                param_type = self._t_int
+            param_types.append(param_type)
+        return param_types
+    
     def _analyze_block(self, block: Block):
         """Analyze a block of statements"""
         for stmt in block.statements:
             self._analyze_statement(stmt)
     
+    @staticmethod
+    def _block_declares(block: Block) -> bool:
+        """
+        Whether a block declares variables directly in its own scope.
+        Nested blocks open their own scopes, so only its statements count.
+        The answer is stored on the node for later analyses of the same AST.
+        """
+        declares = block._declares_var
+        if declares is None:
+            declares = any(isinstance(stmt, VariableDeclaration) for stmt in block.statements)
+            block._declares_var = declares
+        return declares
+    
+    def _analyze_scoped_block(self, block: Block, scope_name: str):
+        """Analyze a control-flow body, opening a scope only if it needs one"""
+        if not self._block_declares(block):
+            self._analyze_block(block)
+            return
+        self.symbol_table.enter_scope(scope_name)
+        self._analyze_block(block)
+        self.symbol_table.exit_scope(recycle=True)
+    
     def _analyze_statement(self, stmt: Statement):
         """Analyze a statement"""
-        if isinstance(stmt, VariableDeclaration):
-            self._analyze_var_declaration(stmt)
-        elif isinstance(stmt, ReturnStatement):
-            self._analyze_return(stmt)
-        elif isinstance(stmt, IfStatement):
-            self._analyze_if(stmt)
-        elif isinstance(stmt, WhileStatement):
-            self._analyze_while(stmt)
-        elif isinstance(stmt, ForStatement):
-            self._analyze_for(stmt)
-        elif isinstance(stmt, ForEachStatement):
-            self._analyze_foreach(stmt)
-        elif isinstance(stmt, BreakStatement):
-            pass  # Valid in loops
-        elif isinstance(stmt, ContinueStatement):
-            pass  # Valid in loops
-        elif isinstance(stmt, PrintStatement):
-            for arg in stmt.arguments:
-                self._analyze_expression(arg)
-        elif isinstance(stmt, ExpressionStatement):
-            self._analyze_expression(stmt.expression)
-        elif isinstance(stmt, AssignmentStatement):
-            self._analyze_assignment(stmt)
+        handler = self._stmt_dispatch.get(type(stmt))
+        if handler:
+            handler(stmt)
+    
+    def _analyze_loop_jump(self, stmt: Statement):
+        """Analyze a break or continue statement"""
+        pass  # Valid in loops
+    
+    def _analyze_print(self, stmt: PrintStatement):
+        """Analyze a print/println statement"""
+        for arg in stmt.arguments:
+            self._analyze_expression(arg)
+    
+    def _analyze_expression_statement(self, stmt: ExpressionStatement):
+        """Analyze an expression used as a statement"""
+        self._analyze_expression(stmt.expression)
     
     def _analyze_for(self, stmt: ForStatement):
         """Analyze a for statement"""
-        self.symbol_table.enter_scope("for_body")
+        # The loop variable lives in the body's scope, so a declaring init
+        # needs one even when the body itself declares nothing
+        scoped = isinstance(stmt.init, VariableDeclaration) or self._block_declares(stmt.body)
+        if scoped:
+            self.symbol_table.enter_scope("for_body")
         
         if stmt.init:
             self._analyze_statement(stmt.init)
@@ -327,7 +510,8 @@ class SemanticAnalyzer:
             self._analyze_expression(stmt.update)
         
         self._analyze_block(stmt.body)
-        self.symbol_table.exit_scope()
+        if scoped:
+            self.symbol_table.exit_scope(recycle=True)
     
     def _analyze_foreach(self, stmt: ForEachStatement):
         """Analyze a for-each statement"""
@@ -342,24 +526,27 @@ class SemanticAnalyzer:
             self.symbol_table.define(stmt.var_name, SymbolKind.VARIABLE, var_type)
         
         self._analyze_block(stmt.body)
-        self.symbol_table.exit_scope()
+        self.symbol_table.exit_scope(recycle=True)
     
     def _analyze_var_declaration(self, stmt: VariableDeclaration):
         """Analyze a variable declaration"""
         var_type = self._resolve_type(stmt.type_name)
-        if not var_type:
+        poisoned = not var_type
+        if poisoned:
             self._error(f"Unknown type '{stmt.type_name}'", 0, 0)
-            var_type = self.type_registry.get("int")
+            var_type = self._t_int
         
         # Check if it's a pointer type
         is_pointer = var_type.is_pointer()
         
         symbol = self.symbol_table.define(stmt.name, SymbolKind.VARIABLE, var_type)
-        symbol.is_pointer_allocated = is_pointer
+        if is_pointer:
+            self.symbol_table.current_scope.mark_allocated(symbol)
+        symbol.is_poisoned = poisoned
         
         if stmt.initial_value:
             init_type = self._analyze_expression(stmt.initial_value)
-            if init_type and not self._types_compatible(var_type, init_type):
+            if init_type and not poisoned and not self._types_compatible(var_type, init_type):
                 self._error(f"Type mismatch in variable declaration", 0, 0)
             symbol.is_initialized = True
     
@@ -382,14 +569,10 @@ class SemanticAnalyzer:
         if cond_type and cond_type.name != "boolean":
             self._error("Condition must be boolean", 0, 0)
         
-        self.symbol_table.enter_scope("if_then")
-        self._analyze_block(stmt.then_block)
-        self.symbol_table.exit_scope()
+        self._analyze_scoped_block(stmt.then_block, "if_then")
         
         if stmt.else_block:
-            self.symbol_table.enter_scope("if_else")
-            self._analyze_block(stmt.else_block)
-            self.symbol_table.exit_scope()
+            self._analyze_scoped_block(stmt.else_block, "if_else")
     
     def _analyze_while(self, stmt: WhileStatement):
         """Analyze a while statement"""
@@ -397,9 +580,7 @@ class SemanticAnalyzer:
         if cond_type and cond_type.name != "boolean":
             self._error("Condition must be boolean", 0, 0)
         
-        self.symbol_table.enter_scope("while_body")
-        self._analyze_block(stmt.body)
-        self.symbol_table.exit_scope()
+        self._analyze_scoped_block(stmt.body, "while_body")
     
     def _analyze_assignment(self, stmt: AssignmentStatement):
         """Analyze an assignment statement"""
@@ -415,41 +596,19 @@ class SemanticAnalyzer:
     
     def _analyze_expression(self, expr: Expression) -> Optional[SinterType]:
         """Analyze an expression and return its type"""
-        if isinstance(expr, Literal):
-            return self._analyze_literal(expr)
-        elif isinstance(expr, Identifier):
-            return self._analyze_identifier(expr)
-        elif isinstance(expr, BinaryExpression):
-            return self._analyze_binary(expr)
-        elif isinstance(expr, UnaryExpression):
-            return self._analyze_unary(expr)
-        elif isinstance(expr, MemberAccess):
-            return self._analyze_member_access(expr)
-        elif isinstance(expr, MethodCall):
-            return self._analyze_method_call(expr)
-        elif isinstance(expr, NewExpression):
-            return self._analyze_new(expr)
-        elif isinstance(expr, PointerExpression):
-            return self._analyze_pointer_expr(expr)
-        elif isinstance(expr, AssignmentStatement):
-            # Assignment used as expression
-            self._analyze_assignment(expr)
-            return self._analyze_expression(expr.target)
+        handler = self._expr_dispatch.get(type(expr))
+        if handler:
+            return handler(expr)
         return None
     
+    def _analyze_assignment_expr(self, expr: AssignmentStatement) -> Optional[SinterType]:
+        """Analyze an assignment used as an expression; its type is the target's"""
+        self._analyze_assignment(expr)
+        return self._analyze_expression(expr.target)
+    
     def _analyze_literal(self, lit: Literal) -> SinterType:
         """Analyze a literal and return its type"""
-        type_map = {
-            "int": "int",
-            "float": "float",
-            "double": "double",
-            "boolean": "boolean",
-            "str": "str",
-            "d_str": "d_str",
-            "null": "null",
-        }
-        type_name = type_map.get(lit.literal_type, "int")
-        return self.type_registry.get(type_name)
+        return self._literal_types.get(lit.literal_type, self._t_int)
     
     def _analyze_identifier(self, ident: Identifier) -> Optional[SinterType]:
         """Analyze an identifier and return its type"""
@@ -462,6 +621,10 @@ class SemanticAnalyzer:
                     return field.field_type
             self._error(f"Undefined identifier '{ident.name}'", ident.line, ident.column)
             return None
+        if symbol.is_poisoned:
+            # Already reported at the declaration; an unknown type makes
+            # every expression using it unknown too
+            return None
         return symbol.symbol_type
     
     def _analyze_binary(self, expr: BinaryExpression) -> Optional[SinterType]:
@@ -472,16 +635,13 @@ class SemanticAnalyzer:
         if not left_type or not right_type:
             return None
         
-        # Comparison operators return boolean
-        if expr.operator in ["==", "!=", "<", ">", "<=", ">="]:
-            return self.type_registry.get("boolean")
-        
-        # Logical operators return boolean
-        if expr.operator in ["&&", "||"]:
-            return self.type_registry.get("boolean")
+        # Comparison and logical operators return boolean
+        operator = expr.operator
+        if operator in _BOOLEAN_BINARY_OPS:
+            return self._t_bool
         
         # Arithmetic operators return the wider type
-        if expr.operator in ["+", "-", "*", "/", "%"]:
+        if operator in _ARITHMETIC_BINARY_OPS:
             return self._wider_type(left_type, right_type)
         
         return left_type
@@ -492,28 +652,32 @@ class SemanticAnalyzer:
         if not operand_type:
             return None
         
-        if expr.operator == "!":
-            return self.type_registry.get("boolean")
-        elif expr.operator == "-":
-            return operand_type
-        elif expr.operator == "*":  # Dereference
-            if operand_type.is_pointer():
-                return operand_type.pointee_type
-            self._error("Cannot dereference non-pointer type", 0, 0)
-            return None
-        elif expr.operator == "&":  # Address-of
-            return self.type_registry.get_or_create_pointer(operand_type)
-        elif expr.operator in ["++", "--"]:
-            return operand_type
-        
+        handler = self._unary_dispatch.get(expr.operator)
+        if handler:
+            return handler(operand_type)
         return operand_type
     
+    def _unary_not(self, operand_type: SinterType) -> SinterType:
+        """Logical not always yields a boolean"""
+        return self._t_bool
+    
+    def _unary_deref(self, operand_type: SinterType) -> Optional[SinterType]:
+        """Dereference yields the pointee type"""
+        if operand_type.is_pointer():
+            return operand_type.pointee_type
+        self._error("Cannot dereference non-pointer type", 0, 0)
+        return None
+    
+    def _unary_address_of(self, operand_type: SinterType) -> SinterType:
+        """Address-of yields a pointer to the operand type"""
+        return self.type_registry.get_or_create_pointer(operand_type)
+    
     def _analyze_member_access(self, expr: MemberAccess) -> Optional[SinterType]:
         """Analyze member access (obj.member)"""
         # Special case: Class.new() constructor call
         if expr.member == "new" and isinstance(expr.object_expr, Identifier):
-            class_type = self.type_registry.get(expr.object_expr.name)
-            if isinstance(class_type, ClassType):
+            class_type = self.type_registry.get_class(expr.object_expr.name)
+            if class_type is not None:
                 # Return a function type that returns pointer to class
                 ptr_type = self.type_registry.get_or_create_pointer(class_type)
                 return FunctionType(ptr_type, [])
@@ -547,6 +711,13 @@ class SemanticAnalyzer:
     def _analyze_method_call(self, expr: MethodCall) -> Optional[SinterType]:
         """Analyze a method call"""
         callee_type = self._analyze_expression(expr.callee)
+        # p.clean() and p.release() settle a pointer variable's cleanup
+        if expr.callee_kind == CALLEE_MEMBER and expr.callee.member in ("clean", "release"):
+            obj = expr.callee.object_expr
+            if isinstance(obj, Identifier):
+                symbol = self.symbol_table.resolve(obj.name)
+                if symbol is not None and symbol.is_pointer_allocated:
+                    self.symbol_table.mark_cleaned(symbol)
         if not callee_type:
             return None
         
@@ -572,15 +743,15 @@ class SemanticAnalyzer:
             return callee_type.return_type
         
         # Could be a constructor call (Class.new())
-        if isinstance(expr.callee, MemberAccess) and expr.callee.member == "new":
+        if expr.callee_kind == CALLEE_MEMBER and expr.callee.member == "new":
             return callee_type
         
         return None
     
     def _analyze_new(self, expr: NewExpression) -> Optional[SinterType]:
         """Analyze a 'new' expression"""
-        class_type = self.type_registry.get(expr.class_name)
-        if not class_type:
+        class_type = self.type_registry.get_class(expr.class_name)
+        if class_type is None:
             self._error(f"Unknown class '{expr.class_name}'", 0, 0)
             return None
         
@@ -603,61 +774,75 @@ class SemanticAnalyzer:
     
     def _resolve_type(self, type_name: str) -> Optional[SinterType]:
         """Resolve a type name to a SinterType"""
-        # Check for pointer type
-        if type_name.endswith("*"):
-            base_name = type_name[:-1].strip()
-            base_type = self._resolve_type(base_name)
-            if base_type:
-                return self.type_registry.get_or_create_pointer(base_type)
+        cached = self._type_name_cache.get(type_name)
+        if cached is not None:
+            return cached
+        
+        # Peel pointer suffixes ("Foo* *" is two levels deep) without recursing
+        base_name = type_name
+        depth = 0
+        while base_name.endswith("*"):
+            base_name = base_name[:-1].strip()
+            depth += 1
+        
+        resolved = self.type_registry.get(base_name)
+        if not resolved:
             return None
+        for _ in range(depth):
+            resolved = self.type_registry.get_or_create_pointer(resolved)
         
-        return self.type_registry.get(type_name)
+        self._type_name_cache[type_name] = resolved
+        return resolved
     
     def _types_compatible(self, target: SinterType, source: SinterType) -> bool:
         """Check if source type can be assigned to target type"""
-        if target == source:
+        # Registry types are interned, so identity settles the common case
+        if target is source:
             return True
         
-        # Null can be assigned to any pointer
-        if source.name == "null" and target.is_pointer():
+        # Types are registered by name, so equal names mean equal types
+        # (this also covers non-interned ones such as FunctionType)
+        target_name = target.name
+        source_name = source.name
+        if target_name == source_name:
             return True
         
-        # D-strings are compatible with strings (they produce string values)
-        if target.name == "str" and source.name == "d_str":
+        # Numeric promotions and d-string -> string, from the precomputed table
+        if (target_name, source_name) in _IMPLICIT_CONVERSIONS:
             return True
         
-        # Numeric promotions
-        numeric_types = {"byte", "short", "int", "long", "float", "double"}
-        if target.name in numeric_types and source.name in numeric_types:
-            # Allow implicit widening
+        # Null can be assigned to any pointer
+        if source_name == "null" and target.is_pointer():
             return True
         
-        # Class inheritance
-        if target.is_class() and source.is_class():
-            # Check if source is subclass of target
-            if isinstance(source, ClassType):
-                parent = source.parent_class
-                while parent:
-                    if parent == target:
-                        return True
-                    parent = parent.parent_class
+        # Class inheritance: source is a subclass of target
+        if target.is_class() and isinstance(source, ClassType):
+            if target in source.ancestors:
+                return True
         
         return False
     
     def _wider_type(self, t1: SinterType, t2: SinterType) -> SinterType:
         """Return the wider of two numeric types"""
-        type_order = ["byte", "short", "int", "long", "float", "double"]
-        try:
-            idx1 = type_order.index(t1.name)
-            idx2 = type_order.index(t2.name)
-            return t1 if idx1 >= idx2 else t2
-        except ValueError:
+        rank1 = _NUMERIC_RANK.get(t1.name)
+        rank2 = _NUMERIC_RANK.get(t2.name)
+        if rank1 is None or rank2 is None:
             return t1
+        return t1 if rank1 >= rank2 else t2
     
     def _error(self, message: str, line: int, column: int):
-        """Record an error"""
-        loc = f" at line {line}, column {column}" if line > 0 else ""
-        self.errors.append(f"Error{loc}: {message}")
+        """Record an error (formatted only when analysis fails)"""
+        self.errors.append((message, line, column))
+        if len(self.errors) >= self.MAX_ERRORS:
+            raise SemanticError(self._format_errors() + "\nToo many errors, stopping analysis")
+    
+    def _format_errors(self) -> str:
+        """Format the recorded errors, one per line"""
+        lines = []
+        for message, line, column in self.errors:
+            loc = f" at line {line}, column {column}" if line > 0 else ""
+            lines.append(f"Error{loc}: {message}")
+        return "\n".join(lines)
     
     def _warning(self, message: str, line: int, column: int):
         """Record a warning"""
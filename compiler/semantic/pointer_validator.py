@@ -3,91 +3,215 @@ Pointer Cleanup Validator for Sinter Programming Language
 Ensures all allocated pointers are cleaned up before scope exit
 """
 
-from typing import Dict, List, Set, Optional, Tuple
+from array import array
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterator, List, Set, Optional, Tuple, Union
 from compiler.sinter_ast.nodes import (
     ASTNode, Program, ClassDeclaration, MethodDeclaration, FunctionDeclaration,
     Block, Statement, ExpressionStatement, ReturnStatement, VariableDeclaration,
     IfStatement, WhileStatement, AssignmentStatement, Expression, Identifier,
-    MemberAccess, MethodCall, NewExpression, BinaryExpression, UnaryExpression
+    MethodCall, NewExpression, BinaryExpression, UnaryExpression, walk, CALLEE_MEMBER
 )
+from compiler.sinter_ast.visitor import ASTVisitor
 from compiler.sinter_types.types import SinterType, PointerType, ClassType
 
 
-class PointerState:
+# Diagnostic templates, filled in with str.format
+_ERR_UNCLEAN_AT_EXIT = (
+    "Pointer '{name}' allocated at line {line} is not cleaned up "
+    "before exit of {where}. "
+    "Use {name}.release() or {name}.clean() before returning."
+)
+_ERR_UNCLEAN_AT_RETURN = (
+    "Pointer '{name}' allocated at line {line} is not cleaned up "
+    "before return statement. "
+    "Use {name}.release() or {name}.clean() before returning."
+)
+_WARN_BRANCH_DIFF = (
+    "Pointer '{name}' is cleaned in one branch but not the other. "
+    "Consider cleaning in both branches or after the if statement."
+)
+_WARN_LOOP_ALLOC = (
+    "Pointer '{name}' allocated at line {line} inside a loop "
+    "may cause memory leaks. Ensure cleanup happens each iteration."
+)
+_WARN_OVERWRITE = (
+    "Pointer '{name}' is being overwritten without "
+    "being cleaned. This may cause a memory leak."
+)
+
+
+class PointerState(IntEnum):
     """Tracks the state of a pointer variable"""
-    ALLOCATED = "allocated"
-    RELEASED = "released"
-    CLEANED = "cleaned"
-    UNKNOWN = "unknown"
+    ALLOCATED = 1
+    RELEASED = 2
+    CLEANED = 3
+    UNKNOWN = 4
 
 
 class PointerTracker:
     """Tracks pointer allocations and cleanups in a scope"""
+    __slots__ = ("parent", "pointers", "_alloc_names", "_alloc_lines", "_alloc_cols", "_owners",
+                 "_live")
     
     def __init__(self, parent: Optional['PointerTracker'] = None):
         self.parent = parent
-        self.pointers: Dict[str, str] = {}  # name -> state
-        self.allocations: List[Tuple[str, int, int]] = []  # (name, line, col)
+        self.pointers: Dict[str, PointerState] = {}  # name -> state
+        # Allocations in order, as parallel name / line / column columns.
+        # Positions are unsigned 32-bit; names are already interned by the
+        # lexer, so the name column is effectively a column of ids.
+        self._alloc_names: List[str] = []
+        self._alloc_lines: array = array('I')
+        self._alloc_cols: array = array('I')
+        # name -> ancestor tracker that owns it. A parent never allocates
+        # while a child is live, so entries cannot go stale.
+        self._owners: Dict[str, 'PointerTracker'] = {}
+        # Pointers currently ALLOCATED here, kept in step with every state
+        # change so scope-exit checks can skip a tracker with none
+        self._live = 0
+    
+    def _owner(self, name: str) -> Optional['PointerTracker']:
+        """Find the tracker holding a pointer's state, walking parents once"""
+        if name in self.pointers:
+            return self
+        owner = self._owners.get(name)
+        if owner is None:
+            owner = self.parent
+            while owner is not None and name not in owner.pointers:
+                owner = owner.parent
+            if owner is None:
+                return None
+            self._owners[name] = owner
+        return owner
+    
+    def reset(self, parent: Optional['PointerTracker'] = None):
+        """Empty the tracker so it can be reused for another scope"""
+        self.parent = parent
+        # Most scopes never allocate, so their containers are still empty
+        if self._alloc_names:
+            self.pointers.clear()
+            del self._alloc_names[:]
+            del self._alloc_lines[:]
+            del self._alloc_cols[:]
+            self._live = 0
+        if self._owners:
+            self._owners.clear()
     
     def allocate(self, name: str, line: int = 0, col: int = 0):
         """Record a pointer allocation"""
+        if self.pointers.get(name) != PointerState.ALLOCATED:
+            self._live += 1
         self.pointers[name] = PointerState.ALLOCATED
-        self.allocations.append((name, line, col))
+        self._alloc_names.append(name)
+        self._alloc_lines.append(line)
+        self._alloc_cols.append(col)
+    
+    @property
+    def allocations(self) -> List[Tuple[str, int, int]]:
+        """All recorded allocations as (name, line, col)"""
+        return list(zip(self._alloc_names, self._alloc_lines, self._alloc_cols))
     
     def release(self, name: str):
         """Mark a pointer as released (still exists in another scope)"""
-        if name in self.pointers:
-            self.pointers[name] = PointerState.RELEASED
-        elif self.parent:
-            self.parent.release(name)
+        self._set_freed(name, PointerState.RELEASED)
     
     def clean(self, name: str):
         """Mark a pointer as cleaned (memory freed)"""
-        if name in self.pointers:
-            self.pointers[name] = PointerState.CLEANED
-        elif self.parent:
-            self.parent.clean(name)
+        self._set_freed(name, PointerState.CLEANED)
     
-    def get_state(self, name: str) -> Optional[str]:
+    def _set_freed(self, name: str, state: PointerState):
+        """Move a pointer out of ALLOCATED in whichever tracker owns it"""
+        owner = self._owner(name)
+        if owner is not None:
+            if owner.pointers[name] == PointerState.ALLOCATED:
+                owner._live -= 1
+            owner.pointers[name] = state
+    
+    def get_state(self, name: str) -> Optional[PointerState]:
         """Get the state of a pointer"""
-        if name in self.pointers:
-            return self.pointers[name]
-        if self.parent:
-            return self.parent.get_state(name)
+        owner = self._owner(name)
+        if owner is not None:
+            return owner.pointers[name]
         return None
     
+    def has_live(self) -> bool:
+        """Whether any pointer allocated in this scope is still ALLOCATED"""
+        return self._live > 0
+    
+    def iter_unclean(self) -> Iterator[Tuple[str, int, int]]:
+        """Yield the allocations of pointers that haven't been cleaned or released"""
+        if not self._live:
+            return
+        pointers = self.pointers
+        for name, line, col in zip(self._alloc_names, self._alloc_lines, self._alloc_cols):
+            if pointers.get(name) == PointerState.ALLOCATED:
+                yield name, line, col
+    
     def get_unclean_pointers(self) -> List[Tuple[str, int, int]]:
         """Get all pointers that haven't been cleaned or released"""
-        unclean = []
-        for name, line, col in self.allocations:
-            state = self.pointers.get(name)
-            if state == PointerState.ALLOCATED:
-                unclean.append((name, line, col))
-        return unclean
+        return list(self.iter_unclean())
 
 
-class PointerValidator:
+class PointerValidator(ASTVisitor):
     """Validates pointer cleanup at scope exit"""
     
     def __init__(self):
         self.errors: List[str] = []
+        self._tracker_pool: List[PointerTracker] = []  # Trackers of exited scopes
+        self._work: List[Tuple[Callable[[Any, Any], None], Any]] = []  # See _validate_block
         self.warnings: List[str] = []
         self.current_tracker: Optional[PointerTracker] = None
-        self.pointer_types: Dict[str, SinterType] = {}  # var name -> type
+        self.pointer_types: Dict[str, str] = {}  # var name -> declared type name
     
     def validate(self, ast: Program) -> Tuple[List[str], List[str]]:
         """Validate pointer cleanup in the entire program"""
         self.errors = []
         self.warnings = []
+        # Methods of classes no function can reach (through 'new',
+        # 'Class.new()' or a static call) never run, so are not validated
+        reachable = self._reachable_classes(ast)
         
         for decl in ast.declarations:
             if isinstance(decl, ClassDeclaration):
-                self._validate_class(decl)
+                if decl.name in reachable:
+                    self._validate_class(decl)
             elif isinstance(decl, FunctionDeclaration):
                 self._validate_function(decl)
         
         return self.errors, self.warnings
     
+    def _reachable_classes(self, ast: Program) -> Set[str]:
+        """
+        Names of the classes whose code can run: those named anywhere in a
+        top-level function, then those named in reachable classes, plus the
+        ancestors of each. Stored on the program for later runs.
+        """
+        reachable = ast._reachable_classes
+        if reachable is not None:
+            return reachable
+        
+        classes = {decl.name: decl for decl in ast.declarations
+                   if isinstance(decl, ClassDeclaration)}
+        reachable = set()
+        pending: List[ASTNode] = [decl for decl in ast.declarations
+                                  if isinstance(decl, FunctionDeclaration)]
+        while pending:
+            for node in walk(pending.pop()):
+                node_type = type(node)
+                if node_type is NewExpression:
+                    name = node.class_name
+                elif node_type is Identifier:
+                    name = node.name
+                else:
+                    continue
+                while name in classes and name not in reachable:
+                    reachable.add(name)
+                    pending.append(classes[name])
+                    name = classes[name].extends
+        
+        ast._reachable_classes = reachable
+        return reachable
+    
     def _validate_class(self, class_decl: ClassDeclaration):
         """Validate pointer cleanup in a class"""
         for member in class_decl.members:
@@ -96,78 +220,124 @@ class PointerValidator:
     
     def _validate_method(self, method: MethodDeclaration, class_name: str):
         """Validate pointer cleanup in a method"""
-        self.current_tracker = PointerTracker()
+        if not self._body_allocates(method):
+            return
+        self.current_tracker = self._acquire_tracker(None)
         self.pointer_types = {}
         
         if method.body:
             self._validate_block(method.body)
         
         # Check for uncleaned pointers at method exit
-        unclean = self.current_tracker.get_unclean_pointers()
-        for name, line, col in unclean:
-            self.errors.append(
-                f"Pointer '{name}' allocated at line {line} is not cleaned up "
-                f"before exit of method {class_name}.{method.name}(). "
-                f"Use {name}.release() or {name}.clean() before returning."
-            )
+        self._report_unclean(_ERR_UNCLEAN_AT_EXIT, where=f"method {class_name}.{method.name}()")
         
+        self._tracker_pool.append(self.current_tracker)
         self.current_tracker = None
     
     def _validate_function(self, func: FunctionDeclaration):
         """Validate pointer cleanup in a function"""
-        self.current_tracker = PointerTracker()
+        if not self._body_allocates(func):
+            return
+        self.current_tracker = self._acquire_tracker(None)
         self.pointer_types = {}
         
         if func.body:
             self._validate_block(func.body)
         
         # Check for uncleaned pointers at function exit
-        unclean = self.current_tracker.get_unclean_pointers()
-        for name, line, col in unclean:
-            self.errors.append(
-                f"Pointer '{name}' allocated at line {line} is not cleaned up "
-                f"before exit of function {func.name}(). "
-                f"Use {name}.release() or {name}.clean() before returning."
-            )
+        self._report_unclean(_ERR_UNCLEAN_AT_EXIT, where=f"function {func.name}()")
         
+        self._tracker_pool.append(self.current_tracker)
         self.current_tracker = None
     
+    def _body_allocates(self, decl: Union[MethodDeclaration, FunctionDeclaration]) -> bool:
+        """
+        Whether a method or function body contains an allocation the
+        validator tracks. Without one there is nothing to report, so the
+        tracker walk is skipped. The answer is stored on the declaration.
+        """
+        has_allocation = decl._has_allocation
+        if has_allocation is None:
+            has_allocation = bool(decl.body) and self._block_allocates(decl.body)
+            decl._has_allocation = has_allocation
+        return has_allocation
+    
+    def _block_allocates(self, block: Block) -> bool:
+        """Scan the statements the validator visits for a tracked allocation"""
+        is_allocation = self._is_allocation
+        pending = [block]
+        while pending:
+            for stmt in pending.pop().statements:
+                stmt_type = type(stmt)
+                if stmt_type is VariableDeclaration:
+                    if stmt.initial_value and is_allocation(stmt.initial_value):
+                        return True
+                elif stmt_type is AssignmentStatement:
+                    if is_allocation(stmt.value):
+                        return True
+                elif stmt_type is IfStatement:
+                    pending.append(stmt.then_block)
+                    if stmt.else_block:
+                        pending.append(stmt.else_block)
+                elif stmt_type is WhileStatement:
+                    pending.append(stmt.body)
+        return False
+    
+    def _acquire_tracker(self, parent: Optional[PointerTracker]) -> PointerTracker:
+        """Take a tracker for a new scope, reusing one from an exited scope"""
+        if self._tracker_pool:
+            tracker = self._tracker_pool.pop()
+            tracker.reset(parent)
+            return tracker
+        return PointerTracker(parent)
+    
     def _validate_block(self, block: Block):
-        """Validate pointer cleanup in a block"""
-        for stmt in block.statements:
-            self._validate_statement(stmt)
-    
-    def _validate_statement(self, stmt: Statement):
-        """Validate a statement for pointer operations"""
-        if isinstance(stmt, VariableDeclaration):
-            self._validate_var_declaration(stmt)
-        elif isinstance(stmt, ExpressionStatement):
-            self._validate_expression(stmt.expression)
-        elif isinstance(stmt, ReturnStatement):
-            # Check for uncleaned pointers before return
-            if self.current_tracker:
-                unclean = self.current_tracker.get_unclean_pointers()
-                for name, line, col in unclean:
-                    self.errors.append(
-                        f"Pointer '{name}' allocated at line {line} is not cleaned up "
-                        f"before return statement. "
-                        f"Use {name}.release() or {name}.clean() before returning."
-                    )
-        elif isinstance(stmt, IfStatement):
-            self._validate_if(stmt)
-        elif isinstance(stmt, WhileStatement):
-            self._validate_while(stmt)
-        elif isinstance(stmt, AssignmentStatement):
-            self._validate_assignment(stmt)
-    
-    def _validate_var_declaration(self, stmt: VariableDeclaration):
+        """
+        Validate pointer cleanup in a block. Nested if/while bodies are
+        queued on a work stack of (unbound handler, argument) pairs instead
+        of recursed into; scope exits are queued alongside them.
+        """
+        work = self._work
+        base = len(work)
+        self._push_block(block)
+        while len(work) > base:
+            handler, arg = work.pop()
+            handler(self, arg)
+    
+    def _push_block(self, block: Block):
+        """Queue a block's statements so they pop off the work stack in order"""
+        handlers = self._HANDLERS
+        work = self._work
+        for stmt in reversed(block.statements):
+            handler = handlers.get(type(stmt))
+            if handler:
+                work.append((handler, stmt))
+    
+    def _enter_tracker(self, tracker: PointerTracker):
+        """Make a queued branch's tracker current"""
+        self.current_tracker = tracker
+    
+    def visit_ExpressionStatement(self, stmt: ExpressionStatement):
+        """Validate an expression used as a statement"""
+        self._validate_expression(stmt.expression)
+    
+    def visit_ReturnStatement(self, stmt: ReturnStatement):
+        """Check for uncleaned pointers before return"""
+        if self.current_tracker:
+            self._report_unclean(_ERR_UNCLEAN_AT_RETURN)
+    
+    def _report_unclean(self, template: str, **context):
+        """Record an error for every pointer the current tracker leaves allocated"""
+        errors = self.errors
+        for name, line, _ in self.current_tracker.iter_unclean():
+            errors.append(template.format(name=name, line=line, **context))
+    
+    def visit_VariableDeclaration(self, stmt: VariableDeclaration):
         """Check if a variable declaration involves pointer allocation"""
         if stmt.initial_value and self._is_allocation(stmt.initial_value):
             # This is a pointer allocation
             if self.current_tracker:
-                line = getattr(stmt, 'line', 0)
-                col = getattr(stmt, 'column', 0)
-                self.current_tracker.allocate(stmt.name, line, col)
+                self.current_tracker.allocate(stmt.name, stmt.line, stmt.column)
                 self.pointer_types[stmt.name] = stmt.type_name
     
     def _validate_expression(self, expr: Expression):
@@ -177,7 +347,7 @@ class PointerValidator:
     
     def _validate_method_call(self, call: MethodCall):
         """Check for release() or clean() calls"""
-        if isinstance(call.callee, MemberAccess):
+        if call.callee_kind == CALLEE_MEMBER:
             method_name = call.callee.member
             
             # Get the object name
@@ -191,59 +361,63 @@ class PointerValidator:
                 elif method_name == "clean":
                     self.current_tracker.clean(obj_name)
     
-    def _validate_if(self, stmt: IfStatement):
+    def visit_IfStatement(self, stmt: IfStatement):
         """Validate pointer cleanup in if statement"""
         # Create child trackers for branches
         parent_tracker = self.current_tracker
+        then_tracker = self._acquire_tracker(parent_tracker)
+        else_tracker = self._acquire_tracker(parent_tracker) if stmt.else_block else None
         
-        # Validate then branch
-        then_tracker = PointerTracker(parent_tracker)
+        # Queued in reverse: then branch, else branch, then the comparison
+        work = self._work
+        work.append((PointerValidator._finish_if, (then_tracker, else_tracker)))
+        if else_tracker:
+            self._push_block(stmt.else_block)
+            work.append((PointerValidator._enter_tracker, else_tracker))
+        self._push_block(stmt.then_block)
         self.current_tracker = then_tracker
-        self._validate_block(stmt.then_block)
-        
-        # Validate else branch if exists
-        else_tracker = None
-        if stmt.else_block:
-            else_tracker = PointerTracker(parent_tracker)
-            self.current_tracker = else_tracker
-            self._validate_block(stmt.else_block)
+    
+    def _finish_if(self, trackers: Tuple[PointerTracker, Optional[PointerTracker]]):
+        """Leave an if statement once both branches have been validated"""
+        then_tracker, else_tracker = trackers
         
         # Restore parent tracker
-        self.current_tracker = parent_tracker
+        self.current_tracker = then_tracker.parent
         
-        # Warn if pointer cleanup differs between branches
+        # Warn if pointer cleanup differs between branches: a name left
+        # allocated in one branch but not in the other. Usually neither
+        # branch holds a live allocation and there is nothing to compare.
+        if else_tracker and (then_tracker.has_live() or else_tracker.has_live()):
+            warned: Set[str] = set()
+            for branch, other in ((then_tracker, else_tracker), (else_tracker, then_tracker)):
+                other_pointers = other.pointers
+                for name, _, _ in branch.iter_unclean():
+                    if name in warned or other_pointers.get(name) == PointerState.ALLOCATED:
+                        continue
+                    warned.add(name)
+                    self.warnings.append(_WARN_BRANCH_DIFF.format(name=name))
         if else_tracker:
-            then_unclean = set(n for n, _, _ in then_tracker.get_unclean_pointers())
-            else_unclean = set(n for n, _, _ in else_tracker.get_unclean_pointers())
-            
-            diff = then_unclean.symmetric_difference(else_unclean)
-            for name in diff:
-                self.warnings.append(
-                    f"Pointer '{name}' is cleaned in one branch but not the other. "
-                    f"Consider cleaning in both branches or after the if statement."
-                )
-    
-    def _validate_while(self, stmt: WhileStatement):
+            self._tracker_pool.append(else_tracker)
+        self._tracker_pool.append(then_tracker)
+    
+    def visit_WhileStatement(self, stmt: WhileStatement):
         """Validate pointer cleanup in while loop"""
         # Allocations inside a loop are problematic if not cleaned each iteration
-        parent_tracker = self.current_tracker
-        loop_tracker = PointerTracker(parent_tracker)
+        loop_tracker = self._acquire_tracker(self.current_tracker)
+        self._work.append((PointerValidator._finish_while, loop_tracker))
+        self._push_block(stmt.body)
         self.current_tracker = loop_tracker
-        
-        self._validate_block(stmt.body)
-        
+    
+    def _finish_while(self, loop_tracker: PointerTracker):
+        """Leave a while loop once its body has been validated"""
         # Warn about allocations inside loops
-        for name, line, col in loop_tracker.allocations:
-            state = loop_tracker.pointers.get(name)
-            if state == PointerState.ALLOCATED:
-                self.warnings.append(
-                    f"Pointer '{name}' allocated at line {line} inside a loop "
-                    f"may cause memory leaks. Ensure cleanup happens each iteration."
-                )
+        for name, line, col in loop_tracker.iter_unclean():
+            self.warnings.append(_WARN_LOOP_ALLOC.format(name=name, line=line))
         
-        self.current_tracker = parent_tracker
+        self.current_tracker = loop_tracker.parent
+        self._tracker_pool.append(loop_tracker)
     
-    def _validate_assignment(self, stmt: AssignmentStatement):
+    def visit_AssignmentStatement(self, stmt: AssignmentStatement):
         """Check if assignment involves pointer allocation"""
         if self._is_allocation(stmt.value):
             if isinstance(stmt.target, Identifier):
@@ -251,21 +425,17 @@ class PointerValidator:
                     # Check if we're overwriting an existing pointer
                     existing_state = self.current_tracker.get_state(stmt.target.name)
                     if existing_state == PointerState.ALLOCATED:
-                        self.warnings.append(
-                            f"Pointer '{stmt.target.name}' is being overwritten without "
-                            f"being cleaned. This may cause a memory leak."
-                        )
+                        self.warnings.append(_WARN_OVERWRITE.format(name=stmt.target.name))
                     
-                    line = getattr(stmt, 'line', 0)
-                    col = getattr(stmt, 'column', 0)
-                    self.current_tracker.allocate(stmt.target.name, line, col)
+                    self.current_tracker.allocate(stmt.target.name, stmt.line, stmt.column)
     
     def _is_allocation(self, expr: Expression) -> bool:
         """Check if an expression is a pointer allocation"""
-        if isinstance(expr, NewExpression):
+        # Each declaration and assignment is classified exactly once per
+        # run, so a straight test beats any memo keyed on the node
+        expr_type = type(expr)
+        if expr_type is NewExpression:
             return True
-        if isinstance(expr, MethodCall):
-            if isinstance(expr.callee, MemberAccess):
-                if expr.callee.member == "new":
-                    return True
+        if expr_type is MethodCall:
+            return expr.callee_kind == CALLEE_MEMBER and expr.callee.member == "new"
         return False
@@ -2,9 +2,11 @@
 Abstract Syntax Tree nodes for Sinter Programming Language
 """
 
+import re
 from abc import ABC, abstractmethod
+from io import StringIO
 from enum import Enum
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 
 
 class Visibility(Enum):
@@ -13,8 +15,14 @@ class Visibility(Enum):
     PUBLIC = "public"
 
 
+# key=value pairs inside an annotation's parentheses
+_ANNOTATION_PARAM_RE = re.compile(r"(\w+)\s*=\s*(\w*)")
+
+
 class AttributeAnnotation:
     """Represents an @attribute annotation"""
+    __slots__ = ("read_only", "write_only", "derived", "serializable")
+
     def __init__(
         self,
         read_only: bool = False,
@@ -34,12 +42,10 @@ class AttributeAnnotation:
             return cls(serializable=True)  # Default: serializable
         
         # Parse parameters
-        params_str = annotation_str[annotation_str.index("(")+1:annotation_str.rindex(")")]
-        params = {}
-        for param in params_str.split(","):
-            if "=" in param:
-                key, value = param.split("=", 1)
-                params[key.strip()] = value.strip() == "true"
+        params = {
+            key: value == "true"
+            for key, value in _ANNOTATION_PARAM_RE.findall(annotation_str)
+        }
         
         return cls(
             read_only=params.get("read_only", False),
@@ -51,27 +57,56 @@ class AttributeAnnotation:
 
 class ASTNode(ABC):
     """Base class for all AST nodes"""
+    __slots__ = ("line", "column")
+
     def __init__(self, line: int = 0, column: int = 0):
         self.line = line
         self.column = column
 
     @abstractmethod
-    def __repr__(self) -> str:
+    def _write(self, out: StringIO):
+        """Write this node's source-like form into a shared buffer"""
         pass
 
+    def __repr__(self) -> str:
+        out = StringIO()
+        self._write(out)
+        return out.getvalue()
+
+
+def _write_value(out: StringIO, value: Any):
+    """Write a child: nodes stream into the buffer, anything else goes through str()"""
+    if isinstance(value, ASTNode):
+        value._write(out)
+    else:
+        out.write(str(value))
+
+
+def _write_list(out: StringIO, items: List[Any]):
+    """Write children separated by commas"""
+    for i, item in enumerate(items):
+        if i:
+            out.write(", ")
+        _write_value(out, item)
+
 
 class Program(ASTNode):
     """Root node representing the entire program"""
+    __slots__ = ("declarations", "_reachable_classes")
+
     def __init__(self, declarations: List[ASTNode]):
         super().__init__()
         self.declarations = declarations
+        self._reachable_classes: Optional[set] = None  # Set by the pointer validator
 
-    def __repr__(self):
-        return f"Program({len(self.declarations)} declarations)"
+    def _write(self, out: StringIO):
+        out.write(f"Program({len(self.declarations)} declarations)")
 
 
 class ClassDeclaration(ASTNode):
     """Represents a class definition"""
+    __slots__ = ("name", "type_parameters", "extends", "implements", "members")
+
     def __init__(
         self,
         name: str,
@@ -89,26 +124,30 @@ class ClassDeclaration(ASTNode):
         self.implements = implements or []
         self.members = members or []
 
-    def __repr__(self):
+    def _write(self, out: StringIO):
         params = f"<{', '.join(self.type_parameters)}>" if self.type_parameters else ""
         extends_str = f" extends {self.extends}" if self.extends else ""
         impl_str = f" implements {', '.join(self.implements)}" if self.implements else ""
-        return f"Class({self.name}{params}{extends_str}{impl_str})"
+        out.write(f"Class({self.name}{params}{extends_str}{impl_str})")
 
 
 class ScopeBlock(ASTNode):
     """Represents a visibility scope block (private, protected, public)"""
+    __slots__ = ("visibility", "members")
+
     def __init__(self, visibility: Visibility, members: List[ASTNode]):
         super().__init__()
         self.visibility = visibility
         self.members = members
 
-    def __repr__(self):
-        return f"ScopeBlock({self.visibility.value}, {len(self.members)} members)"
+    def _write(self, out: StringIO):
+        out.write(f"ScopeBlock({self.visibility.value}, {len(self.members)} members)")
 
 
 class FieldDeclaration(ASTNode):
     """Represents a field/attribute declaration"""
+    __slots__ = ("name", "type_name", "is_const", "initial_value", "annotation")
+
     def __init__(
         self,
         name: str,
@@ -126,15 +165,21 @@ class FieldDeclaration(ASTNode):
         self.initial_value = initial_value
         self.annotation = annotation
 
-    def __repr__(self):
-        const_str = "const " if self.is_const else "var "
-        annot_str = f" {self.annotation}" if self.annotation else ""
-        init_str = f" = {self.initial_value}" if self.initial_value else ""
-        return f"Field({const_str}{self.name}: {self.type_name}{annot_str}{init_str})"
+    def _write(self, out: StringIO):
+        out.write("Field(const " if self.is_const else "Field(var ")
+        out.write(f"{self.name}: {self.type_name}")
+        if self.annotation:
+            out.write(f" {self.annotation}")
+        if self.initial_value:
+            out.write(" = ")
+            _write_value(out, self.initial_value)
+        out.write(")")
 
 
 class MethodDeclaration(ASTNode):
     """Represents a method declaration"""
+    __slots__ = ("name", "parameters", "return_type", "body", "is_static", "_has_allocation")
+
     def __init__(
         self,
         name: str,
@@ -151,15 +196,19 @@ class MethodDeclaration(ASTNode):
         self.return_type = return_type
         self.body = body
         self.is_static = is_static  # True for 'function', False for 'method'
+        self._has_allocation: Optional[bool] = None  # Set by the pointer validator
 
-    def __repr__(self):
-        static_str = "function " if self.is_static else "method "
-        params_str = ", ".join(str(p) for p in self.parameters)
-        return f"{static_str}{self.name}({params_str}) -> {self.return_type}"
+    def _write(self, out: StringIO):
+        out.write("function " if self.is_static else "method ")
+        out.write(f"{self.name}(")
+        _write_list(out, self.parameters)
+        out.write(f") -> {self.return_type}")
 
 
 class FunctionDeclaration(ASTNode):
     """Represents a function declaration (outside of class)"""
+    __slots__ = ("name", "parameters", "return_type", "body", "_has_allocation")
+
     def __init__(
         self,
         name: str,
@@ -174,289 +223,429 @@ class FunctionDeclaration(ASTNode):
         self.parameters = parameters
         self.return_type = return_type
         self.body = body
+        self._has_allocation: Optional[bool] = None  # Set by the pointer validator
 
-    def __repr__(self):
-        params_str = ", ".join(str(p) for p in self.parameters)
-        return f"function {self.name}({params_str}) -> {self.return_type}"
+    def _write(self, out: StringIO):
+        out.write(f"function {self.name}(")
+        _write_list(out, self.parameters)
+        out.write(f") -> {self.return_type}")
 
 
 class Parameter(ASTNode):
     """Represents a function/method parameter"""
+    __slots__ = ("name", "type_name")
+
     def __init__(self, name: str, type_name: str, line: int = 0, column: int = 0):
         super().__init__(line, column)
         self.name = name
         self.type_name = type_name
 
-    def __repr__(self):
-        return f"{self.name}: {self.type_name}"
+    def _write(self, out: StringIO):
+        out.write(f"{self.name}: {self.type_name}")
 
 
 class Block(ASTNode):
     """Represents a block of statements"""
+    __slots__ = ("statements", "_declares_var")
+
     def __init__(self, statements: List[ASTNode]):
         super().__init__()
         self.statements = statements
+        self._declares_var: Optional[bool] = None  # Set by the semantic analyzer
 
-    def __repr__(self):
-        return f"Block({len(self.statements)} statements)"
+    def _write(self, out: StringIO):
+        out.write(f"Block({len(self.statements)} statements)")
 
 
 class Expression(ASTNode):
     """Base class for expressions"""
-    pass
+    __slots__ = ()
 
 
 class BinaryExpression(Expression):
     """Represents a binary operation"""
-    def __init__(self, left: Expression, operator: str, right: Expression):
-        super().__init__()
+    __slots__ = ("left", "operator", "right")
+
+    def __init__(self, left: Expression, operator: str, right: Expression, line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.left = left
         self.operator = operator
         self.right = right
 
-    def __repr__(self):
-        return f"({self.left} {self.operator} {self.right})"
+    def _write(self, out: StringIO):
+        out.write("(")
+        _write_value(out, self.left)
+        out.write(f" {self.operator} ")
+        _write_value(out, self.right)
+        out.write(")")
 
 
 class UnaryExpression(Expression):
     """Represents a unary operation"""
-    def __init__(self, operator: str, operand: Expression):
-        super().__init__()
+    __slots__ = ("operator", "operand")
+
+    def __init__(self, operator: str, operand: Expression, line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.operator = operator
         self.operand = operand
 
-    def __repr__(self):
-        return f"({self.operator}{self.operand})"
+    def _write(self, out: StringIO):
+        out.write(f"({self.operator}")
+        _write_value(out, self.operand)
+        out.write(")")
 
 
 class Literal(Expression):
     """Represents a literal value"""
-    def __init__(self, value: Any, literal_type: str):
-        super().__init__()
+    __slots__ = ("value", "literal_type")
+
+    def __init__(self, value: Any, literal_type: str, line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.value = value
         self.literal_type = literal_type
 
-    def __repr__(self):
-        return f"Literal({self.value})"
+    def _write(self, out: StringIO):
+        out.write(f"Literal({self.value})")
 
 
 class Identifier(Expression):
     """Represents an identifier/variable reference"""
+    __slots__ = ("name",)
+
     def __init__(self, name: str, line: int = 0, column: int = 0):
         super().__init__(line, column)
         self.name = name
 
-    def __repr__(self):
-        return f"Identifier({self.name})"
+    def _write(self, out: StringIO):
+        out.write(f"Identifier({self.name})")
 
 
 class MemberAccess(Expression):
     """Represents member access (obj.member)"""
-    def __init__(self, object_expr: Expression, member: str):
-        super().__init__()
+    __slots__ = ("object_expr", "member")
+
+    def __init__(self, object_expr: Expression, member: str, line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.object_expr = object_expr
         self.member = member
 
-    def __repr__(self):
-        return f"({self.object_expr}.{self.member})"
+    def _write(self, out: StringIO):
+        out.write("(")
+        _write_value(out, self.object_expr)
+        out.write(f".{self.member})")
+
+
+# MethodCall.callee_kind values
+CALLEE_IDENTIFIER = 0  # f(...)
+CALLEE_MEMBER = 1      # obj.f(...), Class.new()
+CALLEE_OTHER = 2
 
 
 class MethodCall(Expression):
     """Represents a method/function call"""
-    def __init__(self, callee: Expression, arguments: List[Expression]):
-        super().__init__()
+    __slots__ = ("callee", "arguments", "callee_kind")
+
+    def __init__(self, callee: Expression, arguments: List[Expression], line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.callee = callee
         self.arguments = arguments
-
-    def __repr__(self):
-        args_str = ", ".join(str(arg) for arg in self.arguments)
-        return f"{self.callee}({args_str})"
+        # Classified once here so later passes skip the isinstance() chain
+        callee_class = type(callee)
+        if callee_class is MemberAccess:
+            self.callee_kind = CALLEE_MEMBER
+        elif callee_class is Identifier:
+            self.callee_kind = CALLEE_IDENTIFIER
+        else:
+            self.callee_kind = CALLEE_OTHER
+
+    def _write(self, out: StringIO):
+        _write_value(out, self.callee)
+        out.write("(")
+        _write_list(out, self.arguments)
+        out.write(")")
 
 
 class NewExpression(Expression):
     """Represents a 'new' expression for object instantiation"""
-    def __init__(self, class_name: str, type_arguments: List[str], arguments: List[Expression]):
-        super().__init__()
+    __slots__ = ("class_name", "type_arguments", "arguments")
+
+    def __init__(self, class_name: str, type_arguments: List[str], arguments: List[Expression], line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.class_name = class_name
         self.type_arguments = type_arguments
         self.arguments = arguments
 
-    def __repr__(self):
-        type_args = f"<{', '.join(self.type_arguments)}>" if self.type_arguments else ""
-        args_str = ", ".join(str(arg) for arg in self.arguments)
-        return f"new {self.class_name}{type_args}({args_str})"
+    def _write(self, out: StringIO):
+        out.write(f"new {self.class_name}")
+        if self.type_arguments:
+            out.write(f"<{', '.join(self.type_arguments)}>")
+        out.write("(")
+        _write_list(out, self.arguments)
+        out.write(")")
 
 
 class PointerExpression(Expression):
     """Represents pointer operations (*ptr or &var)"""
-    def __init__(self, operator: str, operand: Expression):
-        super().__init__()
+    __slots__ = ("operator", "operand")
+
+    def __init__(self, operator: str, operand: Expression, line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.operator = operator  # "*" or "&"
         self.operand = operand
 
-    def __repr__(self):
-        return f"({self.operator}{self.operand})"
+    def _write(self, out: StringIO):
+        out.write(f"({self.operator}")
+        _write_value(out, self.operand)
+        out.write(")")
 
 
 class Statement(ASTNode):
     """Base class for statements"""
-    pass
+    __slots__ = ()
 
 
 class ExpressionStatement(Statement):
     """Represents an expression used as a statement"""
-    def __init__(self, expression: Expression):
-        super().__init__()
+    __slots__ = ("expression",)
+
+    def __init__(self, expression: Expression, line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.expression = expression
 
-    def __repr__(self):
-        return f"{self.expression};"
+    def _write(self, out: StringIO):
+        _write_value(out, self.expression)
+        out.write(";")
 
 
 class ReturnStatement(Statement):
     """Represents a return statement"""
-    def __init__(self, value: Optional[Expression] = None):
-        super().__init__()
+    __slots__ = ("value",)
+
+    def __init__(self, value: Optional[Expression] = None, line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.value = value
 
-    def __repr__(self):
-        return f"return {self.value if self.value else ''}"
+    def _write(self, out: StringIO):
+        out.write("return ")
+        if self.value:
+            _write_value(out, self.value)
 
 
 class VariableDeclaration(Statement):
     """Represents a variable declaration"""
-    def __init__(self, name: str, type_name: str, initial_value: Optional[Expression] = None):
-        super().__init__()
+    __slots__ = ("name", "type_name", "initial_value")
+
+    def __init__(self, name: str, type_name: str, initial_value: Optional[Expression] = None, line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.name = name
         self.type_name = type_name
         self.initial_value = initial_value
 
-    def __repr__(self):
-        init_str = f" = {self.initial_value}" if self.initial_value else ""
-        return f"var {self.name}: {self.type_name}{init_str}"
+    def _write(self, out: StringIO):
+        out.write(f"var {self.name}: {self.type_name}")
+        if self.initial_value:
+            out.write(" = ")
+            _write_value(out, self.initial_value)
 
 
 class IfStatement(Statement):
     """Represents an if statement"""
-    def __init__(self, condition: Expression, then_block: Block, else_block: Optional[Block] = None):
-        super().__init__()
+    __slots__ = ("condition", "then_block", "else_block")
+
+    def __init__(self, condition: Expression, then_block: Block, else_block: Optional[Block] = None, line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.condition = condition
         self.then_block = then_block
         self.else_block = else_block
 
-    def __repr__(self):
-        else_str = f" else {self.else_block}" if self.else_block else ""
-        return f"if ({self.condition}) {self.then_block}{else_str}"
+    def _write(self, out: StringIO):
+        out.write("if (")
+        _write_value(out, self.condition)
+        out.write(") ")
+        _write_value(out, self.then_block)
+        if self.else_block:
+            out.write(" else ")
+            _write_value(out, self.else_block)
 
 
 class WhileStatement(Statement):
     """Represents a while loop"""
-    def __init__(self, condition: Expression, body: Block):
-        super().__init__()
+    __slots__ = ("condition", "body")
+
+    def __init__(self, condition: Expression, body: Block, line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.condition = condition
         self.body = body
 
-    def __repr__(self):
-        return f"while ({self.condition}) {self.body}"
+    def _write(self, out: StringIO):
+        out.write("while (")
+        _write_value(out, self.condition)
+        out.write(") ")
+        _write_value(out, self.body)
 
 
 class AssignmentStatement(Statement):
     """Represents an assignment statement"""
-    def __init__(self, target: Expression, value: Expression):
-        super().__init__()
+    __slots__ = ("target", "value")
+
+    def __init__(self, target: Expression, value: Expression, line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.target = target
         self.value = value
 
-    def __repr__(self):
-        return f"{self.target} = {self.value}"
+    def _write(self, out: StringIO):
+        _write_value(out, self.target)
+        out.write(" = ")
+        _write_value(out, self.value)
 
 
 class ForStatement(Statement):
     """Represents a for loop: for (init; condition; update) { body }"""
+    __slots__ = ("init", "condition", "update", "body")
+
     def __init__(self, init: Optional[Statement], condition: Optional[Expression],
-                 update: Optional[Expression], body: Block):
-        super().__init__()
+                 update: Optional[Expression], body: Block, line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.init = init
         self.condition = condition
         self.update = update
         self.body = body
 
-    def __repr__(self):
-        return f"for ({self.init}; {self.condition}; {self.update}) {self.body}"
+    def _write(self, out: StringIO):
+        out.write("for (")
+        _write_value(out, self.init)
+        out.write("; ")
+        _write_value(out, self.condition)
+        out.write("; ")
+        _write_value(out, self.update)
+        out.write(") ")
+        _write_value(out, self.body)
 
 
 class ForEachStatement(Statement):
     """Represents a for-each loop: for (item in collection) { body }"""
-    def __init__(self, var_name: str, var_type: str, collection: Expression, body: Block):
-        super().__init__()
+    __slots__ = ("var_name", "var_type", "collection", "body")
+
+    def __init__(self, var_name: str, var_type: str, collection: Expression, body: Block, line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.var_name = var_name
         self.var_type = var_type
         self.collection = collection
         self.body = body
 
-    def __repr__(self):
-        return f"for ({self.var_name}: {self.var_type} in {self.collection}) {self.body}"
+    def _write(self, out: StringIO):
+        out.write(f"for ({self.var_name}: {self.var_type} in ")
+        _write_value(out, self.collection)
+        out.write(") ")
+        _write_value(out, self.body)
 
 
 class BreakStatement(Statement):
     """Represents a break statement"""
-    def __init__(self):
-        super().__init__()
+    __slots__ = ()
 
-    def __repr__(self):
-        return "break"
+    def __init__(self, line: int = 0, column: int = 0):
+        super().__init__(line, column)
+
+    def _write(self, out: StringIO):
+        out.write("break")
 
 
 class ContinueStatement(Statement):
     """Represents a continue statement"""
-    def __init__(self):
-        super().__init__()
+    __slots__ = ()
+
+    def __init__(self, line: int = 0, column: int = 0):
+        super().__init__(line, column)
 
-    def __repr__(self):
-        return "continue"
+    def _write(self, out: StringIO):
+        out.write("continue")
 
 
 class PrintStatement(Statement):
     """Represents a print/println statement"""
-    def __init__(self, arguments: List[Expression], newline: bool = True):
-        super().__init__()
+    __slots__ = ("arguments", "newline")
+
+    def __init__(self, arguments: List[Expression], newline: bool = True, line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.arguments = arguments
         self.newline = newline
 
-    def __repr__(self):
-        fn = "println" if self.newline else "print"
-        args = ", ".join(str(a) for a in self.arguments)
-        return f"{fn}({args})"
+    def _write(self, out: StringIO):
+        out.write("println(" if self.newline else "print(")
+        _write_list(out, self.arguments)
+        out.write(")")
 
 
 class ArrayLiteral(Expression):
     """Represents an array literal [e1, e2, ...]"""
-    def __init__(self, elements: List[Expression]):
-        super().__init__()
+    __slots__ = ("elements",)
+
+    def __init__(self, elements: List[Expression], line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.elements = elements
 
-    def __repr__(self):
-        elems = ", ".join(str(e) for e in self.elements)
-        return f"[{elems}]"
+    def _write(self, out: StringIO):
+        out.write("[")
+        _write_list(out, self.elements)
+        out.write("]")
 
 
 class ArrayAccess(Expression):
     """Represents array indexing arr[index]"""
-    def __init__(self, array: Expression, index: Expression):
-        super().__init__()
+    __slots__ = ("array", "index")
+
+    def __init__(self, array: Expression, index: Expression, line: int = 0, column: int = 0):
+        super().__init__(line, column)
         self.array = array
         self.index = index
 
-    def __repr__(self):
-        return f"{self.array}[{self.index}]"
+    def _write(self, out: StringIO):
+        _write_value(out, self.array)
+        out.write("[")
+        _write_value(out, self.index)
+        out.write("]")
 
 
 class InterfaceDeclaration(ASTNode):
     """Represents an interface definition"""
+    __slots__ = ("name", "methods")
+
     def __init__(self, name: str, methods: List['MethodDeclaration'], line: int = 0, column: int = 0):
         super().__init__(line, column)
         self.name = name
         self.methods = methods
 
-    def __repr__(self):
-        return f"Interface({self.name}, {len(self.methods)} methods)"
+    def _write(self, out: StringIO):
+        out.write(f"Interface({self.name}, {len(self.methods)} methods)")
+
+
+# Node class -> its source fields, gathered from the __slots__ of its MRO
+_NODE_FIELDS: Dict[type, Tuple[str, ...]] = {}
+
+
+def node_fields(node_class: type) -> Tuple[str, ...]:
+    """Sorted slot names of a node class, minus underscored analysis caches"""
+    fields = _NODE_FIELDS.get(node_class)
+    if fields is None:
+        fields = tuple(sorted(
+            name
+            for klass in node_class.__mro__
+            for name in getattr(klass, "__slots__", ())
+            if not name.startswith("_")
+        ))
+        _NODE_FIELDS[node_class] = fields
+    return fields
+
+
+def walk(node: ASTNode) -> Iterator[ASTNode]:
+    """Yield a node and every node below it, in no particular order"""
+    stack: List[Any] = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, ASTNode):
+            yield item
+            for name in node_fields(type(item)):
+                stack.append(getattr(item, name))
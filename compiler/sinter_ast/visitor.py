@@ -0,0 +1,40 @@
+"""
+Type-dispatched visitor base for passes over the Sinter AST
+"""
+
+from types import MappingProxyType
+from typing import Any, Callable, ClassVar, Mapping
+
+from compiler.sinter_ast import nodes
+from compiler.sinter_ast.nodes import ASTNode
+
+
+class ASTVisitor:
+    """
+    Base class for passes that dispatch on node type.
+
+    Subclasses name their handlers visit_<NodeClass>. The node class ->
+    function map is built once per class when it is defined (inheriting
+    the base class's handlers), so visiting a node is one dict probe on
+    its exact type; nodes without a handler are ignored.
+    """
+    _HANDLERS: ClassVar[Mapping[type, Callable[[Any, Any], Any]]] = MappingProxyType({})
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        handlers = dict(cls._HANDLERS)
+        for attr, func in cls.__dict__.items():
+            if not attr.startswith("visit_") or not callable(func):
+                continue
+            node_class = getattr(nodes, attr[len("visit_"):], None)
+            if not (isinstance(node_class, type) and issubclass(node_class, ASTNode)):
+                raise TypeError(f"{cls.__name__}.{attr} does not name an AST node class")
+            handlers[node_class] = func
+        cls._HANDLERS = MappingProxyType(handlers)
+
+    def visit(self, node: ASTNode) -> Any:
+        """Run the handler for a node's type, if there is one"""
+        handler = self._HANDLERS.get(type(node))
+        if handler is not None:
+            return handler(self, node)
+        return None
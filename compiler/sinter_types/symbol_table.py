@@ -3,24 +3,27 @@ Symbol Table for Sinter Programming Language
 Manages variable and function scopes during compilation
 """
 
-from typing import Dict, List, Optional, Any
-from enum import Enum
+import sys
+from typing import Dict, List, Optional, Sequence, Any
+from enum import IntEnum
 from compiler.sinter_types.types import SinterType, ClassType, FunctionType
 
 
-class SymbolKind(Enum):
+class SymbolKind(IntEnum):
     """Kind of symbol"""
-    VARIABLE = "variable"
-    PARAMETER = "parameter"
-    FIELD = "field"
-    METHOD = "method"
-    FUNCTION = "function"
-    CLASS = "class"
-    TYPE = "type"
+    VARIABLE = 1
+    PARAMETER = 2
+    FIELD = 3
+    METHOD = 4
+    FUNCTION = 5
+    CLASS = 6
+    TYPE = 7
 
 
 class Symbol:
     """Represents a symbol in the symbol table"""
+    __slots__ = ("name", "kind", "symbol_type", "is_const", "llvm_name", "is_initialized",
+                 "is_pointer_allocated", "is_poisoned")
     
     def __init__(self, name: str, kind: SymbolKind, symbol_type: SinterType,
                  is_const: bool = False, llvm_name: str = None):
@@ -31,20 +34,25 @@ class Symbol:
         self.llvm_name = llvm_name or name  # Name used in LLVM IR
         self.is_initialized = False
         self.is_pointer_allocated = False  # Track if this is a pointer that needs cleanup
+        self.is_poisoned = False  # Declared with an unknown type (already reported)
     
     def __repr__(self):
-        return f"Symbol({self.name}: {self.symbol_type.name}, {self.kind.value})"
+        return f"Symbol({self.name}: {self.symbol_type.name}, {self.kind.name.lower()})"
 
 
 class Scope:
     """Represents a lexical scope"""
+    __slots__ = ("name", "parent", "symbols", "children", "unclean_pointers")
     
     def __init__(self, name: str, parent: Optional['Scope'] = None):
         self.name = name
         self.parent = parent
         self.symbols: Dict[str, Symbol] = {}
-        self.children: List['Scope'] = []
-        self.allocated_pointers: List[Symbol] = []  # Track pointers for cleanup
+        # Both start out empty and shared, since most scopes are leaves that
+        # never allocate; add_child() and mark_allocated() fill them in
+        self.children: Sequence['Scope'] = ()
+        # Pointers defined here that still need cleanup, as an ordered set
+        self.unclean_pointers: Optional[Dict[Symbol, None]] = None
     
     def define(self, symbol: Symbol) -> bool:
         """Define a symbol in this scope. Returns False if already defined."""
@@ -52,24 +60,39 @@ class Scope:
             return False
         self.symbols[symbol.name] = symbol
         if symbol.is_pointer_allocated:
-            self.allocated_pointers.append(symbol)
+            self.mark_allocated(symbol)
         return True
     
+    def mark_allocated(self, symbol: Symbol):
+        """Flag a symbol of this scope as a pointer that needs cleanup"""
+        symbol.is_pointer_allocated = True
+        if self.unclean_pointers is None:
+            self.unclean_pointers = {symbol: None}
+        else:
+            self.unclean_pointers[symbol] = None
+    
+    def mark_cleaned(self, symbol: Symbol):
+        """Record that a symbol of this scope no longer needs cleanup"""
+        symbol.is_pointer_allocated = False
+        if self.unclean_pointers is not None:
+            self.unclean_pointers.pop(symbol, None)
+    
+    def add_child(self, scope: 'Scope'):
+        """Record a scope nested directly in this one"""
+        if self.children:
+            self.children.append(scope)
+        else:
+            self.children = [scope]
+    
     def lookup(self, name: str) -> Optional[Symbol]:
         """Look up a symbol in this scope only"""
         return self.symbols.get(name)
     
-    def resolve(self, name: str) -> Optional[Symbol]:
-        """Resolve a symbol, checking parent scopes"""
-        if name in self.symbols:
-            return self.symbols[name]
-        if self.parent:
-            return self.parent.resolve(name)
-        return None
-    
     def get_unclean_pointers(self) -> List[Symbol]:
         """Get pointers that haven't been cleaned up"""
-        return [p for p in self.allocated_pointers if p.is_pointer_allocated]
+        if self.unclean_pointers is None:
+            return []
+        return list(self.unclean_pointers)
 
 
 class SymbolTable:
@@ -79,26 +102,75 @@ class SymbolTable:
         self.global_scope = Scope("global")
         self.current_scope = self.global_scope
         self.scope_stack: List[Scope] = [self.global_scope]
+        # len(scope_stack), and the suffix generate_llvm_name() adds for it
+        self._depth = 1
+        self._name_suffix = ".1"
+        # name -> visible symbols of that name, innermost last, so resolve()
+        # is one probe instead of a walk over the scope chain
+        self._active: Dict[str, List[Symbol]] = {}
+        # Names defined in each scope of scope_stack, undone on exit_scope()
+        self._scope_defines: List[List[str]] = [[]]
+        # Cleared scopes handed back by exit_scope(recycle=True)
+        self._scope_pool: List[Scope] = []
         self.temp_counter = 0
         self.label_counter = 0
         self.string_constants: Dict[str, str] = {}  # value -> llvm name
         self.string_counter = 0
     
+    # Most recycled scopes that are kept for reuse
+    SCOPE_POOL_SIZE = 64
+    
     def enter_scope(self, name: str) -> Scope:
         """Enter a new scope"""
-        new_scope = Scope(name, self.current_scope)
-        self.current_scope.children.append(new_scope)
+        if self._scope_pool:
+            new_scope = self._scope_pool.pop()
+            new_scope.name = name
+            new_scope.parent = self.current_scope
+        else:
+            new_scope = Scope(name, self.current_scope)
+        self.current_scope.add_child(new_scope)
         self.current_scope = new_scope
         self.scope_stack.append(new_scope)
+        self._depth += 1
+        self._name_suffix = f".{self._depth}"
+        self._scope_defines.append([])
         return new_scope
     
-    def exit_scope(self) -> Scope:
-        """Exit the current scope, returning it"""
+    def exit_scope(self, recycle: bool = False) -> Scope:
+        """
+        Exit the current scope, returning it. With recycle, the scope is
+        detached from its parent and emptied for reuse by a later
+        enter_scope(), so nothing may keep a reference to it.
+        """
         exited_scope = self.current_scope
         self.scope_stack.pop()
+        self._depth -= 1
+        self._name_suffix = f".{self._depth}"
         self.current_scope = self.scope_stack[-1] if self.scope_stack else self.global_scope
+        if exited_scope is not self.global_scope:
+            active = self._active
+            for name in self._scope_defines.pop():
+                active[name].pop()
+            if recycle and len(self._scope_pool) < self.SCOPE_POOL_SIZE:
+                self._recycle(exited_scope)
         return exited_scope
     
+    def _recycle(self, scope: Scope):
+        """Empty an exited scope and put it in the pool"""
+        siblings = scope.parent.children
+        # The scope being exited is always its parent's newest child
+        if siblings and siblings[-1] is scope:
+            siblings.pop()
+        else:
+            siblings.remove(scope)
+        scope.parent = None
+        if scope.symbols:
+            scope.symbols.clear()
+            scope.unclean_pointers = None
+        if scope.children:
+            scope.children.clear()
+        self._scope_pool.append(scope)
+    
     def define(self, name: str, kind: SymbolKind, symbol_type: SinterType,
                is_const: bool = False, llvm_name: str = None) -> Symbol:
         """Define a new symbol in the current scope"""
@@ -107,35 +179,59 @@ class SymbolTable:
         symbol = Symbol(name, kind, symbol_type, is_const, llvm_name)
         if not self.current_scope.define(symbol):
             raise NameError(f"Symbol '{name}' already defined in this scope")
+        self._activate(symbol)
         return symbol
     
+    def _activate(self, symbol: Symbol):
+        """Make a symbol defined in the current scope visible to resolve()"""
+        stack = self._active.get(symbol.name)
+        if stack is None:
+            self._active[symbol.name] = [symbol]
+        else:
+            stack.append(symbol)
+        if self.current_scope is not self.global_scope:
+            self._scope_defines[-1].append(symbol.name)
+    
+    def define_globals(self, symbols: Dict[str, Symbol]):
+        """Add already-built symbols to the global scope, replacing same-named ones"""
+        global_symbols = self.global_scope.symbols
+        for name, symbol in symbols.items():
+            previous = global_symbols.get(name)
+            global_symbols[name] = symbol
+            stack = self._active.setdefault(name, [])
+            if previous is not None and stack and stack[0] is previous:
+                stack[0] = symbol
+            else:
+                stack.insert(0, symbol)
+    
     def resolve(self, name: str) -> Optional[Symbol]:
         """Resolve a symbol name to its Symbol"""
-        return self.current_scope.resolve(name)
+        stack = self._active.get(name)
+        return stack[-1] if stack else None
     
     def generate_llvm_name(self, base: str) -> str:
         """Generate a unique LLVM name"""
-        return f"%{base}.{len(self.scope_stack)}"
+        return f"%{base}{self._name_suffix}"
     
     def new_temp(self) -> str:
         """Generate a new temporary variable name"""
-        name = f"%t{self.temp_counter}"
-        self.temp_counter += 1
-        return name
+        counter = self.temp_counter
+        self.temp_counter = counter + 1
+        return f"%t{counter}"
     
     def new_label(self, prefix: str = "label") -> str:
         """Generate a new label name"""
-        name = f"{prefix}_{self.label_counter}"
-        self.label_counter += 1
-        return name
+        counter = self.label_counter
+        self.label_counter = counter + 1
+        return f"{prefix}_{counter}"
     
     def add_string_constant(self, value: str) -> str:
         """Add a string constant and return its LLVM name"""
-        if value in self.string_constants:
-            return self.string_constants[value]
-        name = f"@.str.{self.string_counter}"
-        self.string_counter += 1
-        self.string_constants[value] = name
+        name = self.string_constants.get(value)
+        if name is None:
+            name = f"@.str.{self.string_counter}"
+            self.string_counter += 1
+            self.string_constants[sys.intern(value)] = name
         return name
     
     def get_current_function_scope(self) -> Optional[Scope]:
@@ -145,10 +241,16 @@ class SymbolTable:
                 return scope
         return None
     
+    def mark_cleaned(self, symbol: Symbol):
+        """Record that a visible pointer was cleaned up, in the scope defining it"""
+        for scope in reversed(self.scope_stack):
+            if scope.symbols.get(symbol.name) is symbol:
+                scope.mark_cleaned(symbol)
+                return
+    
     def check_pointer_cleanup(self) -> List[str]:
         """Check for uncleaned pointers in current scope, return error messages"""
-        errors = []
-        unclean = self.current_scope.get_unclean_pointers()
-        for ptr in unclean:
-            errors.append(f"Pointer '{ptr.name}' not cleaned up before scope exit")
-        return errors
+        unclean = self.current_scope.unclean_pointers
+        if not unclean:
+            return []
+        return [f"Pointer '{ptr.name}' not cleaned up before scope exit" for ptr in unclean]
@@ -3,40 +3,44 @@ Type System for Sinter Programming Language
 Defines all types and type operations
 """
 
-from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
-from enum import Enum
+import sys
+from collections import ChainMap
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple, Any
+from enum import IntEnum
 
 
-class TypeKind(Enum):
+class TypeKind(IntEnum):
     """Classification of types"""
-    PRIMITIVE = "primitive"
-    CLASS = "class"
-    POINTER = "pointer"
-    ARRAY = "array"
-    FUNCTION = "function"
-    VOID = "void"
-    NULL = "null"
-    STRING = "string"
-    D_STRING = "d_string"
+    PRIMITIVE = 1
+    CLASS = 2
+    POINTER = 3
+    ARRAY = 4
+    FUNCTION = 5
+    VOID = 6
+    NULL = 7
+    STRING = 8
+    D_STRING = 9
 
 
-class SinterType(ABC):
+class SinterType:
     """Base class for all Sinter types"""
+    __slots__ = ("name", "kind", "_hash")
     
     def __init__(self, name: str, kind: TypeKind):
-        self.name = name
+        self.name = sys.intern(name)  # Lets __eq__ compare names by identity
         self.kind = kind
+        self._hash = hash((name, kind))
+    
+    # A plain base class rather than an ABC: ABCMeta adds overhead to every
+    # isinstance() check, and the type passes do a great many of those
     
-    @abstractmethod
     def llvm_type(self) -> str:
         """Return the LLVM IR type representation"""
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def size_bytes(self) -> int:
         """Return the size in bytes"""
-        pass
+        raise NotImplementedError
     
     def is_primitive(self) -> bool:
         return self.kind == TypeKind.PRIMITIVE
@@ -48,12 +52,15 @@ class SinterType(ABC):
         return self.kind == TypeKind.CLASS
     
     def __eq__(self, other):
-        if not isinstance(other, SinterType):
+        if self is other:
+            return True
+        # The kind determines the class, so differing classes never match
+        if type(other) is not type(self):
             return False
-        return self.name == other.name and self.kind == other.kind
+        return self.name is other.name and self.kind == other.kind
     
     def __hash__(self):
-        return hash((self.name, self.kind))
+        return self._hash
     
     def __repr__(self):
         return f"{self.__class__.__name__}({self.name})"
@@ -61,6 +68,7 @@ class SinterType(ABC):
 
 class PrimitiveType(SinterType):
     """Primitive types: int, float, double, boolean"""
+    __slots__ = ("_llvm_type", "_size")
     
     LLVM_TYPES = {
         "int": "i32",
@@ -84,16 +92,19 @@ class PrimitiveType(SinterType):
     
     def __init__(self, name: str):
         super().__init__(name, TypeKind.PRIMITIVE)
+        self._llvm_type = self.LLVM_TYPES.get(name, "i32")
+        self._size = self.SIZES.get(name, 4)
     
     def llvm_type(self) -> str:
-        return self.LLVM_TYPES.get(self.name, "i32")
+        return self._llvm_type
     
     def size_bytes(self) -> int:
-        return self.SIZES.get(self.name, 4)
+        return self._size
 
 
 class VoidType(SinterType):
     """Void type for functions with no return value"""
+    __slots__ = ()
     
     def __init__(self):
         super().__init__("void", TypeKind.VOID)
@@ -107,6 +118,7 @@ class VoidType(SinterType):
 
 class NullType(SinterType):
     """Null type"""
+    __slots__ = ()
     
     def __init__(self):
         super().__init__("null", TypeKind.NULL)
@@ -120,6 +132,7 @@ class NullType(SinterType):
 
 class StringType(SinterType):
     """String type (immutable, captured at creation)"""
+    __slots__ = ()
     
     def __init__(self):
         super().__init__("str", TypeKind.STRING)
@@ -133,6 +146,7 @@ class StringType(SinterType):
 
 class DStringType(SinterType):
     """Dynamic string type (updates when referenced variables change)"""
+    __slots__ = ()
     
     def __init__(self):
         super().__init__("d_str", TypeKind.D_STRING)
@@ -146,13 +160,15 @@ class DStringType(SinterType):
 
 class PointerType(SinterType):
     """Pointer to another type"""
+    __slots__ = ("pointee_type", "_llvm_type")
     
     def __init__(self, pointee_type: SinterType):
         super().__init__(f"{pointee_type.name}*", TypeKind.POINTER)
         self.pointee_type = pointee_type
+        self._llvm_type = f"{pointee_type.llvm_type()}*"
     
     def llvm_type(self) -> str:
-        return f"{self.pointee_type.llvm_type()}*"
+        return self._llvm_type
     
     def size_bytes(self) -> int:
         return 8  # 64-bit pointers
@@ -160,17 +176,20 @@ class PointerType(SinterType):
 
 class ArrayType(SinterType):
     """Array type"""
+    __slots__ = ("element_type", "size", "_llvm_type")
     
     def __init__(self, element_type: SinterType, size: Optional[int] = None):
         name = f"{element_type.name}[]" if size is None else f"{element_type.name}[{size}]"
         super().__init__(name, TypeKind.ARRAY)
         self.element_type = element_type
         self.size = size
+        if size is not None:
+            self._llvm_type = f"[{size} x {element_type.llvm_type()}]"
+        else:
+            self._llvm_type = f"{element_type.llvm_type()}*"  # Dynamic array as pointer
     
     def llvm_type(self) -> str:
-        if self.size is not None:
-            return f"[{self.size} x {self.element_type.llvm_type()}]"
-        return f"{self.element_type.llvm_type()}*"  # Dynamic array as pointer
+        return self._llvm_type
     
     def size_bytes(self) -> int:
         if self.size is not None:
@@ -180,6 +199,8 @@ class ArrayType(SinterType):
 
 class FieldInfo:
     """Information about a class field"""
+    __slots__ = ("name", "field_type", "offset", "is_const", "visibility", "is_serializable",
+                 "is_derived", "is_read_only", "is_write_only", "default_value")
     
     def __init__(self, name: str, field_type: SinterType, offset: int, 
                  is_const: bool = False, visibility: str = "public",
@@ -200,6 +221,8 @@ class FieldInfo:
 
 class MethodInfo:
     """Information about a class method"""
+    __slots__ = ("name", "return_type", "param_types", "param_names", "is_static", "visibility",
+                 "vtable_index")
     
     def __init__(self, name: str, return_type: SinterType,
                  param_types: List[SinterType], param_names: List[str],
@@ -214,58 +237,165 @@ class MethodInfo:
         self.vtable_index = vtable_index  # -1 if not virtual
 
 
+def _align_to(offset: int, size: int) -> int:
+    """Round offset up to a multiple of size (simplified natural alignment)"""
+    # Sizes are almost always 1/2/4/8, which a mask handles
+    if size & (size - 1) == 0:
+        if size:
+            offset = (offset + size - 1) & -size
+    elif offset % size != 0:
+        offset += size - (offset % size)
+    return offset
+
+
 class ClassType(SinterType):
     """Class type with fields and methods"""
+    __slots__ = ("type_params", "own_fields", "fields", "methods", "_parent_class", "ancestors",
+                 "interfaces", "struct_size", "vtable", "_llvm_struct_type", "_llvm_type",
+                 "_field_cache", "_method_cache", "_cache_generation", "vtable_symbols",
+                 "field_names", "field_slots")
+    
+    # Bumped whenever any class gains a member or a parent. A class whose
+    # lookup caches were filled under an older generation drops them,
+    # since a parent's change can alter what its subclasses inherit.
+    _generation = 0
     
     def __init__(self, name: str, type_params: List[str] = None):
         super().__init__(name, TypeKind.CLASS)
         self.type_params = type_params or []
-        self.fields: Dict[str, FieldInfo] = {}
+        # Fields declared by this class; `fields` also shows inherited ones
+        # (parent fields first) once link_hierarchy() has run
+        self.own_fields: Dict[str, FieldInfo] = {}
+        self.fields: Mapping[str, FieldInfo] = self.own_fields
         self.methods: Dict[str, MethodInfo] = {}
-        self.parent_class: Optional['ClassType'] = None
+        self._parent_class: Optional['ClassType'] = None
+        # name -> get_field() / get_method() result, including misses
+        self._field_cache: Dict[str, Optional[FieldInfo]] = {}
+        self._method_cache: Dict[str, Optional[MethodInfo]] = {}
+        self._cache_generation = ClassType._generation
+        self.ancestors: Set['ClassType'] = set()  # Filled in by link_hierarchy()
         self.interfaces: List[str] = []
         self.struct_size = 8  # Start with vtable pointer
-        self.vtable: List[MethodInfo] = []
+        self.vtable: Sequence[MethodInfo] = []  # A tuple once finalize() has run
+        self.vtable_symbols: Tuple[str, ...] = ()  # LLVM function per vtable slot
+        # Flattened view of `fields` in struct order, built by finalize()
+        self.field_names: Tuple[str, ...] = ()
+        self.field_slots: Dict[str, int] = {}  # name -> struct element index
+        self._llvm_struct_type = f"%class.{name}"
+        self._llvm_type = f"%class.{name}*"
     
     def add_field(self, field_info: FieldInfo):
         """Add a field to the class"""
-        self.fields[field_info.name] = field_info
-        # Update struct size (simple alignment)
+        self.own_fields[field_info.name] = field_info
+        ClassType._generation += 1
+        # Provisional layout of the own fields; finalize() lays out the
+        # whole struct once inherited fields are known
         field_size = field_info.field_type.size_bytes()
-        # Align to field size (simplified)
-        if self.struct_size % field_size != 0:
-            self.struct_size += field_size - (self.struct_size % field_size)
-        field_info.offset = self.struct_size
-        self.struct_size += field_size
+        offset = _align_to(self.struct_size, field_size)
+        field_info.offset = offset
+        self.struct_size = offset + field_size
     
     def add_method(self, method_info: MethodInfo):
         """Add a method to the class"""
         self.methods[method_info.name] = method_info
+        ClassType._generation += 1
         if not method_info.is_static:
             method_info.vtable_index = len(self.vtable)
             self.vtable.append(method_info)
     
+    @property
+    def parent_class(self) -> Optional['ClassType']:
+        return self._parent_class
+    
+    @parent_class.setter
+    def parent_class(self, parent: Optional['ClassType']):
+        self._parent_class = parent
+        ClassType._generation += 1
+    
+    def _check_caches(self):
+        """Drop the lookup caches if any class has changed since they were filled"""
+        if self._cache_generation != ClassType._generation:
+            self._field_cache.clear()
+            self._method_cache.clear()
+            self._cache_generation = ClassType._generation
+    
+    def link_hierarchy(self):
+        """
+        Record every transitive parent class and chain their fields behind
+        this class's own, once every parent_class is set. The chain is a
+        view, so fields the parents declare later are still inherited.
+        """
+        self.ancestors = set()
+        chain = [self.own_fields]
+        parent = self.parent_class
+        while parent and parent not in self.ancestors:
+            self.ancestors.add(parent)
+            chain.append(parent.own_fields)
+            parent = parent.parent_class
+        self.fields = ChainMap(*chain) if len(chain) > 1 else self.own_fields
+        ClassType._generation += 1
+    
+    def finalize(self):
+        """
+        Freeze the vtable, flatten the fields and lay out the whole struct,
+        inherited fields first, once every class has all of its members.
+        FieldInfo objects of ancestors are shared, so only our own get new
+        offsets.
+        """
+        self.vtable = tuple(self.vtable)
+        self.vtable_symbols = tuple(f"@{self.name}_{method.name}" for method in self.vtable)
+        fields = self.fields
+        self.field_names = tuple(fields)
+        # Element 0 of the struct is the vtable pointer
+        self.field_slots = {name: i + 1 for i, name in enumerate(self.field_names)}
+        own_fields = self.own_fields
+        offset = 8  # vtable pointer
+        for name in self.field_names:
+            info = fields[name]
+            size = info.field_type.size_bytes()
+            offset = _align_to(offset, size)
+            if own_fields.get(name) is info:
+                info.offset = offset
+            offset += size
+        # Trailing padding up to the struct's alignment, which the vtable
+        # pointer makes 8, so the size matches what LLVM allocates
+        self.struct_size = _align_to(offset, 8)
+    
     def get_field(self, name: str) -> Optional[FieldInfo]:
         """Get a field by name, checking parent classes"""
+        self._check_caches()
+        cache = self._field_cache
+        if name in cache:
+            return cache[name]
         if name in self.fields:
-            return self.fields[name]
-        if self.parent_class:
-            return self.parent_class.get_field(name)
-        return None
+            info = self.fields[name]
+        elif self._parent_class:
+            info = self._parent_class.get_field(name)
+        else:
+            info = None
+        cache[name] = info
+        return info
     
     def get_method(self, name: str) -> Optional[MethodInfo]:
         """Get a method by name, checking parent classes"""
+        self._check_caches()
+        cache = self._method_cache
+        if name in cache:
+            return cache[name]
         if name in self.methods:
-            return self.methods[name]
-        if self.parent_class:
-            return self.parent_class.get_method(name)
-        return None
+            info = self.methods[name]
+        elif self._parent_class:
+            info = self._parent_class.get_method(name)
+        else:
+            info = None
+        cache[name] = info
+        return info
     
     def llvm_type(self) -> str:
-        return f"%class.{self.name}*"
+        return self._llvm_type
     
     def llvm_struct_type(self) -> str:
-        return f"%class.{self.name}"
+        return self._llvm_struct_type
     
     def size_bytes(self) -> int:
         return self.struct_size
@@ -273,16 +403,18 @@ class ClassType(SinterType):
 
 class FunctionType(SinterType):
     """Function type for function pointers and signatures"""
+    __slots__ = ("return_type", "param_types", "_llvm_type")
     
     def __init__(self, return_type: SinterType, param_types: List[SinterType]):
         param_str = ", ".join(p.name for p in param_types)
         super().__init__(f"({param_str}) -> {return_type.name}", TypeKind.FUNCTION)
         self.return_type = return_type
         self.param_types = param_types
+        params = ", ".join(p.llvm_type() for p in param_types)
+        self._llvm_type = f"{return_type.llvm_type()} ({params})*"
     
     def llvm_type(self) -> str:
-        params = ", ".join(p.llvm_type() for p in self.param_types)
-        return f"{self.return_type.llvm_type()} ({params})*"
+        return self._llvm_type
     
     def size_bytes(self) -> int:
         return 8  # function pointer
@@ -293,6 +425,13 @@ class TypeRegistry:
     
     def __init__(self):
         self.types: Dict[str, SinterType] = {}
+        self.classes: Dict[str, ClassType] = {}  # Class-only view of types
+        # Derived types by id() of their component type, so lookups skip
+        # formatting and hashing a name. Each cached type references its
+        # component, which keeps the id from being reused.
+        self._pointer_cache: Dict[int, PointerType] = {}
+        self._array_cache: Dict[Tuple[int, Optional[int]], ArrayType] = {}
+        self.frozen = False  # Set by freeze()
         self._register_builtin_types()
     
     def _register_builtin_types(self):
@@ -306,25 +445,59 @@ class TypeRegistry:
     
     def register(self, sinter_type: SinterType):
         """Register a new type"""
+        if self.frozen:
+            raise RuntimeError(f"Cannot register type '{sinter_type.name}' in a frozen registry")
         self.types[sinter_type.name] = sinter_type
+        if isinstance(sinter_type, ClassType):
+            self.classes[sinter_type.name] = sinter_type
+        else:
+            self.classes.pop(sinter_type.name, None)
     
     def get(self, name: str) -> Optional[SinterType]:
         """Get a type by name"""
         return self.types.get(name)
     
+    def get_class(self, name: str) -> Optional[ClassType]:
+        """Get a class type by name, or None if the name is not a class"""
+        return self.classes.get(name)
+    
+    def freeze(self):
+        """
+        Close the registry to new named types once analysis is done.
+        Pointer and array types can still be derived on demand. Lookups then
+        go straight to the underlying dicts; every key is an interned type
+        name, so the interned names from the AST match by identity.
+        """
+        self.frozen = True
+        # Instance attributes shadow the methods, skipping a Python call
+        self.get = self.types.get
+        self.get_class = self.classes.get
+    
     def get_or_create_pointer(self, pointee_type: SinterType) -> PointerType:
         """Get or create a pointer type"""
-        ptr_name = f"{pointee_type.name}*"
-        if ptr_name not in self.types:
-            self.types[ptr_name] = PointerType(pointee_type)
-        return self.types[ptr_name]
+        ptr_type = self._pointer_cache.get(id(pointee_type))
+        if ptr_type is None:
+            ptr_name = sys.intern(f"{pointee_type.name}*")
+            ptr_type = self.types.get(ptr_name)
+            if ptr_type is None:
+                ptr_type = self.types[ptr_name] = PointerType(pointee_type)
+            if ptr_type.pointee_type is pointee_type:
+                self._pointer_cache[id(pointee_type)] = ptr_type
+        return ptr_type
     
     def get_or_create_array(self, element_type: SinterType, size: int = None) -> ArrayType:
         """Get or create an array type"""
-        if size is not None:
-            arr_name = f"{element_type.name}[{size}]"
-        else:
-            arr_name = f"{element_type.name}[]"
-        if arr_name not in self.types:
-            self.types[arr_name] = ArrayType(element_type, size)
-        return self.types[arr_name]
+        key = (id(element_type), size)
+        arr_type = self._array_cache.get(key)
+        if arr_type is None:
+            if size is not None:
+                arr_name = f"{element_type.name}[{size}]"
+            else:
+                arr_name = f"{element_type.name}[]"
+            arr_name = sys.intern(arr_name)
+            arr_type = self.types.get(arr_name)
+            if arr_type is None:
+                arr_type = self.types[arr_name] = ArrayType(element_type, size)
+            if arr_type.element_type is element_type:
+                self._array_cache[key] = arr_type
+        return arr_type
@@ -0,0 +1,91 @@
+"""
+Tests for incremental analysis: results reused through an AnalysisCache
+must match analyzing the edited program from scratch
+"""
+
+import unittest
+
+from compiler.lexer.lexer import Lexer
+from compiler.parser.parser import Parser
+from compiler.semantic.analyzer import SemanticAnalyzer, AnalysisCache
+from compiler.codegen.codegen import CodeGenerator
+
+
+SOURCE = """
+class Counter {
+  public:
+    var count: int = 0
+    var step: int = 1
+
+    function bump() -> int {
+      count = count + step;
+      return count;
+    }
+}
+
+class Labelled extends Counter {
+  public:
+    var label: str = "c"
+}
+
+function total(n: int) -> int {
+  var sum: int = 0;
+  var i: int = 0;
+  while (i < n) {
+    sum = sum + i;
+    i = i + 1;
+  }
+  return sum;
+}
+
+function main() -> int {
+  var c: Labelled* = Labelled.new();
+  c.bump();
+  println(total(4));
+  return 0;
+}
+"""
+
+FUNCTION_EDIT = SOURCE.replace("sum = sum + i;", "sum = sum + i * 2;")
+CLASS_EDIT = SOURCE.replace("var step: int = 1", "var step: int = 1\n    var limit: long = 9")
+
+
+def _compile(source, cache=None):
+    ast = Parser(Lexer(source).tokenize()).parse()
+    analyzer = SemanticAnalyzer()
+    type_registry, symbol_table = analyzer.analyze(ast, cache)
+    ir = CodeGenerator(type_registry, symbol_table).generate(ast)
+    return type_registry, ir, analyzer.errors, analyzer.warnings
+
+
+class AnalysisCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = AnalysisCache()
+        self.first_registry = _compile(SOURCE, self.cache)[0]
+
+    def assertMatchesColdRun(self, source):
+        type_registry, *warm = _compile(source, self.cache)
+        _, *cold = _compile(source)
+        self.assertEqual(warm, cold)
+        return type_registry
+
+    def test_function_edit_reuses_class_results(self):
+        type_registry = self.assertMatchesColdRun(FUNCTION_EDIT)
+        self.assertIs(type_registry, self.first_registry)
+
+    def test_class_edit_reanalyzes_classes(self):
+        type_registry = self.assertMatchesColdRun(CLASS_EDIT)
+        self.assertIsNot(type_registry, self.first_registry)
+        self.assertIn("limit", type_registry.get_class("Labelled").field_names)
+
+    def test_edits_in_sequence(self):
+        edits = [("function", FUNCTION_EDIT), ("class", CLASS_EDIT),
+                 ("function", FUNCTION_EDIT), ("revert", SOURCE)]
+        for step, (kind, source) in enumerate(edits):
+            with self.subTest(step=step, edit=kind):
+                self.assertMatchesColdRun(source)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Regression tests for class struct layout, inherited fields included
+"""
+
+import re
+import unittest
+
+from compiler.lexer.lexer import Lexer
+from compiler.parser.parser import Parser
+from compiler.semantic.analyzer import SemanticAnalyzer
+from compiler.codegen.codegen import CodeGenerator
+
+
+# (size, alignment) of the LLVM scalar types the code generator emits
+_LLVM_SCALARS = {
+    "i1": (1, 1), "i8": (1, 1), "i16": (2, 2), "i32": (4, 4), "i64": (8, 8),
+    "float": (4, 4), "double": (8, 8),
+}
+
+
+def _llvm_struct_size(element_types):
+    """ABI size of an LLVM struct of the given element types on a 64-bit target"""
+    offset = 0
+    struct_align = 1
+    for element in element_types:
+        size, align = (8, 8) if element.endswith("*") else _LLVM_SCALARS[element]
+        offset = (offset + align - 1) // align * align + size
+        struct_align = max(struct_align, align)
+    return (offset + struct_align - 1) // struct_align * struct_align
+
+
+def _compile(source):
+    ast = Parser(Lexer(source).tokenize()).parse()
+    type_registry, symbol_table = SemanticAnalyzer().analyze(ast)
+    return type_registry, CodeGenerator(type_registry, symbol_table).generate(ast)
+
+
+INHERITANCE_SOURCE = """
+class Animal {
+  public:
+    var legs: int = 4
+}
+
+class Dog extends Animal {
+  public:
+    var age: int = 3
+    var weight: double = 1.5
+}
+
+class Flag {
+  public:
+    var on: boolean = true
+}
+
+function main() -> int {
+  var d: Dog* = Dog.new();
+  d.age = 7;
+  return 0;
+}
+"""
+
+
+class ClassLayoutTest(unittest.TestCase):
+
+    def setUp(self):
+        self.type_registry, self.ir = _compile(INHERITANCE_SOURCE)
+
+    def _struct_elements(self, class_name):
+        match = re.search(rf"^%class\.{class_name} = type {{ (.*) }}$", self.ir, re.MULTILINE)
+        self.assertIsNotNone(match, f"no struct type emitted for {class_name}")
+        return [element.strip() for element in match.group(1).split(",")]
+
+    def test_struct_size_covers_llvm_struct(self):
+        for name in ("Animal", "Dog", "Flag"):
+            with self.subTest(class_name=name):
+                class_type = self.type_registry.get(name)
+                self.assertGreaterEqual(class_type.struct_size,
+                                        _llvm_struct_size(self._struct_elements(name)))
+
+    def test_malloc_uses_struct_size(self):
+        dog = self.type_registry.get("Dog")
+        self.assertIn(f"@malloc(i64 {dog.struct_size})", self.ir)
+
+    def test_subclass_fields_follow_inherited_ones(self):
+        dog = self.type_registry.get("Dog")
+        self.assertEqual(dog.field_names, ("legs", "age", "weight"))
+        self.assertEqual([dog.get_field(name).offset for name in dog.field_names], [8, 12, 16])
+        self.assertEqual(dog.field_slots, {"legs": 1, "age": 2, "weight": 3})
+        # The parent's own layout is untouched
+        animal = self.type_registry.get("Animal")
+        self.assertEqual(animal.get_field("legs").offset, 8)
+        self.assertEqual(animal.struct_size, 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
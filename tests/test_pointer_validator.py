@@ -0,0 +1,79 @@
+"""
+Tests for the pointer cleanup validator's reachability pruning
+"""
+
+import unittest
+
+from compiler.lexer.lexer import Lexer
+from compiler.parser.parser import Parser
+from compiler.semantic.pointer_validator import PointerValidator
+
+
+def _validate(source):
+    ast = Parser(Lexer(source).tokenize()).parse()
+    return PointerValidator().validate(ast)
+
+
+SOURCE = """
+class Used {
+  public:
+    var n: int = 1
+
+    function leak() -> int {
+      var used_leak: Used* = Used.new();
+      return 0;
+    }
+}
+
+class Base {
+  public:
+    var n: int = 1
+
+    function leak() -> int {
+      var base_leak: Base* = new Base();
+      return 0;
+    }
+}
+
+class Derived extends Base {
+  public:
+    var m: int = 2
+}
+
+class Unused {
+  public:
+    var n: int = 1
+
+    function leak() -> int {
+      var unused_leak: Unused* = Unused.new();
+      return 0;
+    }
+}
+
+function main() -> int {
+  var u: Used* = Used.new();
+  var d: Derived* = new Derived();
+  u.clean();
+  d.clean();
+  return 0;
+}
+"""
+
+
+class ReachabilityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.errors, _ = _validate(SOURCE)
+
+    def test_reachable_class_methods_are_validated(self):
+        self.assertTrue(any("'used_leak'" in error for error in self.errors), self.errors)
+
+    def test_ancestors_of_reachable_classes_are_validated(self):
+        self.assertTrue(any("'base_leak'" in error for error in self.errors), self.errors)
+
+    def test_unreferenced_class_methods_are_skipped(self):
+        self.assertFalse(any("'unused_leak'" in error for error in self.errors), self.errors)
+
+
+if __name__ == "__main__":
+    unittest.main()
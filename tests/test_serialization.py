@@ -0,0 +1,154 @@
+"""
+Tests for the generated as_json/as_xml serializers, run with lli when available
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from compiler.lexer.lexer import Lexer
+from compiler.parser.parser import Parser
+from compiler.semantic.analyzer import SemanticAnalyzer
+from compiler.codegen.codegen import CodeGenerator
+
+
+def _compile(source):
+    ast = Parser(Lexer(source).tokenize()).parse()
+    type_registry, symbol_table = SemanticAnalyzer().analyze(ast)
+    codegen = CodeGenerator(type_registry, symbol_table)
+    return type_registry, codegen, codegen.generate(ast)
+
+
+def _run(codegen, ir, class_type, harness):
+    """Run ir plus class_type's serializers under lli, with harness as main"""
+    ir = re.sub(r"^target triple = .*$", "", ir, flags=re.MULTILINE)
+    ir = ir.replace("define i32 @main()", "define i32 @sinter_main()")
+    ir += codegen.serialization_codegen.generate_all_serializers(class_type)
+    ir += harness
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "module.ll")
+        with open(path, "w") as f:
+            f.write(ir)
+        result = subprocess.run(["lli", path], capture_output=True, text=True, timeout=60)
+    return result.returncode, result.stdout, result.stderr
+
+
+STRING_SOURCE = """
+class Pet {
+  public:
+    @attribute
+    var id: int = 7
+    @attribute
+    var name: str = "Rex \\"the\\" <dog> & \\\\co"
+    @attribute
+    var note: str = "a\\tb"
+    @attribute
+    var ok: boolean = true
+}
+
+function main() -> int {
+  return 0;
+}
+"""
+
+# Prints Pet's JSON and XML, then again with the name field set to null
+HARNESS = """
+@.test.fmt = private unnamed_addr constant [4 x i8] c"%s\\0A\\00"
+
+define i32 @main() {
+entry:
+  %fmt = getelementptr [4 x i8], [4 x i8]* @.test.fmt, i32 0, i32 0
+  %pet = call %class.Pet* @Pet_new()
+  %json = call i8* @Pet_as_json(%class.Pet* %pet)
+  call i32 (i8*, ...) @printf(i8* %fmt, i8* %json)
+  %xml = call i8* @Pet_as_xml(%class.Pet* %pet)
+  call i32 (i8*, ...) @printf(i8* %fmt, i8* %xml)
+  %name = getelementptr %class.Pet, %class.Pet* %pet, i32 0, i32 NAME_SLOT
+  store i8* null, i8** %name
+  %null_json = call i8* @Pet_as_json(%class.Pet* %pet)
+  call i32 (i8*, ...) @printf(i8* %fmt, i8* %null_json)
+  %null_xml = call i8* @Pet_as_xml(%class.Pet* %pet)
+  call i32 (i8*, ...) @printf(i8* %fmt, i8* %null_xml)
+  ret i32 0
+}
+"""
+
+
+class StringSerializationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.type_registry, self.codegen, self.ir = _compile(STRING_SOURCE)
+        self.pet = self.type_registry.get("Pet")
+
+    def test_buffer_size_counts_string_lengths(self):
+        serializer = self.codegen.serialization_codegen
+        for ir in (serializer.generate_json_serializer(self.pet), serializer.generate_xml_serializer(self.pet)):
+            self.assertIn("@strlen", ir)
+            self.assertIn("@sinter_arena_alloc(i64 %size)", ir)
+
+    @unittest.skipUnless(shutil.which("lli"), "lli is not installed")
+    def test_strings_are_escaped(self):
+        name_slot = self.pet.field_slots["name"]
+        returncode, stdout, stderr = _run(self.codegen, self.ir, self.pet,
+                                          HARNESS.replace("NAME_SLOT", str(name_slot)))
+        self.assertEqual(returncode, 0, stderr)
+        outputs = stdout.split("\n</Pet>\n")
+        json, xml = outputs[0].split("\n", 1)
+        self.assertEqual(json, '{"id": 7, "name": "Rex \\"the\\" <dog> & \\\\co", '
+                               '"note": "a\\u0009b", "ok": true}')
+        self.assertIn("<name>Rex \"the\" &lt;dog&gt; &amp; \\co</name>", xml)
+        null_json, null_xml = outputs[1].split("\n", 1)
+        self.assertIn('"name": null', null_json)
+        self.assertIn("<name></name>", null_xml)
+
+
+OWNER_SOURCE = """
+class Owner {
+  public:
+    var id: int = 1
+}
+
+class Pet {
+  public:
+    @attribute
+    var id: int = 7
+    @attribute
+    var owner: Owner* = null
+}
+
+function main() -> int {
+  return 0;
+}
+"""
+
+OWNER_HARNESS = """
+@.test.fmt = private unnamed_addr constant [4 x i8] c"%s\\0A\\00"
+
+define i32 @main() {
+entry:
+  %fmt = getelementptr [4 x i8], [4 x i8]* @.test.fmt, i32 0, i32 0
+  %pet = call %class.Pet* @Pet_new()
+  %json = call i8* @Pet_as_json(%class.Pet* %pet)
+  call i32 (i8*, ...) @printf(i8* %fmt, i8* %json)
+  %xml = call i8* @Pet_as_xml(%class.Pet* %pet)
+  call i32 (i8*, ...) @printf(i8* %fmt, i8* %xml)
+  ret i32 0
+}
+"""
+
+
+class FallbackSerializationTest(unittest.TestCase):
+
+    @unittest.skipUnless(shutil.which("lli"), "lli is not installed")
+    def test_field_without_emitter_writes_null(self):
+        type_registry, codegen, ir = _compile(OWNER_SOURCE)
+        returncode, stdout, stderr = _run(codegen, ir, type_registry.get("Pet"), OWNER_HARNESS)
+        self.assertEqual(returncode, 0, stderr)
+        self.assertEqual(stdout, '{"id": 7, "owner": null}\n<Pet>\n<id>7</id>\n<owner></owner>\n</Pet>\n')
+
+
+if __name__ == "__main__":
+    unittest.main()